@@ -0,0 +1,126 @@
+"""
+Start-up import time benchmark for the gateway and every MCP server.
+
+Each target is imported in a fresh interpreter with `python -X importtime`,
+the cumulative time of its top-level module is taken (best of --runs) and
+compared with import_time_budget.json. Exits with status 1 when a target
+exceeds its budget by more than --tolerance, so it can guard cold start in CI.
+
+    python mcp_servers/python/benchmarks/import_time.py
+    python mcp_servers/python/benchmarks/import_time.py --update   # rewrite the budget
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time_budget.json")
+
+# target -> (working directory, module imported at start-up)
+Targets = {
+    "gateway": ("clients", "run"),
+    "MCP-GSUITE": ("servers/MCP-GSUITE/mcp-gsuite/src", "mcp_gsuite"),
+    "NUMPY_MCP": ("servers/NUMPY_MCP", "mcp_numpy"),
+    "NEO4J_MCP": ("servers/NEO4J_MCP", "mcp_neo4j"),
+    "LINE_MCP": ("servers/LINE_MCP", "line_mcp"),
+    "ASTERISK_MCP": ("servers/ASTERISK_MCP", "mcp_asterisk"),
+    "DAVINCI_MCP": ("servers/DAVINCI_MCP", "davinci_mcp")
+}
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def measure_once(directory: str, module: str) -> Tuple[Optional[float], List[Tuple[str, float]], str]:
+    """(milliseconds, heaviest imports, error) for one fresh-interpreter import"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.join(PYTHON_DIR, directory),
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        lines = [line for line in completed.stderr.splitlines() if line and not line.startswith("import time:")]
+        return None, [], lines[-1] if lines else f"exit status {completed.returncode}"
+
+    total = None
+    heaviest: List[Tuple[str, float]] = []
+    children: List[Tuple[str, float]] = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms, indent, name = int(match.group(2)) / 1000, len(match.group(3)), match.group(4)
+        # children are printed before their parent, one indentation level deeper;
+        # top-level imports have a single space of indentation
+        if indent == 3:
+            children.append((name, cumulative_ms))
+        elif indent == 1:
+            if name == module:
+                total = cumulative_ms
+                heaviest = sorted(children, key=lambda item: item[1], reverse=True)[:5]
+            children = []
+    return total, heaviest, ""
+
+
+def measure(directory: str, module: str, runs: int) -> Tuple[Optional[float], List[Tuple[str, float]], str]:
+    best: Tuple[Optional[float], List[Tuple[str, float]], str] = (None, [], "")
+    for _ in range(runs):
+        total, heaviest, error = measure_once(directory, module)
+        if error:
+            return total, heaviest, error
+        if best[0] is None or total < best[0]:
+            best = (total, heaviest, "")
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import time benchmark for the gateway and the MCP servers")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target, the best run counts")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative overshoot of the budget")
+    parser.add_argument("--update", action="store_true", help="write the measured times as the new budget")
+    parser.add_argument("--targets", nargs="*", default=list(Targets), help="subset of targets to measure")
+    args = parser.parse_args()
+
+    budget: Dict[str, float] = {}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE) as f:
+            budget = json.load(f)
+
+    measured: Dict[str, float] = {}
+    failed = False
+    for target in args.targets:
+        directory, module = Targets[target]
+        total, heaviest, error = measure(directory, module, args.runs)
+        if error:
+            # servers are often missing their optional SDKs outside their own environment
+            print(f"{target:<14} skipped: {error}")
+            continue
+
+        measured[target] = round(total, 1)
+        limit = budget.get(target)
+        status = "no budget"
+        if limit is not None:
+            over_budget = total > limit * (1 + args.tolerance)
+            failed = failed or over_budget
+            status = f"budget {limit:.1f} ms {'EXCEEDED' if over_budget else 'ok'}"
+        print(f"{target:<14} {total:8.1f} ms  {status}")
+        for name, milliseconds in heaviest:
+            print(f"{'':<16}{milliseconds:8.1f} ms  {name}")
+
+    if args.update:
+        budget.update(measured)
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print(f"Budget written to {BUDGET_FILE}")
+        return 0
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
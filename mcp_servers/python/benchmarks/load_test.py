@@ -0,0 +1,345 @@
+"""
+Offline load test for the gateway.
+
+Starts a mock LLM provider (mock_llm_server.py) and run.py with the provider
+base URLs pointed at it, so the real stdio MCP servers of ServersConfig are
+exercised without network access. process_message and
+process_message_stream are then driven at a fixed concurrency. The test
+reports throughput, latency percentiles and a per-stage breakdown. The
+breakdown comes from the gateway's /api/v1/mcp/metrics: validation,
+execution, LLM calls, MCP tool calls and rate limiter queueing.
+
+    python mcp_servers/python/benchmarks/load_test.py --concurrency 16 --requests 400
+    python mcp_servers/python/benchmarks/load_test.py --client MCP_CLIENT_GEMINI --llm-latency-ms 50 --output load.json
+
+Exits with status 1 when the error rate exceeds --max-error-rate, so it can
+gate CI.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from mock_llm_server import MockLlmServer, add_mock_arguments, mock_config_from_args
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(os.path.dirname(PYTHON_DIR))
+GATEWAY_SCRIPT = os.path.join(PYTHON_DIR, "clients", "run.py")
+
+ENDPOINTS = {
+    "process_message": "/api/v1/mcp/process_message",
+    "process_message_stream": "/api/v1/mcp/process_message_stream"
+}
+
+# Gateway histograms reported in the per-stage breakdown
+STAGE_HISTOGRAMS = (
+    "request_stage_seconds",
+    "llm_call_latency_seconds",
+    "llm_rate_limit_wait_seconds",
+    "mcp_tool_call_latency_seconds"
+)
+
+
+def client_details_for(selected_client: str, mock_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    details = {
+        "api_key": "mock-key",
+        "input": args.input,
+        "prompt": "You are a helpful assistant.",
+        "temperature": 0.1,
+        "max_tokens": 512
+    }
+    if selected_client == "MCP_CLIENT_GEMINI":
+        details["chat_model"] = "gemini-1.5-pro"
+    else:
+        details["chat_model"] = "gpt-4o-mini"
+    if selected_client == "MCP_CLIENT_AZURE_AI":
+        details.update({"endpoint": mock_url, "deployment_id": "mock-deployment", "api_version": "2024-02-01"})
+    return details
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))]
+
+
+def latency_summary(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(max(values) if values else None)
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# ---------------------------------------------------------------------------
+# Gateway process
+# ---------------------------------------------------------------------------
+
+def start_gateway(args: argparse.Namespace, mock_url: str, log_file: Any) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["OPENAI_BASE_URL"] = f"{mock_url}/v1"
+    env["GEMINI_BASE_URL"] = f"{mock_url}/v1beta"
+    return subprocess.Popen(
+        [sys.executable, GATEWAY_SCRIPT, "--port", str(args.port), "--workers", str(args.workers)],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=log_file,
+        stderr=subprocess.STDOUT
+    )
+
+
+def stop_gateway(process: subprocess.Popen):
+    if process.poll() is not None:
+        return
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def wait_ready(base_url: str, timeout: float, process: Optional[subprocess.Popen]) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            if requests.get(f"{base_url}/api/v1/mcp/ready", timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def gateway_metrics(base_url: str) -> Dict[str, Any]:
+    try:
+        return requests.get(f"{base_url}/api/v1/mcp/metrics", timeout=10).json()
+    except (requests.RequestException, ValueError):
+        return {"counters": {}, "histograms": {}}
+
+
+def stage_breakdown(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Per histogram series: observations and mean during the phase, recent percentiles.
+    The percentiles come from the gateway's rolling window, not only this phase."""
+    breakdown = {}
+    for series, histogram in sorted(after.get("histograms", {}).items()):
+        if not series.startswith(STAGE_HISTOGRAMS):
+            continue
+        previous = before.get("histograms", {}).get(series, {"count": 0, "sum": 0.0})
+        count = histogram["count"] - previous["count"]
+        if count <= 0:
+            continue
+        breakdown[series] = {
+            "count": count,
+            "mean_ms": _ms((histogram["sum"] - previous["sum"]) / count),
+            "p95_ms": _ms(histogram.get("p95")),
+            "p99_ms": _ms(histogram.get("p99"))
+        }
+    return breakdown
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.first_event: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def success(self, latency: float, first_event: Optional[float] = None):
+        with self.lock:
+            self.latencies.append(latency)
+            if first_event is not None:
+                self.first_event.append(first_event)
+
+    def error(self, reason: str):
+        with self.lock:
+            self.errors[reason] = self.errors.get(reason, 0) + 1
+
+
+def send_message(session: requests.Session, url: str, payload: Dict[str, Any], recorder: Recorder, timeout: float):
+    started = time.monotonic()
+    try:
+        response = session.post(url, json=payload, timeout=timeout)
+        body = response.json()
+    except (requests.RequestException, ValueError) as err:
+        recorder.error(type(err).__name__)
+        return
+    if response.status_code != 200 or not body.get("Status"):
+        recorder.error(f"HTTP {response.status_code}: {str(body.get('Error'))[:80]}")
+        return
+    recorder.success(time.monotonic() - started)
+
+
+def send_message_stream(session: requests.Session, url: str, payload: Dict[str, Any], recorder: Recorder, timeout: float):
+    started = time.monotonic()
+    first_event = None
+    answered = False
+    error = None
+    try:
+        with session.post(url, json=payload, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                recorder.error(f"HTTP {response.status_code}")
+                return
+            for line in response.iter_lines():
+                if not line.startswith(b"data: "):
+                    continue
+                if first_event is None:
+                    first_event = time.monotonic() - started
+                event = json.loads(line[len(b"data: "):])
+                if event.get("StreamingStatus") == "ERROR" or "error" in event:
+                    error = str(event.get("Error") or event.get("error"))[:80]
+                elif event.get("Action") == "AI-RESPONSE":
+                    answered = True
+    except (requests.RequestException, ValueError) as err:
+        recorder.error(type(err).__name__)
+        return
+    if error or not answered:
+        recorder.error(f"stream: {error or 'no AI-RESPONSE event'}")
+        return
+    recorder.success(time.monotonic() - started, first_event)
+
+
+def run_phase(endpoint: str, base_url: str, payload: Dict[str, Any], total: int, concurrency: int, timeout: float) -> Dict[str, Any]:
+    url = f"{base_url}{ENDPOINTS[endpoint]}"
+    send = send_message_stream if endpoint == "process_message_stream" else send_message
+    recorder = Recorder()
+    remaining = iter(range(total))
+    remaining_lock = threading.Lock()
+
+    def worker():
+        with requests.Session() as session:
+            while True:
+                with remaining_lock:
+                    if next(remaining, None) is None:
+                        return
+                send(session, url, payload, recorder, timeout)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.monotonic() - started
+
+    completed = len(recorder.latencies)
+    result = {
+        "requests": total,
+        "succeeded": completed,
+        "errors": recorder.errors,
+        "error_rate": round(1 - completed / total, 4) if total else 0.0,
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else None,
+        "latency": latency_summary(recorder.latencies)
+    }
+    if recorder.first_event:
+        result["first_event"] = latency_summary(recorder.first_event)
+    return result
+
+
+def print_phase(endpoint: str, result: Dict[str, Any]):
+    latency = result["latency"]
+    print(f"\n{endpoint}: {result['succeeded']}/{result['requests']} ok in {result['elapsed_seconds']} s, {result['throughput_rps']} req/s")
+    print(f"  latency      p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  p99 {latency['p99_ms']} ms  max {latency['max_ms']} ms")
+    if "first_event" in result:
+        first = result["first_event"]
+        print(f"  first event  p50 {first['p50_ms']} ms  p95 {first['p95_ms']} ms  p99 {first['p99_ms']} ms")
+    for series, stage in result.get("stages", {}).items():
+        print(f"  {series:<60} n={stage['count']:<6} mean {stage['mean_ms']} ms  p95 {stage['p95_ms']} ms")
+    for reason, count in result["errors"].items():
+        print(f"  error x{count}: {reason}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline load test of the MCP gateway")
+    parser.add_argument("--endpoints", nargs="*", default=list(ENDPOINTS), choices=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per endpoint")
+    parser.add_argument("--client", default="MCP_CLIENT_OPENAI", choices=["MCP_CLIENT_OPENAI", "MCP_CLIENT_AZURE_AI", "MCP_CLIENT_GEMINI"])
+    parser.add_argument("--server", default="NUMPY_MCP", help="MCP server the requests select")
+    parser.add_argument("--input", default="What is the determinant of this matrix?", help="user message")
+    parser.add_argument("--verbosity", default=None, choices=["minimal", "standard", "debug"])
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--gateway-url", default=None, help="use a running gateway instead of starting one (it must point at the mock)")
+    parser.add_argument("--mock-port", type=int, default=0, help="mock provider port, random when 0")
+    parser.add_argument("--port", type=int, default=5055, help="port of the started gateway")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes of the started gateway")
+    parser.add_argument("--ready-timeout", type=float, default=120.0, help="seconds to wait for the MCP servers")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    mock = MockLlmServer(mock_config_from_args(args), port=args.mock_port).start()
+    print(f"Mock LLM provider on {mock.url}")
+
+    gateway = None
+    log_file = tempfile.NamedTemporaryFile(prefix="gateway-load-test-", suffix=".log", delete=False)
+    base_url = args.gateway_url or f"http://127.0.0.1:{args.port}"
+    try:
+        if args.gateway_url is None:
+            gateway = start_gateway(args, mock.url, log_file)
+            print(f"Gateway starting on {base_url}, log: {log_file.name}")
+        if not wait_ready(base_url, args.ready_timeout, gateway):
+            print(f"Gateway not ready after {args.ready_timeout} s, see {log_file.name}")
+            return 1
+
+        payload = {
+            "selected_client": args.client,
+            "selected_servers": [args.server],
+            "selected_server_credentials": {args.server: {}},
+            "client_details": client_details_for(args.client, mock.url, args)
+        }
+        if args.verbosity:
+            payload["verbosity"] = args.verbosity
+
+        results: Dict[str, Any] = {
+            "config": {key: value for key, value in vars(args).items() if key != "output"},
+            "endpoints": {}
+        }
+        failed = False
+        for endpoint in args.endpoints:
+            run_phase(endpoint, base_url, payload, args.warmup, args.concurrency, args.request_timeout)
+            before = gateway_metrics(base_url)
+            result = run_phase(endpoint, base_url, payload, args.requests, args.concurrency, args.request_timeout)
+            result["stages"] = stage_breakdown(before, gateway_metrics(base_url))
+            results["endpoints"][endpoint] = result
+            print_phase(endpoint, result)
+            failed = failed or result["error_rate"] > args.max_error_rate
+
+        results["mock_llm_requests"] = dict(mock.requests)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=4)
+            print(f"\nResults written to {args.output}")
+        return 1 if failed else 0
+
+    finally:
+        if gateway is not None:
+            stop_gateway(gateway)
+        mock.stop()
+        log_file.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+In-memory stand-ins for the external services behind the MCP servers, used by
+the tool handler benchmarks. They replace the client objects each server
+builds (Neo4j driver, LineBotApi, Google API resources, the DaVinci Resolve
+bridge). The handlers' own request building, result parsing and
+serialization still run, without network access. Every fake answers
+instantly with `records` rows, so the benchmark measures the server's
+overhead and not the backend's.
+"""
+import base64
+import itertools
+import re
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Neo4j
+# ---------------------------------------------------------------------------
+
+COUNT_ALIAS = re.compile(r"count\([^)]*\)\s+as\s+(\w+)", re.IGNORECASE)
+LIMIT = re.compile(r"\bLIMIT\s+(\d+)", re.IGNORECASE)
+
+
+class FakeNode:
+    """Looks like a neo4j.graph.Node to Neo4jConnection._serialize_neo4j_value"""
+
+    def __init__(self, index: int):
+        self._properties = {
+            "name": f"Person {index}",
+            "email": f"person{index}@example.com",
+            "age": 20 + index % 50,
+            "score": index * 0.37,
+            "tags": ["customer", f"segment-{index % 7}"]
+        }
+        self.labels = frozenset(["Person"])
+        self.element_id = f"4:bench:{index}"
+
+
+class FakeNeo4jResult:
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def consume(self):
+        return SimpleNamespace(counters=SimpleNamespace(nodes_created=0, relationships_created=0, properties_set=0))
+
+
+class FakeNeo4jSession:
+    def __init__(self, records: int):
+        self.records = records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> FakeNeo4jResult:
+        alias = COUNT_ALIAS.search(query)
+        if alias:
+            return FakeNeo4jResult([{alias.group(1): self.records}])
+        if "db.labels()" in query:
+            return FakeNeo4jResult([{"label": label} for label in ("Person", "Company", "Product")])
+        if "db.relationshipTypes()" in query:
+            return FakeNeo4jResult([{"relationshipType": kind} for kind in ("KNOWS", "WORKS_AT", "BOUGHT")])
+        limit = LIMIT.search(query)
+        rows = min(self.records, int(limit.group(1))) if limit else self.records
+        return FakeNeo4jResult([{"n": FakeNode(index)} for index in range(rows)])
+
+
+class FakeNeo4jDriver:
+    def __init__(self, records: int):
+        self.records = records
+
+    def session(self, database: Optional[str] = None) -> FakeNeo4jSession:
+        return FakeNeo4jSession(self.records)
+
+    def close(self):
+        pass
+
+
+def install_neo4j_mock(module: Any, records: int):
+    """Replace the neo4j GraphDatabase used by mcp_neo4j"""
+    module.GraphDatabase = SimpleNamespace(driver=lambda uri, auth=None: FakeNeo4jDriver(records))
+    module.connection_cache.clear()
+    module.credential_store.clear()
+
+
+# ---------------------------------------------------------------------------
+# LINE
+# ---------------------------------------------------------------------------
+
+class FakeLineBotApi:
+    """Accepts every LineBotApi call; reads return realistic objects"""
+
+    def __init__(self, channel_access_token: str, records: int = 100):
+        self.records = records
+
+    def get_profile(self, user_id: str):
+        return SimpleNamespace(display_name="Bench User", user_id=user_id, picture_url="https://example.com/p.png",
+                               status_message="benchmarking", language="en")
+
+    def get_group_member_profile(self, group_id: str, user_id: str):
+        return self.get_profile(user_id)
+
+    def get_group_summary(self, group_id: str):
+        return SimpleNamespace(group_id=group_id, group_name="Bench Group", picture_url="https://example.com/g.png")
+
+    def get_group_member_ids(self, group_id: str):
+        return SimpleNamespace(member_ids=[f"U{index:032x}" for index in range(self.records)], next=None)
+
+    def create_rich_menu(self, rich_menu: Any) -> str:
+        return "richmenu-bench"
+
+    def __getattr__(self, name: str):
+        # push_message, broadcast, delete_rich_menu, ... succeed without a result
+        return lambda *args, **kwargs: None
+
+
+class FakeWebhookHandler:
+    def __init__(self, channel_secret: str):
+        self.channel_secret = channel_secret
+
+    def handle(self, body: str, signature: str):
+        pass
+
+
+def install_line_mock(module: Any, records: int):
+    """Replace the LINE SDK clients used by line_mcp"""
+    module.LineBotApi = lambda channel_access_token: FakeLineBotApi(channel_access_token, records)
+    module.WebhookHandler = FakeWebhookHandler
+    module.line_client_cache.clear()
+    module.credential_store.clear()
+
+
+# ---------------------------------------------------------------------------
+# Google (Gmail, Calendar, Meet)
+# ---------------------------------------------------------------------------
+
+def _gmail_message(message_id: str, body_chars: int = 2000) -> Dict[str, Any]:
+    body = base64.urlsafe_b64encode((("Benchmark message body. " * (body_chars // 24 + 1))[:body_chars]).encode()).decode()
+    return {
+        "id": message_id,
+        "threadId": f"t-{message_id}",
+        "historyId": "1",
+        "internalDate": "1719878400000",
+        "sizeEstimate": body_chars,
+        "labelIds": ["INBOX", "UNREAD"],
+        "snippet": "Benchmark message body.",
+        "payload": {
+            "mimeType": "multipart/mixed",
+            "headers": [
+                {"name": "Subject", "value": f"Report {message_id}"},
+                {"name": "From", "value": "sender@example.com"},
+                {"name": "To", "value": "me@example.com"},
+                {"name": "Date", "value": "Tue, 2 Jul 2024 10:00:00 +0000"},
+                {"name": "Message-ID", "value": f"<{message_id}@example.com>"}
+            ],
+            "parts": [
+                {"partId": "0", "mimeType": "text/plain", "body": {"data": body, "size": body_chars}},
+                {"partId": "1", "mimeType": "application/pdf", "filename": "report.pdf",
+                 "body": {"attachmentId": f"att-{message_id}", "size": 4096}}
+            ]
+        }
+    }
+
+
+def _calendar_event(index: int) -> Dict[str, Any]:
+    return {
+        "id": f"event{index}",
+        "status": "confirmed",
+        "summary": f"Meeting {index}",
+        "description": "Benchmark event",
+        "location": "Room 1",
+        "start": {"dateTime": "2024-07-02T10:00:00Z", "timeZone": "UTC"},
+        "end": {"dateTime": "2024-07-02T11:00:00Z", "timeZone": "UTC"},
+        "attendees": [{"email": f"guest{n}@example.com", "responseStatus": "accepted"} for n in range(5)],
+        "hangoutLink": f"https://meet.google.com/bench-{index}",
+        "conferenceData": {"entryPoints": [{"entryPointType": "video", "uri": f"https://meet.google.com/bench-{index}"}]}
+    }
+
+
+class FakeGoogleRequest:
+    """Chainable like a googleapiclient resource: service.users().messages().list(...).execute()"""
+
+    def __init__(self, api: "FakeGoogleApi", path: Tuple[str, ...], kwargs: Dict[str, Any]):
+        self.api = api
+        self.path = path
+        self.kwargs = kwargs
+
+    def __getattr__(self, name: str):
+        return lambda **kwargs: FakeGoogleRequest(self.api, self.path + (name,), kwargs)
+
+    def execute(self) -> Any:
+        return self.api.respond(self.path, self.kwargs)
+
+
+class FakeGoogleApi:
+    def __init__(self, records: int):
+        self.records = records
+        self.ids = itertools.count()
+
+    def __getattr__(self, name: str):
+        return lambda **kwargs: FakeGoogleRequest(self, (name,), kwargs)
+
+    def respond(self, path: Tuple[str, ...], kwargs: Dict[str, Any]) -> Any:
+        operation = path[-1]
+        resource = path[-2] if len(path) > 1 else ""
+        if resource == "messages" and operation == "list":
+            count = min(self.records, kwargs.get("maxResults") or self.records)
+            return {"messages": [{"id": f"m{index}", "threadId": f"t{index}"} for index in range(count)]}
+        if resource == "messages" and operation == "get":
+            return _gmail_message(kwargs.get("id", "m0"))
+        if resource == "attachments":
+            return {"size": 4096, "data": base64.urlsafe_b64encode(b"%PDF" + b"\0" * 4092).decode()}
+        if resource in ("messages", "drafts") and operation in ("send", "create"):
+            return {"id": f"{resource}-{next(self.ids)}", "message": {"id": f"m-{next(self.ids)}", "threadId": "t0"}}
+        if resource == "calendarList":
+            return {"items": [{"id": f"calendar{index}@example.com", "summary": f"Calendar {index}", "primary": index == 0,
+                               "timeZone": "UTC", "accessRole": "owner"} for index in range(10)]}
+        if resource == "events" and operation == "list":
+            count = min(self.records, kwargs.get("maxResults") or self.records)
+            return {"items": [_calendar_event(index) for index in range(count)]}
+        if resource == "events" and operation in ("insert", "get", "update", "patch"):
+            return _calendar_event(next(self.ids))
+        if resource == "freebusy":
+            calendars = [item.get("id") for item in (kwargs.get("body") or {}).get("items", [])] or ["primary"]
+            return {"calendars": {calendar_id: {"busy": [{"start": "2024-07-02T10:00:00Z", "end": "2024-07-02T11:00:00Z"}]}
+                                  for calendar_id in calendars}}
+        # deletes and anything else without a payload
+        return {}
+
+
+def install_google_mock(package: Any, records: int):
+    """Replace googleapiclient's build() and the OAuth refresh used by mcp_gsuite"""
+    from importlib import import_module
+
+    gauth = import_module(f"{package.__name__}.gauth")
+    gauth.authorize_credentials = lambda credentials: credentials
+    for service_module in ("gmail", "calendar", "meet"):
+        module = import_module(f"{package.__name__}.{service_module}")
+        module.build = lambda *args, **kwargs: FakeGoogleApi(records)
+    toolhandler = import_module(f"{package.__name__}.toolhandler")
+    toolhandler.service_cache.clear()
+    toolhandler.credential_store.clear()
+
+
+# ---------------------------------------------------------------------------
+# DaVinci Resolve
+# ---------------------------------------------------------------------------
+
+def install_davinci_mock(module: Any, records: int):
+    """Replace the socket round trip to the Resolve bridge"""
+    def call_resolve(command: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        # the bridge answers get_project_list with a list and everything else with text
+        if command == "get_project_list":
+            return [f"project-{index}" for index in range(records)]
+        if command.startswith("list_"):
+            return "\n".join(f"{command[5:]}-{index}" for index in range(records))
+        if command == "get_current_project":
+            return "Bench Project"
+        return f"{command} completed"
+
+    module.call_resolve = call_resolve
@@ -0,0 +1,264 @@
+"""
+Local stand-in for the OpenAI, Azure OpenAI and Gemini chat APIs, used by the
+load test so the gateway can be driven offline.
+
+Every request is answered after a configurable latency with the token counts
+and rate limit headers of a real provider. The conversation follows the
+gateway's agent loop: the tool selection prompt is answered with the
+configured tool, a request offering tools gets a call to it, and once a tool
+result is in the history (or no tools are offered) a plain text answer ends
+the turn. "$RANDOM" values in the tool arguments are replaced by random
+numbers on every call, so read-only tool results are not served from the
+gateway cache.
+
+    python mcp_servers/python/benchmarks/mock_llm_server.py --port 8900
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 GEMINI_BASE_URL=http://127.0.0.1:8900/v1beta python mcp_servers/python/clients/run.py
+
+Azure requests are sent to the "endpoint" of the client details, point it at
+http://127.0.0.1:8900.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+GEMINI_PATH = re.compile(r"^/v1beta/models/([^/:]+):generateContent")
+AZURE_PATH = re.compile(r"^/openai/deployments/([^/]+)/chat/completions")
+OPENAI_PATH = "/v1/chat/completions"
+
+
+@dataclass
+class MockLlmConfig:
+    latency_ms: float = 200.0
+    jitter_ms: float = 50.0
+    prompt_tokens: int = 500
+    completion_tokens: int = 60
+    tool_name: str = "matrix_determinant"
+    tool_args: Dict[str, Any] = field(default_factory=lambda: {"matrix": [["$RANDOM", "$RANDOM"], ["$RANDOM", "$RANDOM"]]})
+    answer: str = "The requested computation is complete."
+    # Reported in x-ratelimit-* headers, the gateway's limiter adapts to them
+    rate_limit_requests: int = 1000000
+    rate_limit_tokens: int = 1000000000
+    # Fraction of requests answered with 429 / 500, to exercise retries and failover
+    error_rate_429: float = 0.0
+    error_rate_500: float = 0.0
+
+
+def _randomized(value: Any) -> Any:
+    if value == "$RANDOM":
+        return round(random.uniform(-10, 10), 3)
+    if isinstance(value, list):
+        return [_randomized(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _randomized(item) for key, item in value.items()}
+    return value
+
+
+def _turn(system_prompt: str, last_message: str, offers_tools: bool) -> str:
+    """"select", "tool_call" or "answer" for the gateway's agent loop"""
+    if last_message.startswith("Executed tool:"):
+        return "answer"
+    if offers_tools:
+        return "tool_call"
+    if "<function_call>" in system_prompt:
+        return "select"
+    return "answer"
+
+
+class MockLlmServer:
+    """Threaded HTTP server answering the three provider APIs"""
+
+    def __init__(self, config: MockLlmConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        handler = type("MockLlmHandler", (_MockLlmHandler,), {"mock": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLlmServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-llm", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def count(self, provider: str, turn: str):
+        with self.lock:
+            key = f"{provider}:{turn}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    # -- provider response bodies -------------------------------------------
+
+    def _selection_text(self) -> str:
+        return f"<function_call>TRUE</function_call>\n<selected_tools>{self.config.tool_name}</selected_tools>"
+
+    def openai_response(self, model: str, turn: str) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"role": "assistant", "content": None}
+        if turn == "tool_call":
+            message["tool_calls"] = [{
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {"name": self.config.tool_name, "arguments": json.dumps(_randomized(self.config.tool_args))}
+            }]
+            finish_reason = "tool_calls"
+        else:
+            message["content"] = self._selection_text() if turn == "select" else self.config.answer
+            finish_reason = "stop"
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": self.config.prompt_tokens,
+                "completion_tokens": self.config.completion_tokens,
+                "total_tokens": self.config.prompt_tokens + self.config.completion_tokens
+            }
+        }
+
+    def gemini_response(self, model: str, turn: str) -> Dict[str, Any]:
+        if turn == "tool_call":
+            part: Dict[str, Any] = {"functionCall": {"name": self.config.tool_name, "args": _randomized(self.config.tool_args)}}
+        else:
+            part = {"text": self._selection_text() if turn == "select" else self.config.answer}
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [part]}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": self.config.prompt_tokens,
+                "candidatesTokenCount": self.config.completion_tokens,
+                "totalTokenCount": self.config.prompt_tokens + self.config.completion_tokens
+            },
+            "modelVersion": model
+        }
+
+    def respond(self, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        gemini = GEMINI_PATH.match(path)
+        azure = AZURE_PATH.match(path)
+        if gemini:
+            provider, model = "gemini", gemini.group(1)
+            system_prompt = " ".join(part.get("text", "") for part in body.get("system_instruction", {}).get("parts", []))
+            contents = body.get("contents") or [{}]
+            last_message = " ".join(part.get("text", "") for part in contents[-1].get("parts", []))
+            offers_tools = bool(body.get("tools"))
+        elif azure or path.startswith(OPENAI_PATH):
+            provider, model = ("azure", azure.group(1)) if azure else ("openai", body.get("model", ""))
+            messages = body.get("messages") or [{}]
+            system_prompt = (messages[0].get("content") or "") if messages[0].get("role") == "system" else ""
+            last_content = messages[-1].get("content") or ""
+            last_message = last_content if isinstance(last_content, str) else ""
+            offers_tools = bool(body.get("tools"))
+        else:
+            return 404, {"error": {"message": f"Unknown path {path}"}}
+
+        roll = random.random()
+        if roll < self.config.error_rate_429:
+            self.count(provider, "429")
+            return 429, {"error": {"message": "Rate limit reached (mock)", "code": 429}}
+        if roll < self.config.error_rate_429 + self.config.error_rate_500:
+            self.count(provider, "500")
+            return 500, {"error": {"message": "Internal error (mock)", "code": 500}}
+
+        turn = _turn(str(system_prompt), last_message, offers_tools)
+        self.count(provider, turn)
+        if provider == "gemini":
+            return 200, self.gemini_response(model, turn)
+        return 200, self.openai_response(model, turn)
+
+
+class _MockLlmHandler(BaseHTTPRequestHandler):
+    mock: MockLlmServer
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+
+        config = self.mock.config
+        time.sleep(max(0.0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000.0)
+        status, response = self.mock.respond(self.path, body)
+
+        payload = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-ratelimit-limit-requests", str(config.rate_limit_requests))
+        self.send_header("x-ratelimit-remaining-requests", str(config.rate_limit_requests - 1))
+        self.send_header("x-ratelimit-reset-requests", "1s")
+        self.send_header("x-ratelimit-limit-tokens", str(config.rate_limit_tokens))
+        self.send_header("x-ratelimit-remaining-tokens", str(config.rate_limit_tokens - config.prompt_tokens))
+        self.send_header("x-ratelimit-reset-tokens", "1s")
+        if status == 429:
+            self.send_header("retry-after-ms", "200")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any):
+        # one line per request would dominate the load test's output
+        pass
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("mock LLM provider")
+    group.add_argument("--llm-latency-ms", type=float, default=MockLlmConfig.latency_ms, help="mean provider latency")
+    group.add_argument("--llm-jitter-ms", type=float, default=MockLlmConfig.jitter_ms, help="standard deviation of the latency")
+    group.add_argument("--prompt-tokens", type=int, default=MockLlmConfig.prompt_tokens, help="prompt tokens reported per call")
+    group.add_argument("--completion-tokens", type=int, default=MockLlmConfig.completion_tokens, help="completion tokens reported per call")
+    group.add_argument("--tool", default=MockLlmConfig.tool_name, help="tool the mock selects and calls")
+    group.add_argument("--tool-args", type=json.loads, default=None, help='JSON arguments of the tool call, "$RANDOM" values are randomized')
+    group.add_argument("--error-rate-429", type=float, default=0.0, help="fraction of calls answered with 429")
+    group.add_argument("--error-rate-500", type=float, default=0.0, help="fraction of calls answered with 500")
+
+
+def mock_config_from_args(args: argparse.Namespace) -> MockLlmConfig:
+    config = MockLlmConfig(
+        latency_ms=args.llm_latency_ms,
+        jitter_ms=args.llm_jitter_ms,
+        prompt_tokens=args.prompt_tokens,
+        completion_tokens=args.completion_tokens,
+        tool_name=args.tool,
+        error_rate_429=args.error_rate_429,
+        error_rate_500=args.error_rate_500
+    )
+    if args.tool_args is not None:
+        config.tool_args = args.tool_args
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI / Azure OpenAI / Gemini chat API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockLlmServer(mock_config_from_args(args), args.host, args.port)
+    print(f"Mock LLM provider listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Microbenchmarks of every MCP server's tool handlers.
+
+Each case calls a handler's run_tool(args) directly ("direct"). It also makes
+the same call through an in-process MCP client session connected to the
+server's `app` ("mcp"), which adds the protocol's validation and
+serialization. Arguments have realistic sizes: --matrix-size for NUMPY_MCP
+and --records rows for the other servers. The backends are the in-memory
+fakes of mock_backends.py, so no network or credentials are needed.
+
+Each round is timed until --min-time has passed, after a warm-up, in the
+style of pytest-benchmark. Every run is appended to the history file, kept
+outside the repository in ~/.cache/mcp-benchmarks (or --history /
+$TOOL_BENCHMARK_HISTORY). A case whose median is more than --threshold above
+its baseline fails the run. The baseline is tool_handlers_baseline.json, or the
+median of the recent history when a case has no baseline. Timings depend on
+the machine, so no baseline is committed: record one with --update before
+comparing runs.
+
+    python mcp_servers/python/benchmarks/tool_handlers.py --update   # first run: record the baseline
+    python mcp_servers/python/benchmarks/tool_handlers.py
+    python mcp_servers/python/benchmarks/tool_handlers.py --servers NUMPY_MCP --matrix-size 512
+    python mcp_servers/python/benchmarks/tool_handlers.py --update   # accept the current timings
+"""
+import argparse
+import asyncio
+import base64
+import copy
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import mock_backends
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "tool_handlers_baseline.json")
+HISTORY_FILE = os.environ.get("TOOL_BENCHMARK_HISTORY") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "mcp-benchmarks",
+    "tool_handlers_history.jsonl"
+)
+
+CREDENTIALS_HANDLE_ARG = "__credentials_handle__"
+
+# (tool name, label, arguments)
+Case = Tuple[str, str, Dict[str, Any]]
+
+
+@dataclass
+class ServerTarget:
+    directory: str
+    module: str
+    cases: Callable[[argparse.Namespace], List[Case]]
+    install_mocks: Optional[Callable[[Any, int], None]] = None
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def raw_array(array: np.ndarray) -> Dict[str, Any]:
+    """NUMPY_MCP binary array argument"""
+    return {"encoding": "raw", "dtype": array.dtype.str, "shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def numpy_cases(args: argparse.Namespace) -> List[Case]:
+    rng = np.random.default_rng(0)
+    n = args.matrix_size
+    label = f"{n}x{n}"
+    a = rng.standard_normal((n, n))
+    b = rng.standard_normal((n, n))
+    spd = a @ a.T + n * np.eye(n)
+    matrix_a, matrix_b = a.tolist(), b.tolist()
+    unknowns = n * n
+    rows = np.repeat(np.arange(unknowns), 3)
+    columns = rows + np.tile([-1, 0, 1], unknowns)
+    inside = (columns >= 0) & (columns < unknowns)
+    tridiagonal = {
+        "format": "coo",
+        "shape": [unknowns, unknowns],
+        "row": raw_array(rows[inside]),
+        "col": raw_array(columns[inside]),
+        "data": raw_array(np.where(rows == columns, 4.0 + np.sqrt(rows), -1.0)[inside])
+    }
+    return [
+        ("matrix_add", label, {"matrix_a": matrix_a, "matrix_b": matrix_b}),
+        ("matrix_multiply", label, {"matrix_a": matrix_a, "matrix_b": matrix_b}),
+        ("matrix_subtract", label, {"matrix_a": matrix_a, "matrix_b": matrix_b}),
+        ("element_wise_multiply", label, {"matrix_a": matrix_a, "matrix_b": matrix_b}),
+        ("dot_product", f"{n * n}", {"matrix_a": a.ravel().tolist(), "matrix_b": b.ravel().tolist()}),
+        ("matrix_transpose", label, {"matrix": matrix_a}),
+        ("matrix_inverse", label, {"matrix": spd.tolist()}),
+        ("matrix_determinant", label, {"matrix": spd.tolist()}),
+        ("solve_linear_system", label, {"matrix_a": spd.tolist(), "vector_b": b[:, 0].tolist()}),
+        ("eigenvalues_eigenvectors", label, {"matrix": matrix_a}),
+        ("eigenvalues_eigenvectors", f"{label} spd", {"matrix": spd.tolist()}),
+        ("solve_linear_system", f"{label} triangular", {"matrix_a": np.triu(spd).tolist(), "vector_b": b[:, 0].tolist()}),
+        ("singular_value_decomposition", label, {"matrix": matrix_a}),
+        ("qr_decomposition", label, {"matrix": matrix_a}),
+        ("matrix_power", label, {"matrix": (a / n).tolist(), "power": 8}),
+        ("fast_fourier_transform", f"{n * n}", {"signal": a.ravel().tolist()}),
+        ("fast_fourier_transform", f"{n * n} rfft split", {"signal": a.ravel().tolist(), "transform": "rfft", "response_encoding": "split"}),
+        ("fast_fourier_transform", f"{label} rows rfft raw", {"signal": raw_array(a), "transform": "rfft", "axis": 1, "response_encoding": "raw"}),
+        ("convolve", f"{n * n} * {n}", {"signal_a": raw_array(a.ravel()), "signal_b": raw_array(b[0]), "response_encoding": "raw"}),
+        ("polynomial_roots", "64", {"polynomial_coefficients": rng.standard_normal(65).tolist()}),
+        ("matrix_reshape", label, {"matrix": matrix_a, "new_dimensions": [n * n, 1]}),
+        # the same operations with binary array transport
+        ("matrix_add", f"{label} raw", {"matrix_a": raw_array(a), "matrix_b": raw_array(b), "response_encoding": "raw"}),
+        ("matrix_multiply", f"{label} raw", {"matrix_a": raw_array(a), "matrix_b": raw_array(b), "response_encoding": "raw"}),
+        ("matrix_inverse", f"{label} npy", {"matrix": raw_array(spd), "response_encoding": "npy"}),
+        # repeated solves against one matrix are served from the factorization cache
+        ("solve_linear_system", f"{label} {n} rhs raw", {"matrix_a": raw_array(spd), "vector_b": raw_array(b), "response_encoding": "raw"}),
+        # a diagonally dominant tridiagonal matrix of n * n unknowns with a spread spectrum, sent as a sparse matrix
+        ("solve_linear_system", f"{unknowns} sparse cg", {"matrix_a": tridiagonal, "vector_b": rng.standard_normal(unknowns).tolist()}),
+        ("sparse_eigenvalues", f"{unknowns} sparse k=6", {"matrix": tridiagonal, "k": 6, "eigenvectors": False}),
+        ("matrix_multiply", f"{unknowns} sparse", {"matrix_a": tridiagonal, "matrix_b": tridiagonal, "response_encoding": "raw"}),
+        ("descriptive_statistics", f"{label} axis 0", {"array": raw_array(a), "axis": 0, "quantiles": [0.05, 0.95]}),
+        ("numerical_derivative", f"{n * n}", {"values": raw_array(a.ravel()), "spacing": 0.01}),
+        ("evaluate_pipeline", f"{label} 4 steps", {
+            "pipeline": "C = A @ B; D = C * 0.5 + A - B; E = inv(D @ D.T + S); r = norm(E)",
+            "inputs": {"A": raw_array(a), "B": raw_array(b), "S": raw_array(spd)}
+        })
+    ]
+
+
+NEO4J_CREDENTIALS = {"uri": "bolt://bench:7687", "username": "neo4j", "password": "bench", "database": "neo4j"}
+
+
+def neo4j_cases(args: argparse.Namespace) -> List[Case]:
+    records = args.records
+    credentials = {"__credentials__": NEO4J_CREDENTIALS, CREDENTIALS_HANDLE_ARG: "bench"}
+    return [
+        ("get_database_info", "counts", dict(credentials)),
+        ("list_labels", "3 labels", dict(credentials)),
+        ("find_nodes", f"{records} rows", {**credentials, "label": "Person", "limit": records}),
+        ("find_relationships", f"{records} rows", {**credentials, "relationship_type": "KNOWS", "limit": records}),
+        ("get_neighbors", f"{records} rows", {**credentials, "node_id": 0, "depth": 2}),
+        ("execute_cypher", f"{records} rows", {**credentials, "query": f"MATCH (n:Person) RETURN n LIMIT {records}", "read_only": True}),
+        ("create_node", "1 node", {**credentials, "labels": ["Person"], "properties": {"name": "Bench", "age": 30}})
+    ]
+
+
+LINE_CREDENTIALS = {"channel_access_token": "bench-token", "channel_secret": "bench-secret"}
+
+
+def line_cases(args: argparse.Namespace) -> List[Case]:
+    credentials = {"__credentials__": LINE_CREDENTIALS, CREDENTIALS_HANDLE_ARG: "bench"}
+    quick_replies = [{"label": f"Option {index}", "text": f"option {index}"} for index in range(13)]
+    return [
+        ("send_text_message", "text", {**credentials, "to": "Ubench", "message": "Benchmark " * 100}),
+        ("send_text_message", "13 quick replies", {**credentials, "to": "Ubench", "message": "Pick one", "quick_replies": quick_replies}),
+        ("get_user_profile", "profile", {**credentials, "user_id": "Ubench"}),
+        ("get_group_summary", "summary", {**credentials, "group_id": "Cbench"}),
+        ("manage_group_members", f"{args.records} ids", {**credentials, "action": "get_member_ids", "group_id": "Cbench"}),
+        ("broadcast_message", "text", {**credentials, "message": "Benchmark broadcast"})
+    ]
+
+
+def asterisk_cases(args: argparse.Namespace) -> List[Case]:
+    return [
+        ("get_active_calls", "simulated", {}),
+        ("get_call_history", "limit 100", {"limit": 100}),
+        ("list_extensions", "simulated", {}),
+        ("get_extension_status", "1001", {"extension": "1001"}),
+        ("get_voicemails", "1001", {"extension": "1001"}),
+        ("get_asterisk_status", "simulated", {})
+    ]
+
+
+def davinci_cases(args: argparse.Namespace) -> List[Case]:
+    return [
+        ("get_project_list", f"{args.records} projects", {}),
+        ("list_timelines", f"{args.records} timelines", {}),
+        ("list_media_pool_items", f"{args.records} items", {}),
+        ("get_current_project", "name", {}),
+        ("add_timeline_marker", "marker", {"frame_id": 100, "color": "Blue", "name": "Bench"})
+    ]
+
+
+GSUITE_CREDENTIALS = {"token": "bench", "refresh_token": "bench", "client_id": "bench", "client_secret": "bench"}
+
+
+def gsuite_cases(args: argparse.Namespace) -> List[Case]:
+    records = args.records
+    credentials = {"__credentials__": GSUITE_CREDENTIALS, CREDENTIALS_HANDLE_ARG: "bench"}
+    return [
+        ("query_gmail_emails", f"{min(records, 500)} emails", {**credentials, "query": "is:unread", "max_results": min(records, 500)}),
+        ("get_gmail_email", "1 email", {**credentials, "email_id": "m0"}),
+        ("bulk_get_gmail_emails", "50 emails", {**credentials, "email_ids": [f"m{index}" for index in range(50)]}),
+        ("list_calendars", "10 calendars", dict(credentials)),
+        ("get_calendar_events", f"{records} events", {**credentials, "max_results": records}),
+        ("get_all_meet_meetings", f"{records} meetings", {**credentials, "max_results": records}),
+        ("create_gmail_draft", "draft", {**credentials, "to": "a@example.com", "subject": "Bench", "body": "Benchmark " * 200})
+    ]
+
+
+Servers: Dict[str, ServerTarget] = {
+    "NUMPY_MCP": ServerTarget("servers/NUMPY_MCP", "mcp_numpy", numpy_cases),
+    "NEO4J_MCP": ServerTarget("servers/NEO4J_MCP", "mcp_neo4j", neo4j_cases, mock_backends.install_neo4j_mock),
+    "LINE_MCP": ServerTarget("servers/LINE_MCP", "line_mcp", line_cases, mock_backends.install_line_mock),
+    "ASTERISK_MCP": ServerTarget("servers/ASTERISK_MCP", "mcp_asterisk", asterisk_cases),
+    "DAVINCI_MCP": ServerTarget("servers/DAVINCI_MCP", "davinci_mcp", davinci_cases, mock_backends.install_davinci_mock),
+    "MCP-GSUITE": ServerTarget("servers/MCP-GSUITE/mcp-gsuite/src", "mcp_gsuite.server", gsuite_cases,
+                               lambda module, records: mock_backends.install_google_mock(importlib.import_module("mcp_gsuite"), records))
+}
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Statistics in milliseconds"""
+    return {
+        "rounds": len(timings),
+        "min_ms": round(min(timings) * 1000, 4),
+        "median_ms": round(statistics.median(timings) * 1000, 4),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+        "stddev_ms": round(statistics.pstdev(timings) * 1000, 4),
+        "max_ms": round(max(timings) * 1000, 4)
+    }
+
+
+def bench_sync(call: Callable[[], Any], warmup: int, min_time: float, max_rounds: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        call()
+    timings: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_rounds and (len(timings) < 3 or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return summarize(timings)
+
+
+async def bench_async(call: Callable[[], Any], warmup: int, min_time: float, max_rounds: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        await call()
+    timings: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_rounds and (len(timings) < 3 or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - started)
+    return summarize(timings)
+
+
+def is_error_result(result: Any) -> Optional[str]:
+    """The servers report failures as text, a failing case would benchmark the error path"""
+    items = getattr(result, "content", result) or []
+    for item in items:
+        text = getattr(item, "text", "") or ""
+        if text.startswith(("Error", "LINE API Error")) or getattr(result, "isError", False):
+            return text[:120]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def load_server(name: str, target: ServerTarget, args: argparse.Namespace) -> Any:
+    sys.path.insert(0, os.path.join(PYTHON_DIR, target.directory))
+    module = importlib.import_module(target.module)
+    if target.install_mocks is not None:
+        target.install_mocks(module, args.records)
+    return module
+
+
+async def run_server(name: str, module: Any, cases: List[Case], args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+
+    if "direct" in args.modes:
+        for tool_name, label, tool_args in cases:
+            handler = module.tool_handlers.get(tool_name)
+            if handler is None:
+                print(f"  {tool_name:<30} skipped: no such handler")
+                continue
+            error = is_error_result(handler.run_tool(copy.deepcopy(tool_args)))
+            if error:
+                print(f"  {tool_name:<30} skipped: {error}")
+                continue
+            results[f"{name}:{tool_name}:{label}:direct"] = bench_sync(
+                lambda: handler.run_tool(dict(tool_args)), args.warmup, args.min_time, args.max_rounds
+            )
+
+    if "mcp" in args.modes:
+        from mcp.shared.memory import create_connected_server_and_client_session
+
+        async with create_connected_server_and_client_session(module.app) as session:
+            for tool_name, label, tool_args in cases:
+                if tool_name not in module.tool_handlers:
+                    continue
+                if is_error_result(await session.call_tool(tool_name, copy.deepcopy(tool_args))):
+                    continue
+                results[f"{name}:{tool_name}:{label}:mcp"] = await bench_async(
+                    lambda: session.call_tool(tool_name, dict(tool_args)), args.warmup, args.min_time, args.max_rounds
+                )
+    return results
+
+
+def load_history(path: str, limit: int) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return runs[-limit:]
+
+
+def reference_for(key: str, baseline: Dict[str, float], history: List[Dict[str, Any]]) -> Tuple[Optional[float], str]:
+    if key in baseline:
+        return baseline[key], "baseline"
+    previous = [run["results"][key] for run in history if key in run.get("results", {})]
+    if previous:
+        return statistics.median(previous), f"history({len(previous)})"
+    return None, ""
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PYTHON_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the MCP servers' tool handlers")
+    parser.add_argument("--servers", nargs="*", default=list(Servers), choices=list(Servers))
+    parser.add_argument("--tools", nargs="*", default=None, help="only these tool names")
+    parser.add_argument("--modes", nargs="*", default=["direct", "mcp"], choices=["direct", "mcp"])
+    parser.add_argument("--matrix-size", type=int, default=256, help="n of the n x n NUMPY_MCP matrices")
+    parser.add_argument("--records", type=int, default=1000, help="rows returned by the mocked backends")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls per case")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds of timed calls per case")
+    parser.add_argument("--max-rounds", type=int, default=1000, help="timed calls per case at most")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed relative slowdown of the median")
+    parser.add_argument("--history-runs", type=int, default=5, help="recent runs used for cases without a baseline")
+    parser.add_argument("--history", default=HISTORY_FILE, help="history file, appended to after every run")
+    parser.add_argument("--no-history", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--update", action="store_true", help="write the measured medians as the new baseline")
+    parser.add_argument("--output", default=None, help="write the full results as JSON")
+    args = parser.parse_args()
+
+    baseline: Dict[str, float] = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+    elif not args.update:
+        print(f"No baseline at {BASELINE_FILE}, run with --update first to record one on this machine")
+    history = load_history(args.history, args.history_runs)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in args.servers:
+        target = Servers[name]
+        try:
+            module = load_server(name, target, args)
+        except Exception as err:
+            # servers are often missing their SDKs outside their own environment
+            print(f"{name:<14} skipped: {type(err).__name__}: {err}")
+            continue
+        cases = [case for case in target.cases(args) if args.tools is None or case[0] in args.tools]
+        print(f"{name}")
+        results.update(asyncio.run(run_server(name, module, cases, args)))
+
+    failed = False
+    print(f"\n{'case':<78} {'median':>10} {'stddev':>9} {'rounds':>7}  reference")
+    for key, stats in results.items():
+        reference, source = reference_for(key, baseline, history)
+        status = ""
+        if reference is not None:
+            change = stats["median_ms"] / reference - 1 if reference else 0.0
+            regressed = change > args.threshold
+            failed = failed or regressed
+            status = f"{source} {reference:.3f} ms {change:+.1%}{'  REGRESSION' if regressed else ''}"
+        print(f"{key:<78} {stats['median_ms']:>8.3f}ms {stats['stddev_ms']:>7.3f}ms {stats['rounds']:>7}  {status}")
+
+    medians = {key: stats["median_ms"] for key, stats in results.items()}
+    if not args.no_history and medians:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "matrix_size": args.matrix_size,
+                "records": args.records,
+                "results": medians
+            }) + "\n")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.update:
+        baseline.update(medians)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
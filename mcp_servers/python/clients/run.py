@@ -1,6 +1,7 @@
 from quart import Quart, request, jsonify, make_response, Response
 import json
 import asyncio
+import argparse
 import sys
 import os
 import logging
@@ -9,31 +10,27 @@ import hmac
 import hashlib
 import base64
 from typing import Optional, Dict, Any
-import pandas as pd
 from asyncio import Lock
 from hypercorn.asyncio import serve
 from hypercorn.config import Config
-from contextlib import AsyncExitStack
 
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.llm.azureopenai import azure_openai_processor
-from src.server_connection import initialize_all_mcp, MCPServers
+from src.server_connection import run_all_mcp, mcp_ready, MCPServers
+from src.mcp_broker import run_broker_client, run_workers
+from src.client_and_server_config import GatewayWorkersConfig
 from src.client_and_server_validation import client_and_server_validation
 from src.client_and_server_execution import client_and_server_execution
-import logging
+from src import metrics
+from src.structured_logging import setup_logging, log_payload
+from src.response_encoding import shape_response_data, negotiate_encoding, compress, compress_stream
+from src.client_and_server_config import ResponseConfig
+from quart.wrappers.response import DataBody
 
 
-# Configure clean logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Structured, queue-based logging, see LoggingConfig
+setup_logging()
 logger = logging.getLogger('api')
 
 app = Quart(__name__)
@@ -47,39 +44,76 @@ async def log_request_start():
 @app.after_request
 async def log_request_complete(response):
     request_time = time.time() - request.start_time
-    logger.info(f"{request.method} {request.path} - {response.status_code} - {request_time:.3f}s")
+    logger.info("request completed", extra={"fields": {
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "duration_seconds": round(request_time, 3)
+    }})
     return response
 
-app.mcp_exit_stack = None
-# Initialize the clients when the app starts
+# JSON response compression, streams are compressed where they are built
+@app.after_request
+async def compress_json_response(response):
+    if response.mimetype != "application/json" or response.content_encoding or not isinstance(response.response, DataBody):
+        return response
+    encoding = negotiate_encoding(request.accept_encodings)
+    response.vary.add("Accept-Encoding")
+    body = await response.get_data()
+    if encoding is None or len(body) < ResponseConfig["compression"]["min_size_bytes"]:
+        return response
+    response.set_data(compress(body, encoding))
+    response.content_encoding = encoding
+    return response
+
+app.mcp_task = None
+app.mcp_shutdown = None
+# Start the MCP servers when the app starts
 @app.before_serving
 async def startup():
     try:
-        app.mcp_exit_stack = AsyncExitStack()
-        await app.mcp_exit_stack.__aenter__()
-        print("\n✅ MCP servers initialization started.")
-        success = await initialize_all_mcp(app.mcp_exit_stack)
-        if success: 
-            print(f"\nAvailable servers: {list(MCPServers.keys())}")
-            print("\n✅ MCP servers initialized successfully.\n")
+        # Servers start concurrently in the background so the port is bound right
+        # away, /api/v1/mcp/ready reports when their tool catalogs are warm
+        app.mcp_shutdown = asyncio.Event()
+        broker_socket = os.environ.get("MCP_BROKER_SOCKET")
+        if broker_socket:
+            # multi-worker mode, the MCP servers run once in the broker process
+            app.mcp_task = asyncio.create_task(run_broker_client(broker_socket, app.mcp_shutdown))
         else:
-            print("\n❌ Failed to initialize MCP clients.")
+            app.mcp_task = asyncio.create_task(run_all_mcp(app.mcp_shutdown))
+        logger.info("MCP servers initialization started")
         
     except Exception as err:
-        print(f"Error initializing MCP clients =========>>>> {err}")
+        logger.error(f"Error initializing MCP clients: {err}")
+
+
+async def get_request_payload() -> Dict[str, Any]:
+    """Read the request payload: a JSON body, or a multipart form with the JSON
+    in a "payload" field and image uploads in "images" fields"""
+    if request.mimetype == "multipart/form-data":
+        form = await request.form
+        files = await request.files
+        data = json.loads(form.get("payload", "{}"))
+        images = [{"bytes": file.read(), "mime_type": file.mimetype or "image/jpeg"} for file in files.getlist("images")]
+        if images:
+            data.setdefault("client_details", {}).setdefault("images_arr", []).extend(images)
+        return data
+    return await request.get_json()
 
 
 @app.route("/api/v1/mcp/process_message", methods=["POST"])
 async def process_message():
     try:
-        data = await request.get_json()
+        data = await get_request_payload()
         
         # Set streaming to false
         if "client_details" in data:
             data["client_details"]["is_stream"] = False
         
         # Validation check
+        started = time.monotonic()
         validation_result = await client_and_server_validation(data, {"streamCallbacks": None, "is_stream": False})
+        metrics.observe("request_stage_seconds", time.monotonic() - started, stage="validation")
         if not validation_result["status"]:
             return jsonify({
                 "Data": None,
@@ -87,24 +121,24 @@ async def process_message():
                 "Status": False
             }), 200
             
-        print(f"\n✅ Validation Successful")
-        # print(validation_result)
-        print(f"\n✅ Execution Started")
+        logger.debug("Validation successful, execution started")
         
         # Execution
         generated_payload = validation_result["payload"]
+        started = time.monotonic()
         execution_response = await client_and_server_execution(generated_payload, {"streamCallbacks": None, "is_stream": False})
+        metrics.observe("request_stage_seconds", time.monotonic() - started, stage="execution")
         
-        print(f"\n✅ Execution Completed")
+        logger.debug("Execution completed")
         response_dict = {
-            "Data": execution_response.Data,
+            "Data": shape_response_data(execution_response.Data, generated_payload.get("verbosity")),
             "Error": execution_response.Error,
             "Status": execution_response.Status
         }
         return jsonify(response_dict), 200
     
     except Exception as error:
-        print(f"Error ========>>>>> {error}")
+        logger.exception(f"Error processing message: {error}")
         return jsonify({
             "Data": None,
             "Error": str(error),
@@ -134,7 +168,7 @@ class CustomStreamHandler:
     
     async def on_error(self, error: Exception):
         """Send error message and end the stream"""
-        print(f"Streaming Error: {error}")
+        logger.error(f"Streaming error: {error}")
         error_data = {"error": str(error)}
         await self.response_queue.put(f"data: {json.dumps(error_data)}\n\n")
         await self.response_queue.put(None)  # Signal end of stream
@@ -152,7 +186,7 @@ async def stream_generator(response_queue: asyncio.Queue):
             # Send keepalive or break on timeout
             break
         except Exception as e:
-            print(f"Stream generator error: {e}")
+            logger.error(f"Stream generator error: {e}")
             break
 
 @app.route('/api/v1/mcp/process_message_stream', methods=['POST'])
@@ -163,7 +197,7 @@ async def process_message_stream():
     
     try:
         # Get request data
-        data = await request.get_json()
+        data = await get_request_payload()
         if not data:
             data = {}
         
@@ -186,7 +220,9 @@ async def process_message_stream():
                 await custom_stream_handler.on_data(json.dumps(start_data))
                 
                 # =========================================== validation check start =============================================================
+                started = time.monotonic()
                 validation_result = await client_and_server_validation(data, {"streamCallbacks": custom_stream_handler, "is_stream": True})
+                metrics.observe("request_stage_seconds", time.monotonic() - started, stage="validation")
                 
                 if not validation_result.get('status', False):
                     error_data = {
@@ -203,12 +239,14 @@ async def process_message_stream():
                 
                 # =========================================== execution start ====================================================================
                 generated_payload = validation_result.get('payload')
+                started = time.monotonic()
                 execution_response = await client_and_server_execution(generated_payload, {"streamCallbacks": custom_stream_handler, "is_stream": True})
+                metrics.observe("request_stage_seconds", time.monotonic() - started, stage="execution")
                 # =========================================== execution end ======================================================================
-                print(f"\n✅ ------------------------" , execution_response.Data)
+                log_payload(logger, "Stream execution completed", execution_response.Data)
                 if not execution_response.Status:
                     error_data = {
-                        "Data": execution_response.Data,
+                        "Data": shape_response_data(execution_response.Data, generated_payload.get("verbosity")),
                         "Error": execution_response.Error,
                         "Status": False,
                         "StreamingStatus": "ERROR",
@@ -220,7 +258,7 @@ async def process_message_stream():
                 
                 # Send successful response
                 success_data = {
-                    "Data": execution_response.Data,
+                    "Data": shape_response_data(execution_response.Data, generated_payload.get("verbosity")),
                     "Error": execution_response.Error,
                     "Status": execution_response.Status,
                     "StreamingStatus": "IN-PROGRESS",
@@ -230,7 +268,7 @@ async def process_message_stream():
                 await custom_stream_handler.on_end()
                 
             except Exception as error:
-                print(f"Error ========>>>>> {error}")
+                logger.exception(f"Error processing message: {error}")
                 error_data = {
                     "Data": None,
                     "Error": str(error),
@@ -244,20 +282,23 @@ async def process_message_stream():
         # Start the response generation in the background
         asyncio.create_task(generate_response())
         
-        # Return streaming response
-        return Response(
-            stream_generator(response_queue),
-            mimetype='text/event-stream',
-            headers={
-                'Cache-Control': 'no-cache',
-                'Connection': 'keep-alive',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            }
-        )
+        # Return streaming response, compressed event by event when the client accepts it
+        headers = {
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Headers': 'Content-Type',
+            'Vary': 'Accept-Encoding'
+        }
+        body = stream_generator(response_queue)
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            body = compress_stream(body, encoding)
+        return Response(body, mimetype='text/event-stream', headers=headers)
         
     except Exception as error:
-        print(f"Error ========>>>>> {error}")
+        logger.exception(f"Error processing message: {error}")
         
         # Send error response immediately
         error_data = {
@@ -315,7 +356,8 @@ async def line_webhook():
         except json.JSONDecodeError:
             return jsonify({"error": "Invalid JSON"}), 400
         
-        logger.info(f"📱 LINE Webhook received: {webhook_data}")
+        logger.info("LINE webhook received", extra={"fields": {"events": len(webhook_data.get("events", []))}})
+        log_payload(logger, "LINE webhook payload", webhook_data)
         
         # Process each event
         events = webhook_data.get('events', [])
@@ -404,18 +446,41 @@ async def line_status():
         "example_webhook_url": "https://your-ngrok-url.ngrok.io/line/webhook"
     })
 
+@app.route("/api/v1/mcp/metrics", methods=["GET"])
+async def get_metrics():
+    """Get gateway metrics (LLM latencies, retries, failovers, hedges)"""
+    return jsonify(metrics.snapshot())
+
+@app.route("/api/v1/mcp/ready", methods=["GET"])
+async def get_readiness():
+    """Readiness probe, 200 once every MCP server started and its tool catalog is warm"""
+    ready = mcp_ready()
+    return jsonify({
+        "ready": ready,
+        "mcp_servers": list(MCPServers.keys())
+    }), 200 if ready else 503
+
 @app.after_serving
 async def shutdown():
-    if app.mcp_exit_stack:
-        await app.mcp_exit_stack.__aexit__(None, None, None)
-        app.mcp_exit_stack = None
-        print("\n✅ MCP servers cleaned up on shutdown.\n")
+    if app.mcp_task:
+        app.mcp_shutdown.set()
+        await app.mcp_task
+        app.mcp_task = None
+        logger.info("MCP servers cleaned up on shutdown")
     
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MCP client gateway")
+    parser.add_argument("--port", type=int, default=5001, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=GatewayWorkersConfig["workers"], help="number of worker processes sharing one MCP broker")
+    cli_args = parser.parse_args()
+
     # Create a config instance
     config = Config()
     # Configure bind address and port 
-    config.bind = [f"0.0.0.0:5001"]
+    config.bind = [f"0.0.0.0:{cli_args.port}"]
+
+    server_url = f"http://0.0.0.0:{cli_args.port}"
+    status_url = f"http://localhost:{cli_args.port}/line/status"
 
     # Print welcome banner
     print("╔═══════════════════════════════════════════════════════════════════════════════════════════╗")
@@ -424,16 +489,18 @@ if __name__ == "__main__":
     print("║                                                                                           ║")
     print("║  🎉 Welcome to the MCP(Model Context Protocol) Server Integration Hackathon 2k25 !! 🎉    ║")
     print("║                                                                                           ║")
-    print("║  ✅ MCP Server running on http://0.0.0.0:5001 ✅                                          ║")
+    print(f"║  ✅ MCP Server running on {server_url:<20} ✅                                         ║")
     print("║  📱 LINE Webhook endpoint: /line/webhook                                                 ║")
-    print("║  🔗 Webhook status: http://localhost:5001/line/status                                     ║")
+    print(f"║  🔗 Webhook status: {status_url:<34}                                    ║")
     print("║                                                                                           ║")
     print("║  💡 To get your webhook URL:                                                              ║")
     print("║     1. Install ngrok: npm install -g ngrok                                               ║")
-    print("║     2. Run: ngrok http 5001                                                               ║")
+    print(f"║     2. Run: ngrok http {cli_args.port:<5}                                                              ║")
     print("║     3. Copy HTTPS URL + /line/webhook                                                     ║")
     print("║                                                                                           ║") 
     print("╚═══════════════════════════════════════════════════════════════════════════════════════════╝")
 
     # Start the Quart app
+    if cli_args.workers > 1:
+        sys.exit(run_workers(config, cli_args.workers, f"{os.path.abspath(__file__)}:app"))
     asyncio.run(serve(app, config))
@@ -4,6 +4,10 @@ ClientsConfig = [
     "MCP_CLIENT_GEMINI"
 ]
 
+# "credential_handles": the server resolves an opaque __credentials_handle__ to
+# credentials registered earlier in the session, so they are sent only once
+# "caller_namespaces": the server keeps state per handle (e.g. NUMPY_MCP stored
+# arrays), the handle is always derived from the caller's identity
 ServersConfig = [
     {
         "server_name": "MCP-GSUITE",
@@ -13,28 +17,33 @@ ServersConfig = [
             "mcp_servers/python/servers/MCP-GSUITE/mcp-gsuite",
             "run",
             "mcp-gsuite"
-        ]
+        ],
+        "credential_handles": True
     },
     {
         "server_name": "NUMPY_MCP",
         "command": "python",
         "args": [
             "mcp_servers/python/servers/NUMPY_MCP/mcp_numpy.py"
-        ]
+        ],
+        "credential_handles": True,
+        "caller_namespaces": True
     },
     {
         "server_name": "NEO4J_MCP",
         "command": "python",
         "args": [
             "mcp_servers/python/servers/NEO4J_MCP/mcp_neo4j.py"
-        ]
+        ],
+        "credential_handles": True
     },
     {
         "server_name": "LINE_MCP",
         "command": "python",
         "args": [
             "mcp_servers/python/servers/LINE_MCP/line_mcp.py"
-        ]
+        ],
+        "credential_handles": True
     },
     {
         "server_name": "ASTERISK_MCP",
@@ -51,3 +60,211 @@ ServersConfig = [
         ]
     }
 ]
+
+
+# Response format family of every client. Failover and hedging only route
+# between clients of the same family, because the execution loop parses the
+# provider response shape directly.
+ClientResponseFormats = {
+    "MCP_CLIENT_AZURE_AI": "openai",
+    "MCP_CLIENT_OPENAI": "openai",
+    "MCP_CLIENT_GEMINI": "gemini"
+}
+
+# Defaults for the optional "routing_policy" request field. Any key can be
+# overridden per request, e.g.
+#   "routing_policy": {
+#       "fallback_clients": [
+#           {"selected_client": "MCP_CLIENT_OPENAI", "client_details": {"api_key": "...", "chat_model": "gpt-4o"}}
+#       ],
+#       "hedge_after_percentile": 95
+#   }
+RoutingPolicyConfig = {
+    "max_retries": 2,
+    "backoff_base_seconds": 0.5,
+    "backoff_max_seconds": 8.0,
+    "retry_status_codes": [408, 429, 500, 502, 503, 504],
+    "fallback_clients": [],
+    "hedge_after_percentile": None,
+    "hedge_min_samples": 20
+}
+
+# Client-side rate limiting per (client, api_key, model). Limits are the
+# starting capacities of the request and token buckets; they are adapted from
+# the provider's x-ratelimit-* response headers once those are seen. A limit
+# of None means unlimited until the provider reports one.
+RateLimitConfig = {
+    "enabled": True,
+    "max_requeues": 3,
+    "default_limits": {
+        "MCP_CLIENT_AZURE_AI": {"requests_per_minute": 300, "tokens_per_minute": 60000},
+        "MCP_CLIENT_OPENAI": {"requests_per_minute": 500, "tokens_per_minute": 30000},
+        "MCP_CLIENT_GEMINI": {"requests_per_minute": 15, "tokens_per_minute": 1000000}
+    },
+    # Per model overrides, keyed by "<client>:<model>"
+    "model_limits": {}
+}
+
+# Image inputs (images_arr). Images above max_image_bytes or max_dimension are
+# downsized before upload when Pillow is installed; encodings are cached by
+# content hash up to cache_max_bytes. Remote images (inlined for Gemini) are
+# only fetched from public http(s) hosts, up to max_image_bytes, following at
+# most fetch_max_redirects redirects; the last remote_url_cache_entries URLs
+# are remembered so they are downloaded once.
+ImageInputConfig = {
+    "max_image_bytes": 4 * 1024 * 1024,
+    "max_dimension": 2048,
+    "cache_max_bytes": 64 * 1024 * 1024,
+    "fetch_timeout_seconds": 20,
+    "fetch_max_redirects": 3,
+    "remote_url_cache_entries": 1024,
+    "openai_detail": "auto"
+}
+
+# NUMPY_MCP computations: cached reads, writes when called with store_as or output_file
+_NUMPY_READ = {"read_only": True, "cache_ttl_seconds": 3600, "file_keys": ["file"], "write_args": ["store_as", "output_file"], "hidden_args": ["response_encoding"], "ordered": True}
+# NUMPY_MCP reads of files in the data directory, never cached
+_NUMPY_FILE_READ = {"read_only": True, "write_args": ["store_as", "output_file"], "hidden_args": ["response_encoding"], "ordered": True}
+
+# Behaviour hints per server tool, merged with the MCP tool annotations
+# (readOnlyHint / idempotentHint) the servers report. Tools not listed here
+# are treated as writes. Read-only tools with a cache_ttl_seconds have their
+# results cached by the gateway; any write tool on the same server invalidates
+# that server's cached results. A read-only tool called with one of its
+# write_args is a write for that call (e.g. NUMPY_MCP store_as or
+# output_file), and "ordered" reads depend on server state, so they run after
+# the writes the LLM produced before them and are never started speculatively.
+# Results of a call passing an object with one of the tool's file_keys (e.g.
+# NUMPY_MCP {"file": "a.npy"}) depend on the file's current contents and are
+# never cached. Reads are idempotent unless configured with "idempotent":
+# False, identical calls in flight then run separately, except with one of
+# their idempotent_args set (e.g. a seed). hidden_args are left out of the
+# tool schemas shown to the LLM (e.g. NUMPY_MCP response_encoding, whose
+# binary payloads the LLM never sees).
+ToolsMetadataConfig = {
+    "MCP-GSUITE": {
+        "list_calendars": {"read_only": True, "cache_ttl_seconds": 300},
+        "get_calendar_events": {"read_only": True},
+        "check_calendar_availability": {"read_only": True},
+        "query_gmail_emails": {"read_only": True},
+        "get_gmail_email": {"read_only": True, "cache_ttl_seconds": 300},
+        "bulk_get_gmail_emails": {"read_only": True},
+        "get_all_meet_meetings": {"read_only": True}
+    },
+    "NUMPY_MCP": {
+        "matrix_add": _NUMPY_READ,
+        "matrix_multiply": _NUMPY_READ,
+        "matrix_subtract": _NUMPY_READ,
+        "element_wise_multiply": _NUMPY_READ,
+        "dot_product": _NUMPY_READ,
+        "matrix_transpose": _NUMPY_READ,
+        "matrix_inverse": _NUMPY_READ,
+        "matrix_determinant": {"read_only": True, "cache_ttl_seconds": 3600, "file_keys": ["file"], "ordered": True},
+        "solve_linear_system": _NUMPY_READ,
+        "eigenvalues_eigenvectors": _NUMPY_READ,
+        "sparse_eigenvalues": _NUMPY_READ,
+        "blocked_matmul": _NUMPY_FILE_READ,
+        "blocked_transpose": _NUMPY_FILE_READ,
+        "blocked_reduce": _NUMPY_FILE_READ,
+        "descriptive_statistics": _NUMPY_FILE_READ,
+        "accumulate_statistics": {"read_only": False, "hidden_args": ["response_encoding"]},
+        # unseeded calls return new numbers every time
+        "random_numbers": {"read_only": True, "idempotent": False, "idempotent_args": ["seed"], "write_args": ["store_as", "output_file"], "hidden_args": ["response_encoding"]},
+        "numerical_derivative": _NUMPY_READ,
+        "singular_value_decomposition": _NUMPY_READ,
+        "qr_decomposition": _NUMPY_READ,
+        "matrix_power": _NUMPY_READ,
+        "fast_fourier_transform": _NUMPY_READ,
+        "convolve": _NUMPY_READ,
+        "correlate": _NUMPY_READ,
+        "polynomial_roots": _NUMPY_READ,
+        "matrix_reshape": _NUMPY_READ,
+        "evaluate_pipeline": _NUMPY_READ,
+        "store_array": {"read_only": False},
+        "get_array": {"read_only": True, "hidden_args": ["response_encoding"], "ordered": True},
+        "list_arrays": {"read_only": True, "ordered": True},
+        "free_array": {"read_only": False}
+    },
+    "NEO4J_MCP": {
+        "get_database_info": {"read_only": True, "cache_ttl_seconds": 30},
+        "list_constraints": {"read_only": True, "cache_ttl_seconds": 300},
+        "list_indexes": {"read_only": True, "cache_ttl_seconds": 300},
+        "list_labels": {"read_only": True, "cache_ttl_seconds": 300},
+        "find_nodes": {"read_only": True},
+        "find_relationships": {"read_only": True},
+        "shortest_path": {"read_only": True},
+        "get_neighbors": {"read_only": True},
+        "explain_query": {"read_only": True}
+    },
+    "LINE_MCP": {
+        "get_user_profile": {"read_only": True, "cache_ttl_seconds": 300},
+        "get_group_summary": {"read_only": True, "cache_ttl_seconds": 300}
+    },
+    "ASTERISK_MCP": {
+        "get_active_calls": {"read_only": True},
+        "get_call_history": {"read_only": True},
+        "list_extensions": {"read_only": True, "cache_ttl_seconds": 60},
+        "get_extension_status": {"read_only": True},
+        "get_voicemails": {"read_only": True},
+        "get_asterisk_status": {"read_only": True}
+    },
+    "DAVINCI_MCP": {
+        "get_project_list": {"read_only": True, "cache_ttl_seconds": 30},
+        "get_current_project": {"read_only": True},
+        "list_timelines": {"read_only": True},
+        "list_media_pool_items": {"read_only": True},
+        "list_timeline_markers": {"read_only": True},
+        "list_render_jobs": {"read_only": True}
+    }
+}
+
+# Gateway-side cache of read-only tool results
+ToolResultCacheConfig = {
+    "enabled": True,
+    "max_entries": 1024
+}
+
+# Multi-worker deployment, started with `python run.py --workers N`. The MCP
+# servers then run once, in a broker process the workers reach over a unix
+# socket, read-only tool results are shared through a SQLite file and the
+# client-side rate limits are split evenly between the workers.
+GatewayWorkersConfig = {
+    "workers": 1,
+    "broker_socket_path": "/tmp/mcp_gateway_broker.sock",
+    "shared_cache_path": "/tmp/mcp_gateway_tool_cache.sqlite3"
+}
+
+# Gateway logging. Records are formatted as JSON lines ("format": "text" for
+# plain lines) and written by a background thread, request handlers only
+# enqueue them and records are dropped when the queue is full. Payloads
+# (requests, LLM and tool results) are only logged at DEBUG, truncated to
+# payload_max_chars, and those larger than that only for a payload_sample_rate
+# fraction of requests.
+LoggingConfig = {
+    "level": "INFO",
+    "format": "json",
+    "queue_size": 10000,
+    "payload_max_chars": 2048,
+    "payload_sample_rate": 0.01,
+    # Per logger levels, e.g. {"src.client_and_server_execution": "DEBUG"}
+    "module_levels": {
+        "httpx": "WARNING",
+        "mcp": "WARNING"
+    }
+}
+
+# Response shaping and compression. "verbosity" in the request payload picks
+# what execution Data is returned: "minimal" (messages, output type, token
+# counts), "standard" (plus executed tool calls) or "debug" (plus the raw
+# provider responses). JSON bodies of at least min_size_bytes and SSE streams
+# are compressed when the client sends Accept-Encoding, brotli is used only
+# when the optional `brotli` package is installed.
+ResponseConfig = {
+    "default_verbosity": "standard",
+    "compression": {
+        "enabled": True,
+        "min_size_bytes": 1024,
+        "gzip_level": 6,
+        "brotli_quality": 5
+    }
+}
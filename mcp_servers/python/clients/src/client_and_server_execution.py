@@ -1,12 +1,20 @@
+import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Assuming these are your imported modules/classes for MCP clients and Azure LLM calls
-from src.llm.azureopenai import azure_openai_processor  # your async LLM call function
-from src.llm.openai import openai_processor  # your async LLM call function
+from src.llm.router import route_llm_call  # retries, failover and hedging across LLM clients
 from src.server_connection import MCPServers  # MCP clients dict or class with call_tool method
-from src.llm.gemini import gemini_processor 
+from src.tool_speculation import ToolSpeculation
+from src.tool_catalog import CREDENTIAL_ARGS, get_tool_metadata, is_idempotent_call, is_write_call, json_safe, reads_files
+from src.tool_routing import resolve_tool
+from src import metrics
+from src import tool_result_cache
+from src import credential_handles
+from src.tool_call_coalescing import coalesce_tool_call
 
 
 class ClientAndServerExecutionResponse:
@@ -27,14 +35,18 @@ class ClientAndServerExecutionResponse:
 
 
 async def client_and_server_execution(payload: Dict[str, Any], streaming_callback: Optional[Any] = None) -> ClientAndServerExecutionResponse:
+    speculation = None
     try:
         result = ClientAndServerExecutionResponse()
 
-        selected_server_credentials = payload.get("selected_server_credentials")
         client_details = payload.get("client_details", {})
+        selected_server_credentials = credential_handles.with_caller_namespaces(payload.get("selected_server_credentials"), client_details)
         selected_client = payload.get("selected_client", "")
         selected_servers = payload.get("selected_servers", [])
-        selected_server = selected_servers[0] if selected_servers else ""
+        # LLM-facing tool name -> (server, tool name on that server)
+        route_tool = partial(resolve_tool, payload.get("tool_index") or {}, default_server=selected_servers[0] if selected_servers else "")
+        routing_policy = payload.get("routing_policy")
+        speculation = ToolSpeculation(route_tool, selected_server_credentials, call_and_execute_tool, enabled=bool(payload.get("speculative_tools")))
 
         # Prepare chat history
         input_content = client_details.get("input", "")
@@ -55,7 +67,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
             })
 
         tools_getting_agent_prompt = f"""
-        You are an {selected_server} AI assistant that analyzes user requests and determines the require tool calls from available tools.
+        You are an {", ".join(selected_servers)} AI assistant that analyzes user requests and determines the require tool calls from available tools.
         Available tools: {json.dumps(tool_call_details_arr)}
         Analyze each request to determine if it matches available tool capabilities or needs clarification.
         Return TRUE for tool calls when the request clearly maps to available tools without checking the required parameters.
@@ -72,7 +84,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
         if selected_client == "MCP_CLIENT_AZURE_AI":
 
             # Initial LLM call
-            initial_llm_response = await azure_openai_processor(client_details)
+            initial_llm_response = await route_llm_call("MCP_CLIENT_AZURE_AI", client_details, routing_policy)
             if not initial_llm_response.Status:
                 result.Error = initial_llm_response.Error
                 result.Status = initial_llm_response.Status
@@ -107,11 +119,13 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
 
                 client_details["prompt"] = temp_prompt
                 client_details["tools"] = final_tool_calls
+                # Start read-only tools that need no arguments while the LLM produces the call
+                speculation.start(selected_tools)
                 
 
                 # Loop to handle multiple LLM calls and tool executions
                 while True:
-                    response = await azure_openai_processor(client_details)
+                    response = await route_llm_call("MCP_CLIENT_AZURE_AI", client_details, routing_policy)
                     if not response.Status:
                         result.Error = response.Error
                         result.Status = response.Status
@@ -159,6 +173,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                             "Action": "NOTIFICATION"
                         }))
 
+                    tool_calls = []
                     for tool in response.Data.get("final_llm_response", {}).get("choices", [{}])[0].get("message", {}).get("tool_calls", []):
                         
                         tool_name = tool.get("function", {}).get("name")
@@ -167,18 +182,22 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
 
                         if streaming_callback and streaming_callback.get("is_stream"):
                             await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                "Data": f"{selected_server} MCP server {tool_name} call initiated",
+                                "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call initiated",
                                 "Error": None,
                                 "Status": True,
                                 "StreamingStatus": "IN-PROGRESS",
                                 "Action": "NOTIFICATION"
                             }))
 
-                        tool_call_result = await call_and_execute_tool(selected_server, selected_server_credentials, tool_name, args)
+                        tool_calls.append((tool, tool_name, args))
 
+                    # Tool calls of one turn run concurrently, across servers
+                    tool_call_results = await execute_tool_calls(speculation, route_tool, tool_calls)
+
+                    for (tool, tool_name, args), tool_call_result in zip(tool_calls, tool_call_results):
                         if streaming_callback and streaming_callback.get("is_stream"):
                             await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                "Data": f"{selected_server} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
+                                "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
                                 "Error": None,
                                 "Status": True,
                                 "StreamingStatus": "IN-PROGRESS",
@@ -188,6 +207,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                         result.Data["executed_tool_calls"].append({
                             "id": tool.get("id"),
                             "name": tool_name,
+                            "server": route_tool(tool_name)[0],
                             "arguments": args,
                             "result": tool_call_result,
                         })
@@ -203,7 +223,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                 client_details["prompt"] = f"{temp_prompt}. Available tools: {json.dumps(tool_call_details_arr)}"
                 client_details["tools"] = []
 
-                normal_response = await azure_openai_processor(client_details)
+                normal_response = await route_llm_call("MCP_CLIENT_AZURE_AI", client_details, routing_policy)
                 result.Data["total_llm_calls"] += 1
                 result.Data["total_tokens"] += normal_response.Data.get("total_tokens", 0)
                 result.Data["total_input_tokens"] += normal_response.Data.get("total_input_tokens", 0)
@@ -243,7 +263,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                     client_details["tools"] = final_tool_calls
 
                     while True:
-                        response = await azure_openai_processor(client_details)
+                        response = await route_llm_call("MCP_CLIENT_AZURE_AI", client_details, routing_policy)
                         if not response.Status:
                             result.Error = response.Error
                             result.Status = response.Status
@@ -282,24 +302,29 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                                 "Action": "NOTIFICATION"
                             }))
 
+                        tool_calls = []
                         for tool in response.Data.get("final_llm_response", {}).get("choices", [{}])[0].get("message", {}).get("tool_calls", []):
                             tool_name = tool.get("function", {}).get("name")
                             args = json.loads(tool.get("function", {}).get("arguments", "{}"))
 
                             if streaming_callback and streaming_callback.get("is_stream"):
                                 await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                    "Data": f"{selected_server} MCP server {tool_name} call initiated",
+                                    "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call initiated",
                                     "Error": None,
                                     "Status": True,
                                     "StreamingStatus": "IN-PROGRESS",
                                     "Action": "NOTIFICATION"
                                 }))
 
-                            tool_call_result = await call_and_execute_tool(selected_server, selected_server_credentials, tool_name, args)
+                            tool_calls.append((tool, tool_name, args))
+
+                        # Tool calls of one turn run concurrently, across servers
+                        tool_call_results = await execute_tool_calls(speculation, route_tool, tool_calls)
 
+                        for (tool, tool_name, args), tool_call_result in zip(tool_calls, tool_call_results):
                             if streaming_callback and streaming_callback.get("is_stream"):
                                 await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                    "Data": f"{selected_server} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
+                                    "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
                                     "Error": None,
                                     "Status": True,
                                     "StreamingStatus": "IN-PROGRESS",
@@ -309,6 +334,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                             result.Data["executed_tool_calls"].append({
                                 "id": tool.get("id"),
                                 "name": tool_name,
+                                "server": route_tool(tool_name)[0],
                                 "arguments": args,
                                 "result": tool_call_result,
                             })
@@ -322,7 +348,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
         elif selected_client == "MCP_CLIENT_OPENAI":
 
             # Initial LLM call
-            initial_llm_response = await openai_processor(client_details)
+            initial_llm_response = await route_llm_call("MCP_CLIENT_OPENAI", client_details, routing_policy)
             if not initial_llm_response.Status:
                 result.Error = initial_llm_response.Error
                 result.Status = initial_llm_response.Status
@@ -357,11 +383,13 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
 
                 client_details["prompt"] = temp_prompt
                 client_details["tools"] = final_tool_calls
+                # Start read-only tools that need no arguments while the LLM produces the call
+                speculation.start(selected_tools)
                 
 
                 # Loop to handle multiple LLM calls and tool executions
                 while True:
-                    response = await openai_processor(client_details)
+                    response = await route_llm_call("MCP_CLIENT_OPENAI", client_details, routing_policy)
                     if not response.Status:
                         result.Error = response.Error
                         result.Status = response.Status
@@ -400,6 +428,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                             "Action": "NOTIFICATION"
                         }))
 
+                    tool_calls = []
                     for tool in response.Data.get("final_llm_response", {}).get("choices", [{}])[0].get("message", {}).get("tool_calls", []):
                         
                         tool_name = tool.get("function", {}).get("name")
@@ -408,18 +437,22 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
 
                         if streaming_callback and streaming_callback.get("is_stream"):
                             await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                "Data": f"{selected_server} MCP server {tool_name} call initiated",
+                                "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call initiated",
                                 "Error": None,
                                 "Status": True,
                                 "StreamingStatus": "IN-PROGRESS",
                                 "Action": "NOTIFICATION"
                             }))
 
-                        tool_call_result = await call_and_execute_tool(selected_server, selected_server_credentials, tool_name, args)
+                        tool_calls.append((tool, tool_name, args))
+
+                    # Tool calls of one turn run concurrently, across servers
+                    tool_call_results = await execute_tool_calls(speculation, route_tool, tool_calls)
 
+                    for (tool, tool_name, args), tool_call_result in zip(tool_calls, tool_call_results):
                         if streaming_callback and streaming_callback.get("is_stream"):
                             await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                "Data": f"{selected_server} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
+                                "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
                                 "Error": None,
                                 "Status": True,
                                 "StreamingStatus": "IN-PROGRESS",
@@ -429,6 +462,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                         result.Data["executed_tool_calls"].append({
                             "id": tool.get("id"),
                             "name": tool_name,
+                            "server": route_tool(tool_name)[0],
                             "arguments": args,
                             "result": tool_call_result,
                         })
@@ -444,7 +478,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                 client_details["prompt"] = f"{temp_prompt}. Available tools: {json.dumps(tool_call_details_arr)}"
                 client_details["tools"] = []
 
-                normal_response = await openai_processor(client_details)
+                normal_response = await route_llm_call("MCP_CLIENT_OPENAI", client_details, routing_policy)
                 result.Data["total_llm_calls"] += 1
                 result.Data["total_tokens"] += normal_response.Data.get("total_tokens", 0)
                 result.Data["total_input_tokens"] += normal_response.Data.get("total_input_tokens", 0)
@@ -484,7 +518,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                     client_details["tools"] = final_tool_calls
 
                     while True:
-                        response = await openai_processor(client_details)
+                        response = await route_llm_call("MCP_CLIENT_OPENAI", client_details, routing_policy)
                         if not response.Status:
                             result.Error = response.Error
                             result.Status = response.Status
@@ -523,24 +557,29 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                                 "Action": "NOTIFICATION"
                             }))
 
+                        tool_calls = []
                         for tool in response.Data.get("final_llm_response", {}).get("choices", [{}])[0].get("message", {}).get("tool_calls", []):
                             tool_name = tool.get("function", {}).get("name")
                             args = json.loads(tool.get("function", {}).get("arguments", "{}"))
 
                             if streaming_callback and streaming_callback.get("is_stream"):
                                 await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                    "Data": f"{selected_server} MCP server {tool_name} call initiated",
+                                    "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call initiated",
                                     "Error": None,
                                     "Status": True,
                                     "StreamingStatus": "IN-PROGRESS",
                                     "Action": "NOTIFICATION"
                                 }))
 
-                            tool_call_result = await call_and_execute_tool(selected_server, selected_server_credentials, tool_name, args)
+                            tool_calls.append((tool, tool_name, args))
 
+                        # Tool calls of one turn run concurrently, across servers
+                        tool_call_results = await execute_tool_calls(speculation, route_tool, tool_calls)
+
+                        for (tool, tool_name, args), tool_call_result in zip(tool_calls, tool_call_results):
                             if streaming_callback and streaming_callback.get("is_stream"):
                                 await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                    "Data": f"{selected_server} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
+                                    "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
                                     "Error": None,
                                     "Status": True,
                                     "StreamingStatus": "IN-PROGRESS",
@@ -550,6 +589,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                             result.Data["executed_tool_calls"].append({
                                 "id": tool.get("id"),
                                 "name": tool_name,
+                                "server": route_tool(tool_name)[0],
                                 "arguments": args,
                                 "result": tool_call_result,
                             })
@@ -563,8 +603,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
         elif selected_client == "MCP_CLIENT_GEMINI":
 
             # Initial LLM call
-            initial_llm_response = await gemini_processor(client_details)
-            print("Initial LLM response:", initial_llm_response)
+            initial_llm_response = await route_llm_call("MCP_CLIENT_GEMINI", client_details, routing_policy)
             if not initial_llm_response.Status:
                 result.Error = initial_llm_response.Error
                 result.Status = initial_llm_response.Status
@@ -599,6 +638,8 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
 
                 client_details["prompt"] = temp_prompt
                 client_details["tools"] = final_tool_calls
+                # Start read-only tools that need no arguments while the LLM produces the call
+                speculation.start(selected_tools)
              
 
                 # Loop to handle multiple LLM calls and tool executions
@@ -612,8 +653,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                     if count != 1:
                          client_details["tools"] = []
                     
-                    response = await gemini_processor(client_details)
-                    print(response)
+                    response = await route_llm_call("MCP_CLIENT_GEMINI", client_details, routing_policy)
                     if not response.Status:
                         result.Error = response.Error
                         result.Status = response.Status
@@ -661,6 +701,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                             "Action": "NOTIFICATION"
                         }))
 
+                    tool_calls = []
                     for tool in parts:
                         # Only process if this part contains a function call
                         if "functionCall" not in tool:
@@ -683,18 +724,22 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
 
                         if streaming_callback and streaming_callback.get("is_stream"):
                             await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                "Data": f"{selected_server} MCP server {tool_name} call initiated",
+                                "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call initiated",
                                 "Error": None,
                                 "Status": True,
                                 "StreamingStatus": "IN-PROGRESS",
                                 "Action": "NOTIFICATION"
                             }))
 
-                        tool_call_result = await call_and_execute_tool(selected_server, selected_server_credentials, tool_name, args)
+                        tool_calls.append((tool, tool_name, args))
+
+                    # Tool calls of one turn run concurrently, across servers
+                    tool_call_results = await execute_tool_calls(speculation, route_tool, tool_calls)
 
+                    for (tool, tool_name, args), tool_call_result in zip(tool_calls, tool_call_results):
                         if streaming_callback and streaming_callback.get("is_stream"):
                             await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                "Data": f"{selected_server} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
+                                "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
                                 "Error": None,
                                 "Status": True,
                                 "StreamingStatus": "IN-PROGRESS",
@@ -705,6 +750,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                         result.Data["executed_tool_calls"].append({
                             "id": tool.get("id"),
                             "name": tool_name,
+                            "server": route_tool(tool_name)[0],
                             "arguments": args,
                             "result": tool_call_result,
                         })
@@ -721,7 +767,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                 client_details["prompt"] = f"{temp_prompt}. Available tools: {json.dumps(tool_call_details_arr)}"
                 client_details["tools"] = []
 
-                normal_response = await gemini_processor(client_details)
+                normal_response = await route_llm_call("MCP_CLIENT_GEMINI", client_details, routing_policy)
                 result.Data["total_llm_calls"] += 1
                 result.Data["total_tokens"] += normal_response.Data.get("total_tokens", 0)
                 result.Data["total_input_tokens"] += normal_response.Data.get("total_input_tokens", 0)
@@ -777,7 +823,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                         if count != 1:
                             client_details["tools"] = []
 
-                        response = await gemini_processor(client_details)
+                        response = await route_llm_call("MCP_CLIENT_GEMINI", client_details, routing_policy)
                         if not response.Status:
                             result.Error = response.Error
                             result.Status = response.Status
@@ -822,6 +868,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                         content = first_candidate.get("content", {}) if isinstance(first_candidate, dict) else {}
                         parts = content.get("parts", []) if isinstance(content, dict) else []
 
+                        tool_calls = []
                         for tool in parts:
                             # Only process if this part contains a function call
                             if "functionCall" not in tool:
@@ -844,18 +891,22 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
 
                             if streaming_callback and streaming_callback.get("is_stream"):
                                 await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                    "Data": f"{selected_server} MCP server {tool_name} call initiated",
+                                    "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call initiated",
                                     "Error": None,
                                     "Status": True,
                                     "StreamingStatus": "IN-PROGRESS",
                                     "Action": "NOTIFICATION"
                                 }))
 
-                            tool_call_result = await call_and_execute_tool(selected_server, selected_server_credentials, tool_name, args)
+                            tool_calls.append((tool, tool_name, args))
 
+                        # Tool calls of one turn run concurrently, across servers
+                        tool_call_results = await execute_tool_calls(speculation, route_tool, tool_calls)
+
+                        for (tool, tool_name, args), tool_call_result in zip(tool_calls, tool_call_results):
                             if streaming_callback and streaming_callback.get("is_stream"):
                                 await streaming_callback["streamCallbacks"].on_data(json.dumps({
-                                    "Data": f"{selected_server} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
+                                    "Data": f"{route_tool(tool_name)[0]} MCP server {tool_name} call result  : {json.dumps(tool_call_result)}",
                                     "Error": None,
                                     "Status": True,
                                     "StreamingStatus": "IN-PROGRESS",
@@ -866,6 +917,7 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
                             result.Data["executed_tool_calls"].append({
                                 "id": tool.get("id"),
                                 "name": tool_name,
+                                "server": route_tool(tool_name)[0],
                                 "arguments": args,
                                 "result": tool_call_result,
                             })
@@ -888,6 +940,10 @@ async def client_and_server_execution(payload: Dict[str, Any], streaming_callbac
         res.Status = False
         return res
 
+    finally:
+        if speculation:
+            speculation.cancel_pending()
+
 
 def extract_data_from_response(message: Any) -> Dict[str, Any]:
 
@@ -916,6 +972,41 @@ def extract_data_from_response(message: Any) -> Dict[str, Any]:
     }
 
 
+async def execute_tool_calls(
+    speculation: ToolSpeculation,
+    route_tool: Callable[[str], Tuple[str, str]],
+    tool_calls: List[Tuple[Any, str, Dict[str, Any]]]
+) -> List[Any]:
+    """Run the tool calls of one LLM turn concurrently and return the results in
+       call order. Writes to the same server still run in the order the LLM
+       produced them, reads and calls to other servers never wait for them."""
+    last_write: Dict[str, asyncio.Task] = {}
+
+    async def run_after(previous: Optional[asyncio.Task], tool_name: str, args: Dict[str, Any]) -> Any:
+        if previous is not None:
+            await asyncio.wait({previous})
+        return await speculation.execute(tool_name, args)
+
+    tasks = []
+    for _, tool_name, args in tool_calls:
+        server, server_tool_name = route_tool(tool_name)
+        metadata = get_tool_metadata(server, server_tool_name)
+        if is_write_call(metadata, args):
+            task = asyncio.create_task(run_after(last_write.get(server), tool_name, args))
+            last_write[server] = task
+        elif metadata.get("ordered"):
+            task = asyncio.create_task(run_after(last_write.get(server), tool_name, args))
+        else:
+            task = asyncio.create_task(run_after(None, tool_name, args))
+        tasks.append(task)
+
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 async def call_and_execute_tool(
     selected_server: str,
     credentials: Any,
@@ -923,13 +1014,50 @@ async def call_and_execute_tool(
     args: Dict[str, Any]
 ) -> Any:
     """Call the MCP client tool with args and credentials, with JS-style try/catch
-       and JSON-serializable output fallback."""
+       and JSON-serializable output fallback. Read-only calls are served from the
+       gateway cache when possible and identical concurrent ones share one call."""
     if selected_server not in MCPServers:
         raise ValueError(f"Server {selected_server} not found in MCPServers")
     
     # pull per-server creds, defaulting to {}
     creds = credentials.get(selected_server, {})
 
+    metadata = get_tool_metadata(selected_server, tool_name)
+    if is_write_call(metadata, args):
+        tool_call_result = await execute_mcp_tool(selected_server, creds, tool_name, args)
+        # a write may have changed anything this server returned before
+        tool_result_cache.invalidate_server(selected_server)
+        return tool_call_result
+
+    # reads returning a new result on every call (unseeded random numbers) are never shared
+    if not is_idempotent_call(metadata, args):
+        return await execute_mcp_tool(selected_server, creds, tool_name, args)
+
+    # serve repeated read-only calls from the gateway cache
+    call_key = tool_result_cache.tool_call_key(selected_server, tool_name, args, creds)
+    # results read from files go stale when the file changes
+    cacheable = tool_result_cache.is_cacheable(metadata) and not reads_files(metadata, args)
+    if cacheable:
+        hit, cached_result = tool_result_cache.get(call_key)
+        if hit:
+            return cached_result
+
+    async def execute_and_cache():
+        tool_call_result = await execute_mcp_tool(selected_server, creds, tool_name, args)
+        if cacheable and tool_result_cache.is_successful_result(tool_call_result):
+            tool_result_cache.put(call_key, tool_call_result, metadata["cache_ttl_seconds"])
+        return tool_call_result
+
+    # identical read-only calls already in flight share one MCP round-trip
+    return await coalesce_tool_call(call_key, execute_and_cache)
+
+
+async def execute_mcp_tool(selected_server: str, creds: Any, tool_name: str, args: Dict[str, Any]) -> Any:
+    """Inject the server credentials and perform the MCP tool call"""
+    # credentials go into a copy, the caller's args are returned in executed_tool_calls;
+    # only the gateway sets them, never the LLM
+    args = {key: value for key, value in args.items() if key not in CREDENTIAL_ARGS}
+
     # switch/case for injecting creds (Python 3.10+)
     match selected_server:
         case "MCP-GSUITE":
@@ -951,18 +1079,44 @@ async def call_and_execute_tool(
             pass
 
     client = MCPServers[selected_server]
+    started = time.monotonic()
+
+    # servers supporting credential handles only receive the credentials once
+    # per session, later calls carry the opaque handle alone
+    handle = None
+    if creds and credential_handles.supports_handles(selected_server):
+        handle = credential_handles.credentials_handle(selected_server, creds)
+        args[credential_handles.CREDENTIALS_HANDLE_ARG] = handle
+        if credential_handles.is_registered(selected_server, handle):
+            args.pop("__credentials__", None)
+            args.pop("server_credentials", None)
+
+    tool_call_result = await call_server_tool(client, tool_name, args)
+
+    if handle is not None:
+        if "__credentials__" not in args and credential_handles.is_unknown_handle_result(tool_call_result):
+            # the server lost its handle store (restart), register again
+            credential_handles.forget(selected_server, handle)
+            args["__credentials__"]   = creds
+            args["server_credentials"] = creds
+            tool_call_result = await call_server_tool(client, tool_name, args)
+        if not credential_handles.is_unknown_handle_result(tool_call_result):
+            credential_handles.mark_registered(selected_server, handle)
+
+    metrics.observe("mcp_tool_call_latency_seconds", time.monotonic() - started, server=selected_server)
+    return tool_call_result
+
 
+async def call_server_tool(client: Any, tool_name: str, args: Dict[str, Any]) -> Any:
+    """Perform the MCP tool call and make its result JSON-serializable"""
     try:
         # perform the tool call
         raw_result = await client.call_tool(tool_name, args)
         
         # try to JSON-serialize it
         try:
-            # this will recurse into __dict__ for any object
-            serialized = json.loads(
-                json.dumps(raw_result, default=lambda o: getattr(o, "__dict__", str(o)))
-            )
-            tool_call_result = serialized
+            # pydantic models with their extra fields, __dict__ for any other object
+            tool_call_result = json_safe(raw_result)
         except (TypeError, ValueError):
             # fallback to string
             tool_call_result = str(raw_result)
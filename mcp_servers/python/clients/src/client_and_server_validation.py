@@ -1,7 +1,13 @@
+import logging
 from typing import Dict, Any, Callable, Optional
 
 from src.server_connection import MCPServers
-from src.client_and_server_config import ServersConfig, ClientsConfig
+from src.tool_routing import build_tool_index
+from src.llm.images import prepare_images_async
+from src.response_encoding import VERBOSITY_LEVELS
+from src.client_and_server_config import ServersConfig, ClientsConfig, ClientResponseFormats
+
+logger = logging.getLogger(__name__)
 
 
 async def client_and_server_validation(payload: Dict[str, Any], streaming_callback: Optional[Callable] = None):
@@ -10,9 +16,11 @@ async def client_and_server_validation(payload: Dict[str, Any], streaming_callba
         client_details = payload.get("client_details", {})
         selected_client = payload.get("selected_client", "")
         selected_servers = payload.get("selected_servers", [])
+        routing_policy = payload.get("routing_policy")
+        verbosity = payload.get("verbosity")
 
         if not selected_client or not selected_servers or not selected_server_credentials or not client_details:
-            print("Invalid Request Payload")
+            logger.warning("Invalid Request Payload")
             return {
                 "payload": None,
                 "error": "Invalid Request Payload",
@@ -21,7 +29,7 @@ async def client_and_server_validation(payload: Dict[str, Any], streaming_callba
 
         for server in selected_servers:
             if server not in MCPServers:
-                print("Invalid Server")
+                logger.warning("Invalid Server")
                 return {
                     "payload": None,
                     "error": "Invalid Server",
@@ -29,35 +37,48 @@ async def client_and_server_validation(payload: Dict[str, Any], streaming_callba
                 }
 
         if selected_client not in ClientsConfig:
-            print("Invalid Client")
+            logger.warning("Invalid Client")
             return {
                 "payload": None,
                 "error": "Invalid Client",
                 "status": False
             }
 
-        tools_arr = []
-        for server in selected_servers:
-   
-            resource = await MCPServers[server].list_tools()
-            if resource:
-                for tool in resource.tools:
-                    input_schema = getattr(tool, "inputSchema", {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    })
-                    
-                    
-                    tool_dict = {
-                        "type": "function",
-                        "function": {
-                            "name": tool.name,
-                            "description": getattr(tool, "description", f"Tool for {tool.name}"),
-                            "parameters": input_schema
-                        }
+        if verbosity is not None and verbosity not in VERBOSITY_LEVELS:
+            logger.warning("Invalid Verbosity")
+            return {
+                "payload": None,
+                "error": f"Invalid Verbosity, expected one of {', '.join(VERBOSITY_LEVELS)}",
+                "status": False
+            }
+
+        if routing_policy:
+            for fallback in routing_policy.get("fallback_clients", []):
+                fallback_client = fallback.get("selected_client", "")
+                if fallback_client not in ClientsConfig:
+                    logger.warning("Invalid Fallback Client")
+                    return {
+                        "payload": None,
+                        "error": "Invalid Fallback Client",
+                        "status": False
+                    }
+                if ClientResponseFormats[fallback_client] != ClientResponseFormats[selected_client]:
+                    logger.warning("Incompatible Fallback Client")
+                    return {
+                        "payload": None,
+                        "error": f"Fallback client {fallback_client} is not compatible with {selected_client}",
+                        "status": False
                     }
-                    tools_arr.append(tool_dict)
+
+        # Normalize, downsize and encode images once for the whole agent loop
+        if client_details.get("images_arr"):
+            client_details["images_arr"] = await prepare_images_async(
+                client_details["images_arr"],
+                inline_remote=ClientResponseFormats[selected_client] == "gemini"
+            )
+
+        # One tool list across all selected servers, colliding names are namespaced
+        tools_arr, tool_index = await build_tool_index(selected_servers, MCPServers)
 
         client_details["tools"] = tools_arr
 
@@ -67,14 +88,18 @@ async def client_and_server_validation(payload: Dict[str, Any], streaming_callba
                 "selected_client": selected_client,
                 "selected_servers": selected_servers,
                 "selected_server_credentials": selected_server_credentials,
-                "client_details": client_details
+                "client_details": client_details,
+                "tool_index": tool_index,
+                "routing_policy": routing_policy,
+                "verbosity": verbosity,
+                "speculative_tools": bool(payload.get("speculative_tools", False))
             },
             "error": None,
             "status": True
         }
 
     except Exception as err:
-        print("Error initializing MCP ==========>>>>", err)
+        logger.error(f"Error validating request: {err}")
         return {
             "payload": None,
             "error": str(err),
@@ -0,0 +1,76 @@
+import hashlib
+import hmac
+import json
+import os
+import secrets
+from typing import Any, Dict, Set
+
+from src.client_and_server_config import ServersConfig
+
+# Argument carrying the opaque handle, the servers key their client caches on it
+CREDENTIALS_HANDLE_ARG = "__credentials_handle__"
+
+# Text a server answers with when it does not know a handle (e.g. after a restart)
+UNKNOWN_HANDLE_MARKER = "Unknown credentials handle"
+
+# Per-gateway key, handles cannot be correlated with the credentials outside this
+# gateway; the workers of a multi-worker gateway share it through the environment
+_handle_key = bytes.fromhex(os.environ.get("MCP_CREDENTIAL_HANDLE_KEY", "")) or secrets.token_bytes(32)
+
+# server name -> handles registered with the current server session
+_registered: Dict[str, Set[str]] = {}
+
+
+def supports_handles(server: str) -> bool:
+    return any(
+        entry["server_name"] == server and entry.get("credential_handles", False)
+        for entry in ServersConfig
+    )
+
+
+def with_caller_namespaces(credentials: Any, client_details: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-server credentials of a request. Servers with caller_namespaces get
+    credentials standing for the caller, a digest of the LLM API key it
+    authenticates with, so their state is never shared between callers."""
+    credentials = dict(credentials or {})
+    caller = {"caller": hashlib.sha256(str(client_details.get("api_key", "")).encode("utf-8")).hexdigest()}
+    for entry in ServersConfig:
+        if entry.get("caller_namespaces", False):
+            credentials[entry["server_name"]] = caller
+    return credentials
+
+
+def credentials_handle(server: str, creds: Any) -> str:
+    """Opaque, stable handle for one server's credentials"""
+    canonical = json.dumps(creds or {}, sort_keys=True, default=str)
+    return hmac.new(_handle_key, f"{server}\n{canonical}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def is_registered(server: str, handle: str) -> bool:
+    return handle in _registered.get(server, set())
+
+
+def mark_registered(server: str, handle: str):
+    _registered.setdefault(server, set()).add(handle)
+
+
+def forget(server: str, handle: str):
+    _registered.get(server, set()).discard(handle)
+
+
+def forget_server(server: str):
+    """Called when a server session is (re)started, its handle store is empty"""
+    _registered.pop(server, None)
+
+
+def is_unknown_handle_result(result: Any) -> bool:
+    """True when the server rejected a handle it has no credentials for"""
+    if isinstance(result, str):
+        return UNKNOWN_HANDLE_MARKER in result
+    if not isinstance(result, dict):
+        return False
+    return any(
+        UNKNOWN_HANDLE_MARKER in item.get("text", "")
+        for item in result.get("content") or []
+        if isinstance(item, dict)
+    )
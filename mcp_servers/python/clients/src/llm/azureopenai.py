@@ -1,8 +1,10 @@
-import requests
+import asyncio
 import json
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, field, asdict
 
+from src.llm.images import prepare_images_async, openai_image_parts
+
 @dataclass
 class ChatMessage:
     role: str
@@ -24,6 +26,8 @@ class LlmResponseStruct:
     Data: Optional[Dict[str, Any]]
     Error: Optional[Union[Exception, str, Dict[str, Any]]]
     Status: bool
+    StatusCode: Optional[int] = None
+    Headers: Optional[Dict[str, str]] = None
 
 @dataclass
 class AzureAndOpenAiChatCompletionParams:
@@ -48,6 +52,9 @@ async def azure_openai_processor(data: Dict[str, Any]) -> LlmResponseStruct:
     """ 
     Main Azure OpenAI Processor function
     """
+    # requests is imported on first use, not at gateway start-up
+    import requests
+
     try:
         # Parse and validate input parameters
         params = AzureAndOpenAiChatCompletionParams(
@@ -87,6 +94,14 @@ async def azure_openai_processor(data: Dict[str, Any]) -> LlmResponseStruct:
         messages_arr = [{"role": "system", "content": params.prompt}]
         messages_arr += [{"role": m.role, "content": m.content} for m in params.chat_history]
 
+        # Attach images to the latest user turn
+        if params.images_arr:
+            images = await prepare_images_async(params.images_arr)
+            for message in reversed(messages_arr):
+                if message["role"] == "user":
+                    message["content"] = [{"type": "text", "text": message["content"]}] + openai_image_parts(images)
+                    break
+
         # Prepare request payload
         payload = {
             # "model": selected_model,
@@ -107,7 +122,7 @@ async def azure_openai_processor(data: Dict[str, Any]) -> LlmResponseStruct:
         url = f"{endpoint}/openai/deployments/{deployment_id}/chat/completions?api-version={api_version}"
         headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {params.api_key}'}
 
-        resp = requests.post(url, headers=headers, json=payload, timeout=60)
+        resp = await asyncio.to_thread(requests.post, url, headers=headers, json=payload, timeout=60)
         resp.raise_for_status()
         response_data = resp.json()
 
@@ -135,18 +150,22 @@ async def azure_openai_processor(data: Dict[str, Any]) -> LlmResponseStruct:
         # print(f"response: {final_format}")
 
         # Return as dict to avoid subscript errors
-        return LlmResponseStruct(Data=asdict(final_format), Error=None, Status=True)
+        return LlmResponseStruct(Data=asdict(final_format), Error=None, Status=True, StatusCode=resp.status_code, Headers=dict(resp.headers))
 
     except requests.exceptions.RequestException as req_err:
         err_data = None
+        status_code = None
+        headers = None
         if hasattr(req_err, 'response') and req_err.response is not None:
+            status_code = req_err.response.status_code
+            headers = dict(req_err.response.headers)
             try:
                 err_data = req_err.response.json()
             except ValueError:
                 err_data = req_err.response.text
         else:
             err_data = str(req_err)
-        return LlmResponseStruct(Data=None, Error=err_data, Status=False)
+        return LlmResponseStruct(Data=None, Error=err_data, Status=False, StatusCode=status_code, Headers=headers)
 
     except Exception as err:
         return LlmResponseStruct(Data=None, Error=err, Status=False)
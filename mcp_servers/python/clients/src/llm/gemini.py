@@ -1,8 +1,15 @@
-import requests
+import asyncio
+import hashlib
 import json
+import os
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, field, asdict
 
+from src.llm.images import prepare_images_async, gemini_image_parts
+
+# Overridable for proxies and for the offline load test's mock provider
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta").rstrip("/")
+
 @dataclass
 class ChatMessage:
     role: str
@@ -24,6 +31,8 @@ class LlmResponseStruct:
     Data: Optional[Dict[str, Any]]
     Error: Optional[Union[Exception, str, Dict[str, Any]]]
     Status: bool
+    StatusCode: Optional[int] = None
+    Headers: Optional[Dict[str, str]] = None
 
 @dataclass
 class GeminiChatCompletionParams:
@@ -45,34 +54,71 @@ class GeminiChatCompletionParams:
 
 def process_schema_property(val: Dict[str, Any]) -> Dict[str, Any]:
     """Recursively process schema properties for Gemini compatibility"""
-    if val.get("type") == "array":
-        items = val.get("items", {})
-        if isinstance(items, dict) and items.get("type") == "array":
-            # Nested array (matrix) - handle recursively
-            inner_items = items.get("items", {"type": "string"})
-            return {
-                "type": "array",
-                "items": {
-                    "type": "array", 
-                    "items": process_schema_property(inner_items) if isinstance(inner_items, dict) and "type" in inner_items else inner_items
-                },
-                "description": val.get("description", "")
-            }
+    schema_type = val.get("type", "string")
+    nullable = False
+    if isinstance(schema_type, list):
+        # JSON schema unions like ["string", "null"] -> Gemini nullable type
+        nullable = "null" in schema_type
+        schema_type = next((t for t in schema_type if t != "null"), "string")
+
+    processed = {
+        "type": schema_type,
+        "description": val.get("description", "")
+    }
+    if nullable:
+        processed["nullable"] = True
+
+    if "enum" in val:
+        if schema_type == "string":
+            processed["format"] = "enum"
+            processed["enum"] = [str(option) for option in val["enum"]]
         else:
-            # Simple array
-            return {
-                "type": "array",
-                "items": process_schema_property(items) if isinstance(items, dict) and "type" in items else items,
-                "description": val.get("description", "")
+            # Gemini only accepts enums on strings, keep the allowed values visible to the model
+            processed["description"] = f"{processed['description']} Allowed values: {val['enum']}".strip()
+
+    if schema_type == "array":
+        items = val.get("items", {})
+        processed["items"] = process_schema_property(items) if isinstance(items, dict) and "type" in items else items
+    elif schema_type == "object":
+        properties = val.get("properties", {})
+        if properties:
+            processed["properties"] = {key: process_schema_property(prop) for key, prop in properties.items()}
+            required = [key for key in val.get("required", []) if key in properties]
+            if required:
+                processed["required"] = required
+
+    return processed
+
+# Function declarations keyed by (tool name, description, schema hash)
+_function_declaration_cache: Dict[tuple, Dict[str, Any]] = {}
+
+def gemini_function_declaration(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """Gemini function declaration for an OpenAI-style tool, converted once per schema"""
+    func = tool.get("function", {})
+    parameters = func.get("parameters", {}) or {}
+    schema_hash = hashlib.sha256(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    cache_key = (func.get("name"), func.get("description"), schema_hash)
+
+    declaration = _function_declaration_cache.get(cache_key)
+    if declaration is None:
+        props = parameters.get("properties", {})
+        declaration = {
+            "name": func.get("name"),
+            "description": func.get("description"),
+            "parameters": {
+                "type": parameters.get("type", "object"),
+                "properties": {key: process_schema_property(val) for key, val in props.items()},
+                "required": [key for key in parameters.get("required", []) if key in props]
             }
-    else:
-        return {
-            "type": val.get("type", "string"),
-            "description": val.get("description", "")
         }
+        _function_declaration_cache[cache_key] = declaration
+    return declaration
 
 async def gemini_processor(data: Dict[str, Any]) -> LlmResponseStruct:
     """Gemini LLM Processor"""
+    # requests is imported on first use, not at gateway start-up
+    import requests
+
     try:
         # Parse parameters
         params = GeminiChatCompletionParams(
@@ -120,6 +166,11 @@ async def gemini_processor(data: Dict[str, Any]) -> LlmResponseStruct:
             "parts": [{"text": params.input}]
         })
 
+        # Attach images to the current user turn
+        if params.images_arr:
+            images = await prepare_images_async(params.images_arr, inline_remote=True)
+            chat_contents[-1]["parts"].extend(gemini_image_parts(images))
+
         # Build payload
         payload = {
             "system_instruction": {
@@ -134,32 +185,13 @@ async def gemini_processor(data: Dict[str, Any]) -> LlmResponseStruct:
 
 
         if params.tools:
-            function_declarations = []
-            for tool in params.tools:
-                func = tool.get("function", {})
-                parameters = func.get("parameters", {})
-                props = parameters.get("properties", {})
-
-                processed_props = {}
-                for key, val in props.items():
-                    processed_props[key] = process_schema_property(val)
-
-                function_declarations.append({
-                    "name": func.get("name"),
-                    "description": func.get("description"),
-                    "parameters": {
-                        "type": parameters.get("type", "object"),
-                        "properties": processed_props,
-                        "required": parameters.get("required", [])
-                    }
-                })
-
+            function_declarations = [gemini_function_declaration(tool) for tool in params.tools]
             payload["tools"] = [{"functionDeclarations": function_declarations}]
 
         # Send request
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{selected_model}:generateContent?key={params.api_key}"
+        url = f"{GEMINI_BASE_URL}/models/{selected_model}:generateContent?key={params.api_key}"
         headers = {'Content-Type': 'application/json'}
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
+        response = await asyncio.to_thread(requests.post, url, headers=headers, json=payload, timeout=60)
         response.raise_for_status()
 
         response_data = response.json()
@@ -181,18 +213,22 @@ async def gemini_processor(data: Dict[str, Any]) -> LlmResponseStruct:
             output_type="tool_call" if is_tool_call else "text"
         )
 
-        return LlmResponseStruct(Data=asdict(final_format), Error=None, Status=True)
+        return LlmResponseStruct(Data=asdict(final_format), Error=None, Status=True, StatusCode=response.status_code, Headers=dict(response.headers))
 
     except requests.exceptions.RequestException as req_err:
         err_data = None
+        status_code = None
+        headers = None
         if hasattr(req_err, 'response') and req_err.response is not None:
+            status_code = req_err.response.status_code
+            headers = dict(req_err.response.headers)
             try:
                 err_data = req_err.response.json()
             except ValueError:
                 err_data = req_err.response.text
         else:
             err_data = str(req_err)
-        return LlmResponseStruct(Data=None, Error=err_data, Status=False)
+        return LlmResponseStruct(Data=None, Error=err_data, Status=False, StatusCode=status_code, Headers=headers)
 
     except Exception as err:
         return LlmResponseStruct(Data=None, Error=err, Status=False)
@@ -0,0 +1,228 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import ipaddress
+import logging
+import socket
+import threading
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+from src.client_and_server_config import ImageInputConfig
+
+logger = logging.getLogger("images")
+
+# content sha256 -> (mime_type, base64 data), LRU bounded by ImageInputConfig["cache_max_bytes"]
+_encoded_images: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+_encoded_images_bytes = 0
+# remote url -> content sha256, so a URL is only downloaded once, LRU bounded by
+# ImageInputConfig["remote_url_cache_entries"]
+_remote_images: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(digest: str) -> Optional[Tuple[str, str]]:
+    with _cache_lock:
+        entry = _encoded_images.get(digest)
+        if entry is not None:
+            _encoded_images.move_to_end(digest)
+        return entry
+
+
+def _cache_put(digest: str, mime_type: str, data: str):
+    global _encoded_images_bytes
+    with _cache_lock:
+        if digest in _encoded_images:
+            return
+        _encoded_images[digest] = (mime_type, data)
+        _encoded_images_bytes += len(data)
+        while _encoded_images_bytes > ImageInputConfig["cache_max_bytes"] and len(_encoded_images) > 1:
+            _, (_, evicted) = _encoded_images.popitem(last=False)
+            _encoded_images_bytes -= len(evicted)
+
+
+def _downsize(raw: bytes, mime_type: str) -> Tuple[bytes, str]:
+    """Shrink an image that exceeds the byte or dimension budget, keeping aspect ratio"""
+    try:
+        from PIL import Image
+    except ImportError:
+        if len(raw) > ImageInputConfig["max_image_bytes"]:
+            logger.warning("Pillow is not installed, oversized images are sent as-is")
+        return raw, mime_type
+
+    max_dimension = ImageInputConfig["max_dimension"]
+    try:
+        image = Image.open(io.BytesIO(raw))
+    except Exception:
+        # Let the provider report formats we cannot decode
+        return raw, mime_type
+    with image:
+        if len(raw) <= ImageInputConfig["max_image_bytes"] and max(image.size) <= max_dimension:
+            return raw, mime_type
+        image.thumbnail((max_dimension, max_dimension))
+        output = io.BytesIO()
+        if image.mode in ("RGBA", "LA", "P"):
+            image.save(output, format="PNG", optimize=True)
+            return output.getvalue(), "image/png"
+        image.convert("RGB").save(output, format="JPEG", quality=85, optimize=True)
+        return output.getvalue(), "image/jpeg"
+
+
+def _inline_from_bytes(raw: bytes, mime_type: str) -> Dict[str, Any]:
+    digest = hashlib.sha256(raw).hexdigest()
+    cached = _cache_get(digest)
+    if cached is None:
+        resized, mime_type = _downsize(raw, mime_type)
+        cached = (mime_type, base64.b64encode(resized).decode("ascii"))
+        _cache_put(digest, *cached)
+    return {"type": "inline", "sha256": digest, "mime_type": cached[0], "data": cached[1]}
+
+
+def _inline_from_base64(data: str, mime_type: str) -> Dict[str, Any]:
+    # Small images are forwarded in the encoding they arrived in, no decode/encode round-trip
+    if len(data) * 3 // 4 <= ImageInputConfig["max_image_bytes"]:
+        digest = hashlib.sha256(data.encode("ascii")).hexdigest()
+        if _cache_get(digest) is None:
+            _cache_put(digest, mime_type, data)
+        return {"type": "inline", "sha256": digest, "mime_type": mime_type, "data": data}
+    try:
+        raw = base64.b64decode(data, validate=True)
+    except binascii.Error as err:
+        raise ValueError(f"Invalid base64 image data: {err}")
+    return _inline_from_bytes(raw, mime_type)
+
+
+def _check_public_url(url: str):
+    """Remote images are only fetched over http(s) from hosts whose every address
+    is public, never from internal services or cloud metadata endpoints"""
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"Unsupported image URL: {url}")
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80), proto=socket.IPPROTO_TCP)
+    except socket.gaierror as err:
+        raise ValueError(f"Cannot resolve image host {parsed.hostname}: {err}")
+    for *_, sockaddr in addresses:
+        if not ipaddress.ip_address(sockaddr[0].split("%")[0]).is_global:
+            raise ValueError(f"Image URL {url} does not point to a public address")
+
+
+def _fetch_image(url: str) -> Tuple[bytes, str]:
+    """Download a remote image, refusing bodies over max_image_bytes before reading them whole"""
+    import requests  # only needed for remote images
+
+    max_bytes = ImageInputConfig["max_image_bytes"]
+    for _ in range(ImageInputConfig["fetch_max_redirects"] + 1):
+        _check_public_url(url)
+        with requests.get(url, timeout=ImageInputConfig["fetch_timeout_seconds"], stream=True, allow_redirects=False) as response:
+            if response.is_redirect:
+                # every hop is checked, a public URL may redirect to an internal one
+                url = urllib.parse.urljoin(url, response.headers["Location"])
+                continue
+            response.raise_for_status()
+            if int(response.headers.get("Content-Length") or 0) > max_bytes:
+                raise ValueError(f"Image at {url} is larger than {max_bytes} bytes")
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if len(body) > max_bytes:
+                    raise ValueError(f"Image at {url} is larger than {max_bytes} bytes")
+            return bytes(body), response.headers.get("Content-Type", "image/jpeg").split(";")[0]
+    raise ValueError(f"Too many redirects fetching image {url}")
+
+
+def _inline_from_url(url: str) -> Dict[str, Any]:
+    with _cache_lock:
+        digest = _remote_images.get(url)
+        if digest is not None:
+            _remote_images.move_to_end(url)
+    cached = _cache_get(digest) if digest else None
+    if cached is not None:
+        return {"type": "inline", "sha256": digest, "mime_type": cached[0], "data": cached[1]}
+
+    raw, mime_type = _fetch_image(url)
+    image = _inline_from_bytes(raw, mime_type)
+    with _cache_lock:
+        _remote_images[url] = image["sha256"]
+        _remote_images.move_to_end(url)
+        while len(_remote_images) > ImageInputConfig["remote_url_cache_entries"]:
+            _remote_images.popitem(last=False)
+    return image
+
+
+def prepare_image(image: Any, inline_remote: bool = False) -> Dict[str, Any]:
+    """
+    Normalize one images_arr entry. Accepted forms: an http(s) URL, a data URI,
+    {"url": ...}, {"data": <base64>, "mime_type": ...} or an upload
+    {"bytes": <bytes>, "mime_type": ...}. Remote URLs are passed through unless
+    `inline_remote` is set (Gemini needs the image bytes inline).
+    """
+    if isinstance(image, dict) and image.get("type") in ("url", "inline") and ("url" in image or "sha256" in image):
+        if image["type"] == "url" and inline_remote:
+            return _inline_from_url(image["url"])
+        return image
+
+    if isinstance(image, dict):
+        if image.get("bytes") is not None:
+            return _inline_from_bytes(bytes(image["bytes"]), image.get("mime_type", "image/jpeg"))
+        if image.get("data"):
+            return _inline_from_base64(image["data"], image.get("mime_type", "image/jpeg"))
+        image = image.get("url", "")
+
+    if not isinstance(image, str) or not image:
+        raise ValueError("Unsupported image input")
+
+    if image.startswith("data:"):
+        header, _, data = image.partition(",")
+        mime_type = header[len("data:"):].split(";")[0] or "image/jpeg"
+        return _inline_from_base64(data, mime_type)
+
+    if image.startswith(("http://", "https://")):
+        if inline_remote:
+            return _inline_from_url(image)
+        return {"type": "url", "url": image}
+
+    # Bare base64 string
+    return _inline_from_base64(image, "image/jpeg")
+
+
+def prepare_images(images: List[Any], inline_remote: bool = False) -> List[Dict[str, Any]]:
+    return [prepare_image(image, inline_remote) for image in images or []]
+
+
+def is_prepared(images: List[Any], inline_remote: bool = False) -> bool:
+    return all(
+        isinstance(image, dict) and (image.get("type") == "inline" or (image.get("type") == "url" and not inline_remote))
+        for image in images or []
+    )
+
+
+async def prepare_images_async(images: List[Any], inline_remote: bool = False) -> List[Dict[str, Any]]:
+    """prepare_images, off the event loop when downloads or resizing may be needed"""
+    if is_prepared(images, inline_remote):
+        return list(images or [])
+    return await asyncio.to_thread(prepare_images, images, inline_remote)
+
+
+def openai_image_parts(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Chat completions content parts for prepared images"""
+    parts = []
+    for image in images:
+        if image["type"] == "url":
+            url = image["url"]
+        else:
+            # Built once per prepared image and reused on every turn of the agent loop
+            if "data_uri" not in image:
+                image["data_uri"] = f"data:{image['mime_type']};base64,{image['data']}"
+            url = image["data_uri"]
+        parts.append({"type": "image_url", "image_url": {"url": url, "detail": ImageInputConfig["openai_detail"]}})
+    return parts
+
+
+def gemini_image_parts(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Gemini content parts for prepared (inline) images"""
+    return [{"inline_data": {"mime_type": image["mime_type"], "data": image["data"]}} for image in images]
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src import metrics
+from src.client_and_server_config import RateLimitConfig
+
+# Fraction of every provider limit this process may use, the workers of a
+# multi-worker gateway share the limits evenly
+WORKER_SHARE = 1.0 / max(1, int(os.environ.get("MCP_GATEWAY_WORKERS", "1")))
+
+
+def _share(limit: Optional[float]) -> Optional[float]:
+    return None if limit is None else limit * WORKER_SHARE
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse provider reset durations such as "1s", "6m0s", "20ms" or "0.5" into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+class TokenBucket:
+    """Bucket refilled continuously to `capacity` units per minute; None is unlimited"""
+
+    def __init__(self, capacity: Optional[float]):
+        self.capacity = capacity
+        self.available = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        if self.capacity is None:
+            return
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.capacity / 60.0)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.capacity is None:
+            return 0.0
+        self._refill(now)
+        # Never wait for more than a full bucket, oversized requests go through once it is full
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60.0 / self.capacity
+
+    def consume(self, amount: float):
+        if self.capacity is None:
+            return
+        self._refill(time.monotonic())
+        self.available -= amount
+
+    def set_capacity(self, capacity: float):
+        if self.capacity is None:
+            self.available = capacity
+        self.capacity = capacity
+
+    def set_remaining(self, remaining: float, reset_seconds: Optional[float]):
+        if self.capacity is None:
+            return
+        self._refill(time.monotonic())
+        self.available = min(self.available, remaining)
+        if remaining <= 0 and reset_seconds:
+            self.block_for(reset_seconds)
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class ProviderLimiter:
+    """Request and token buckets for one (client, api_key, model), served in FIFO order"""
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        # asyncio.Lock wakes waiters in arrival order, which keeps the queue fair
+        self.lock = asyncio.Lock()
+        self.queued = 0
+
+    async def acquire(self, estimated_tokens: int, client: str) -> float:
+        """Wait until both buckets allow the call, returns the time spent queued"""
+        queued_at = time.monotonic()
+        self.queued += 1
+        metrics.increment("llm_rate_limit_queued_total", client=client)
+        try:
+            async with self.lock:
+                while True:
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                self.requests.consume(1)
+                self.tokens.consume(estimated_tokens)
+        finally:
+            self.queued -= 1
+        waited = time.monotonic() - queued_at
+        metrics.observe("llm_rate_limit_wait_seconds", waited, client=client)
+        return waited
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Give back (or take) the difference between estimated and billed tokens"""
+        if actual_tokens:
+            self.tokens.consume(actual_tokens - estimated_tokens)
+
+    def update_from_headers(self, headers: Dict[str, str], status_code: Optional[int]):
+        """Adapt the buckets to the provider's view of our quota"""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            if limit and limit.isdigit():
+                bucket.set_capacity(_share(float(limit)))
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining and remaining.isdigit():
+                bucket.set_remaining(_share(float(remaining)), parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}")))
+
+        if status_code == 429:
+            retry_after = None
+            if headers.get("retry-after-ms"):
+                retry_after = float(headers["retry-after-ms"]) / 1000.0
+            elif headers.get("retry-after"):
+                retry_after = parse_reset_duration(headers["retry-after"])
+            self.requests.block_for(retry_after if retry_after is not None else 1.0)
+
+
+_limiters: Dict[Tuple[str, str, str], ProviderLimiter] = {}
+
+
+def _model_for(selected_client: str, client_details: Dict[str, Any]) -> str:
+    if selected_client == "MCP_CLIENT_AZURE_AI" and client_details.get("deployment_id"):
+        return client_details["deployment_id"]
+    if client_details.get("input_type") == "image" and client_details.get("vision_model"):
+        return client_details["vision_model"]
+    return client_details.get("chat_model", "")
+
+
+def get_limiter(selected_client: str, client_details: Dict[str, Any]) -> ProviderLimiter:
+    """Limiter for (client, api_key, model); the key is only kept as a digest"""
+    model = _model_for(selected_client, client_details)
+    key_digest = hashlib.sha256(client_details.get("api_key", "").encode("utf-8")).hexdigest()[:16]
+    key = (selected_client, key_digest, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limits = RateLimitConfig["model_limits"].get(
+            f"{selected_client}:{model}",
+            RateLimitConfig["default_limits"].get(selected_client, {})
+        )
+        limiter = ProviderLimiter(_share(limits.get("requests_per_minute")), _share(limits.get("tokens_per_minute")))
+        _limiters[key] = limiter
+    return limiter
+
+
+def estimate_tokens(client_details: Dict[str, Any]) -> int:
+    """Rough prompt size (4 chars per token) plus the completion budget"""
+    prompt_chars = len(client_details.get("prompt", "")) + len(client_details.get("input", ""))
+    prompt_chars += len(json.dumps(client_details.get("chat_history", []), default=str))
+    prompt_chars += len(json.dumps(client_details.get("tools", []), default=str))
+    return prompt_chars // 4 + int(client_details.get("max_tokens", 1000))
@@ -0,0 +1,180 @@
+import asyncio
+import importlib
+import random
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import metrics
+from src.client_and_server_config import RoutingPolicyConfig, RateLimitConfig
+from src.llm.rate_limiter import get_limiter, estimate_tokens
+
+# client -> (module, processor), imported on first use so unused providers cost nothing at start-up
+LlmProcessorModules = {
+    "MCP_CLIENT_AZURE_AI": ("src.llm.azureopenai", "azure_openai_processor"),
+    "MCP_CLIENT_OPENAI": ("src.llm.openai", "openai_processor"),
+    "MCP_CLIENT_GEMINI": ("src.llm.gemini", "gemini_processor")
+}
+
+LlmProcessors: Dict[str, Any] = {}
+
+
+def get_processor(selected_client: str):
+    if selected_client not in LlmProcessors:
+        module_name, processor_name = LlmProcessorModules[selected_client]
+        LlmProcessors[selected_client] = getattr(importlib.import_module(module_name), processor_name)
+    return LlmProcessors[selected_client]
+
+
+async def _timed_call(selected_client: str, client_details: Dict[str, Any]):
+    started = time.monotonic()
+    response = await get_processor(selected_client)(client_details)
+    metrics.observe("llm_call_latency_seconds", time.monotonic() - started, client=selected_client)
+    return response
+
+
+def _account_response(limiter: Any, estimated_tokens: int, response: Any):
+    """Reconcile the limiter with a completed provider call"""
+    limiter.update_from_headers(response.Headers, response.StatusCode)
+    if response.Status:
+        limiter.record_usage(estimated_tokens, (response.Data or {}).get("total_tokens", 0))
+
+
+def _account_abandoned(limiter: Any, estimated_tokens: int, call: asyncio.Task):
+    """Done callback of a call whose caller was cancelled (a losing hedge)"""
+    if not call.cancelled() and call.exception() is None:
+        _account_response(limiter, estimated_tokens, call.result())
+
+
+async def _invoke(selected_client: str, client_details: Dict[str, Any]):
+    """Single provider call, queued behind the client-side rate limiter"""
+    if not RateLimitConfig["enabled"]:
+        return await _timed_call(selected_client, client_details)
+
+    limiter = get_limiter(selected_client, client_details)
+    estimated_tokens = estimate_tokens(client_details)
+    requeues = 0
+    while True:
+        await limiter.acquire(estimated_tokens, selected_client)
+        call = asyncio.ensure_future(_timed_call(selected_client, client_details))
+        try:
+            response = await asyncio.shield(call)
+        except asyncio.CancelledError:
+            # the processors post from a worker thread, which cannot be stopped:
+            # the request still completes and is billed, so its tokens are
+            # accounted for once it does
+            call.add_done_callback(partial(_account_abandoned, limiter, estimated_tokens))
+            raise
+        _account_response(limiter, estimated_tokens, response)
+
+        if response.Status:
+            return response
+        # A 429 blocks the bucket until the provider's reset, wait there instead of failing
+        if response.StatusCode != 429 or requeues >= RateLimitConfig["max_requeues"]:
+            return response
+        requeues += 1
+        metrics.increment("llm_rate_limit_requeues_total", client=selected_client)
+
+
+def resolve_routing_policy(routing_policy: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge a request routing policy over the configured defaults"""
+    return {**RoutingPolicyConfig, **(routing_policy or {})}
+
+
+def _is_failover_error(response: Any, policy: Dict[str, Any]) -> bool:
+    """Client errors (bad request, auth on this provider, ...) are not retried"""
+    status_code = getattr(response, "StatusCode", None)
+    if status_code is None:
+        return True
+    return status_code in policy["retry_status_codes"] or status_code >= 500
+
+
+async def _call_with_retries(selected_client: str, client_details: Dict[str, Any], policy: Dict[str, Any]):
+    """Call one provider, retrying 429/5xx with exponential backoff and jitter"""
+    attempt = 0
+    while True:
+        response = await _invoke(selected_client, client_details)
+
+        if response.Status:
+            return response
+
+        metrics.increment("llm_call_errors_total", client=selected_client, status=response.StatusCode)
+        if response.StatusCode not in policy["retry_status_codes"] or attempt >= policy["max_retries"]:
+            return response
+
+        delay = min(policy["backoff_max_seconds"], policy["backoff_base_seconds"] * (2 ** attempt))
+        attempt += 1
+        metrics.increment("llm_call_retries_total", client=selected_client)
+        await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def _hedge_delay(selected_client: str, policy: Dict[str, Any]) -> Optional[float]:
+    """Latency after which a duplicate request is issued, None if hedging is off"""
+    hedge_percentile = policy.get("hedge_after_percentile")
+    if not hedge_percentile:
+        return None
+    if metrics.sample_count("llm_call_latency_seconds", client=selected_client) < policy["hedge_min_samples"]:
+        return None
+    return metrics.percentile("llm_call_latency_seconds", hedge_percentile, client=selected_client)
+
+
+async def _hedged_call(primary: Tuple[str, Dict[str, Any]], hedge: Tuple[str, Dict[str, Any]], delay: float, policy: Dict[str, Any]):
+    """Start the primary call, duplicate it on the hedge target once `delay` has
+    elapsed, and return the first successful response. The other call is
+    abandoned rather than stopped: its HTTP request runs to completion (and is
+    billed) in the background, where _invoke reconciles its rate limiter tokens."""
+    primary_task = asyncio.create_task(_call_with_retries(primary[0], primary[1], policy))
+    done, _ = await asyncio.wait({primary_task}, timeout=delay)
+    if done:
+        return primary_task.result()
+
+    metrics.increment("llm_hedged_requests_total", client=primary[0], hedge_client=hedge[0])
+    hedge_task = asyncio.create_task(_call_with_retries(hedge[0], hedge[1], policy))
+    pending = {primary_task, hedge_task}
+    response = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                response = task.result()
+                if response.Status:
+                    if task is hedge_task:
+                        metrics.increment("llm_hedge_wins_total", client=primary[0], hedge_client=hedge[0])
+                    return response
+        return response
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def route_llm_call(selected_client: str, client_details: Dict[str, Any], routing_policy: Optional[Dict[str, Any]] = None):
+    """
+    Call the LLM for `selected_client`. Without a routing policy this is a plain
+    processor call. With one, failed calls are retried with backoff, then failed
+    over to `fallback_clients` in order, and slow calls are hedged against the
+    first fallback (or the same client) after the configured latency percentile.
+    """
+    if not routing_policy:
+        return await _invoke(selected_client, client_details)
+
+    policy = resolve_routing_policy(routing_policy)
+    candidates: List[Tuple[str, Dict[str, Any]]] = [(selected_client, client_details)]
+    for fallback in policy["fallback_clients"]:
+        candidates.append((fallback["selected_client"], {**client_details, **fallback.get("client_details", {})}))
+
+    response = None
+    for index, candidate in enumerate(candidates):
+        if index > 0:
+            metrics.increment("llm_failovers_total", client=candidates[index - 1][0], fallback_client=candidate[0])
+
+        delay = _hedge_delay(candidate[0], policy)
+        if delay is not None:
+            hedge = candidates[index + 1] if index + 1 < len(candidates) else candidate
+            response = await _hedged_call(candidate, hedge, delay, policy)
+        else:
+            response = await _call_with_retries(candidate[0], candidate[1], policy)
+
+        if response.Status or not _is_failover_error(response, policy):
+            return response
+
+    return response
@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import signal
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+from src.client_and_server_config import ServersConfig, GatewayWorkersConfig
+from src.server_connection import MCPServers, InitializedServers, run_all_mcp, mcp_ready
+from src.tool_catalog import ToolCatalog, ToolMetadata, install_tool_catalog, json_safe
+from src.structured_logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Tool results and catalogs can be large, allow big protocol lines
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+def _serialize(value: Any) -> Any:
+    """JSON-safe form of an MCP result, the same one the gateway uses"""
+    return json_safe(value)
+
+
+# ---------------------------------------------------------------------------
+# Broker process: owns the MCP servers and serves them over a unix socket.
+# Protocol: one JSON object per line, {"id", "op", ...} -> {"id", "result"} or {"id", "error"}
+# ---------------------------------------------------------------------------
+
+async def _handle_request(request: Dict[str, Any]) -> Any:
+    op = request.get("op")
+    if op == "status":
+        return {"ready": mcp_ready(), "servers": list(MCPServers.keys())}
+    if op == "catalog":
+        return {
+            server_name: {"tools": ToolCatalog.get(server_name, []), "metadata": ToolMetadata.get(server_name, {})}
+            for server_name in MCPServers
+        }
+
+    server_name = request.get("server", "")
+    if server_name not in MCPServers:
+        raise ValueError(f"Server {server_name} not found in MCPServers")
+    if op == "list_tools":
+        tools_response = await MCPServers[server_name].list_tools()
+        return _serialize(tools_response.tools)
+    if op == "call_tool":
+        raw_result = await MCPServers[server_name].call_tool(request["tool"], request.get("args") or {})
+        return _serialize(raw_result)
+    raise ValueError(f"Unknown broker operation: {op}")
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    write_lock = asyncio.Lock()
+
+    async def respond(request: Dict[str, Any]):
+        try:
+            response = {"id": request.get("id"), "result": await _handle_request(request)}
+        except Exception as err:
+            response = {"id": request.get("id"), "error": str(err)}
+        async with write_lock:
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    # Requests of one worker are served concurrently, responses carry the request id
+    pending = set()
+    try:
+        while line := await reader.readline():
+            task = asyncio.create_task(respond(json.loads(line)))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    finally:
+        for task in pending:
+            task.cancel()
+        writer.close()
+
+
+async def serve_broker(socket_path: str, shutdown_event: asyncio.Event):
+    """Start the MCP servers and serve them to the workers until shutdown"""
+    mcp_task = asyncio.create_task(run_all_mcp(shutdown_event))
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(_serve_connection, path=socket_path, limit=STREAM_LIMIT)
+    try:
+        async with server:
+            await shutdown_event.wait()
+    finally:
+        await mcp_task
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def run_broker(socket_path: str):
+    """Broker process entry point, stopped with SIGTERM once the workers are gone"""
+    # Ctrl+C reaches the whole process group, the supervisor decides when the broker stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_logging()
+
+    async def main():
+        shutdown_event = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, shutdown_event.set)
+        await serve_broker(socket_path, shutdown_event)
+
+    asyncio.run(main())
+
+
+# ---------------------------------------------------------------------------
+# Worker side: sessions proxied to the broker
+# ---------------------------------------------------------------------------
+
+class BrokerConnection:
+    """One multiplexed connection from a worker to the broker"""
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.ids = itertools.count(1)
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.reader_task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        reader, self.writer = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+        self.reader_task = asyncio.create_task(self._read_responses(reader))
+
+    async def _read_responses(self, reader: asyncio.StreamReader):
+        try:
+            while line := await reader.readline():
+                response = json.loads(line)
+                future = self.pending.pop(response.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(RuntimeError(response["error"]))
+                else:
+                    future.set_result(response.get("result"))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP broker connection closed"))
+            self.pending.clear()
+
+    async def request(self, op: str, **params: Any) -> Any:
+        if self.writer is None or self.writer.is_closing():
+            raise ConnectionError("MCP broker is not connected")
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({"id": request_id, "op": op, **params}).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.reader_task is not None:
+            await asyncio.gather(self.reader_task, return_exceptions=True)
+
+
+def _namespace(value: Any) -> Any:
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _namespace(item) if key == "annotations" else item for key, item in value.items()})
+    return value
+
+
+class BrokerSession:
+    """Stand-in for an mcp ClientSession whose server runs in the broker process"""
+
+    def __init__(self, connection: BrokerConnection, server_name: str):
+        self.connection = connection
+        self.server_name = server_name
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        return await self.connection.request("call_tool", server=self.server_name, tool=name, args=arguments or {})
+
+    async def list_tools(self) -> Any:
+        tools = await self.connection.request("list_tools", server=self.server_name)
+        return SimpleNamespace(tools=[_namespace(tool) for tool in tools])
+
+
+async def run_broker_client(socket_path: str, shutdown_event: asyncio.Event, poll_seconds: float = 0.5):
+    """Worker counterpart of run_all_mcp: wait for the broker to be ready, adopt
+    its tool catalogs and proxy MCPServers to it until shutdown"""
+    connection = BrokerConnection(socket_path)
+    while not shutdown_event.is_set():
+        try:
+            await connection.connect()
+            status = await connection.request("status")
+            while not status["ready"] and not shutdown_event.is_set():
+                await asyncio.sleep(poll_seconds)
+                status = await connection.request("status")
+            break
+        except (ConnectionError, FileNotFoundError, OSError):
+            # the broker is still starting
+            await connection.close()
+            await asyncio.sleep(poll_seconds)
+
+    if shutdown_event.is_set():
+        await connection.close()
+        return
+
+    catalog = await connection.request("catalog")
+    for server_name, server_catalog in catalog.items():
+        install_tool_catalog(server_name, server_catalog["tools"], server_catalog["metadata"])
+        MCPServers[server_name] = BrokerSession(connection, server_name)
+    InitializedServers.update(server["server_name"] for server in ServersConfig)
+    logger.info("Worker connected to MCP broker", extra={"fields": {"pid": os.getpid(), "servers": list(MCPServers.keys())}})
+
+    await shutdown_event.wait()
+    MCPServers.clear()
+    await connection.close()
+
+
+# ---------------------------------------------------------------------------
+# Supervisor
+# ---------------------------------------------------------------------------
+
+def run_workers(config: Any, workers: int, application_path: str) -> int:
+    """
+    Run the gateway with `workers` hypercorn worker processes sharing one MCP
+    broker process. Workers find the broker, the shared tool result cache and
+    the credential handle key through the environment they inherit.
+    """
+    from hypercorn.run import run
+
+    socket_path = GatewayWorkersConfig["broker_socket_path"]
+    os.environ["MCP_BROKER_SOCKET"] = socket_path
+    os.environ["MCP_SHARED_CACHE_PATH"] = GatewayWorkersConfig["shared_cache_path"]
+    os.environ["MCP_GATEWAY_WORKERS"] = str(workers)
+    os.environ.setdefault("MCP_CREDENTIAL_HANDLE_KEY", secrets.token_hex(32))
+
+    broker = multiprocessing.get_context("spawn").Process(target=run_broker, args=(socket_path,), name="mcp-broker")
+    broker.start()
+    try:
+        config.workers = workers
+        config.application_path = application_path
+        return run(config)
+    finally:
+        broker.terminate()
+        broker.join(timeout=30)
+        if broker.is_alive():
+            broker.kill()
@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+# Number of recent observations kept per histogram for percentile estimates
+HISTOGRAM_WINDOW = 1024
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_histograms: Dict[Tuple[str, Tuple], Dict[str, Any]] = {}
+
+
+def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """Increase a counter"""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record one observation (e.g. a latency in seconds) in a histogram"""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = {"count": 0, "sum": 0.0, "max": 0.0, "window": deque(maxlen=HISTOGRAM_WINDOW)}
+            _histograms[key] = histogram
+        histogram["count"] += 1
+        histogram["sum"] += value
+        histogram["max"] = max(histogram["max"], value)
+        histogram["window"].append(value)
+
+
+def sample_count(name: str, **labels) -> int:
+    """Number of observations currently in the histogram window"""
+    with _lock:
+        histogram = _histograms.get(_key(name, labels))
+        return len(histogram["window"]) if histogram else 0
+
+
+def percentile(name: str, q: float, **labels) -> Optional[float]:
+    """q-th percentile (0-100) of the recent observations, None when empty"""
+    with _lock:
+        histogram = _histograms.get(_key(name, labels))
+        values = sorted(histogram["window"]) if histogram else []
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, int(round(q / 100.0 * (len(values) - 1)))))
+    return values[index]
+
+
+def _label_str(labels: Tuple) -> str:
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def snapshot() -> Dict[str, Any]:
+    """JSON-serializable view of all counters and histograms"""
+    with _lock:
+        counters = {f"{name}{{{_label_str(labels)}}}": value for (name, labels), value in _counters.items()}
+        histograms = {}
+        for (name, labels), histogram in _histograms.items():
+            window = sorted(histogram["window"])
+            histograms[f"{name}{{{_label_str(labels)}}}"] = {
+                "count": histogram["count"],
+                "sum": histogram["sum"],
+                "max": histogram["max"],
+                "p50": window[int(0.50 * (len(window) - 1))] if window else None,
+                "p95": window[int(0.95 * (len(window) - 1))] if window else None,
+                "p99": window[int(0.99 * (len(window) - 1))] if window else None,
+            }
+    return {"counters": counters, "histograms": histograms}
@@ -0,0 +1,71 @@
+import zlib
+from typing import Any, AsyncIterator, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used when brotli is not installed
+    brotli = None
+
+from src.client_and_server_config import ResponseConfig
+
+VERBOSITY_LEVELS = ("minimal", "standard", "debug")
+
+# Fields of the execution Data kept at each verbosity, None keeps everything
+_VerbosityFields: Dict[str, Optional[tuple]] = {
+    "minimal": ("messages", "output_type", "total_llm_calls", "total_tokens", "total_input_tokens", "total_output_tokens"),
+    "standard": ("messages", "output_type", "total_llm_calls", "total_tokens", "total_input_tokens", "total_output_tokens", "executed_tool_calls"),
+    "debug": None
+}
+
+
+def shape_response_data(data: Any, verbosity: Optional[str]) -> Any:
+    """Execution Data reduced to the requested verbosity. Raw provider responses
+    (final_llm_response, llm_responses_arr) are only returned at "debug"."""
+    fields = _VerbosityFields[verbosity or ResponseConfig["default_verbosity"]]
+    if fields is None or not isinstance(data, dict):
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def negotiate_encoding(accept_encodings: Any) -> Optional[str]:
+    """Preferred content coding the client accepts (werkzeug Accept), or None"""
+    if not ResponseConfig["compression"]["enabled"]:
+        return None
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return accept_encodings.best_match(offered)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=ResponseConfig["compression"]["brotli_quality"])
+    compressor = zlib.compressobj(ResponseConfig["compression"]["gzip_level"], zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _StreamCompressor:
+    """Incremental compressor flushed after every chunk, so each SSE event
+    reaches the client as soon as it is produced"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=ResponseConfig["compression"]["brotli_quality"])
+        else:
+            self.compressor = zlib.compressobj(ResponseConfig["compression"]["gzip_level"], zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+async def compress_stream(chunks: AsyncIterator[Any], encoding: str) -> AsyncIterator[bytes]:
+    compressor = _StreamCompressor(encoding)
+    async for chunk in chunks:
+        yield compressor.chunk(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    yield compressor.finish()
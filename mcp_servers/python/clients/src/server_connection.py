@@ -1,10 +1,13 @@
 import os
 import asyncio
+import logging
 import warnings
-from typing import Dict, Any
+from typing import Dict, Any, Set
 
 from contextlib import AsyncExitStack
 from src.client_and_server_config import ServersConfig
+from src.tool_catalog import build_tool_catalog, ToolCatalog
+from src.credential_handles import forget_server
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from mcp import ClientSession, StdioServerParameters
@@ -16,50 +19,95 @@ warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed tr
 # Suppress specific ResourceWarning related to unclosed transport
 warnings.filterwarnings("ignore", category=ResourceWarning, message="unclosed transport .*")
 
+logger = logging.getLogger(__name__)
+
 # Global session store
 MCPServers: Dict[str, ClientSession] = {}
 
+# Servers whose start-up finished, connected or not
+InitializedServers: Set[str] = set()
+
+
+async def initialize_mcp_server(server: Dict[str, Any], exit_stack: AsyncExitStack) -> bool:
+    """Start one MCP server, open its session and warm its tool catalog"""
+    try:
+        logger.info("Initializing MCP server", extra={"fields": {
+            "server": server["server_name"],
+            "command": server["command"],
+            "args": server["args"],
+            "cwd": os.getcwd()
+        }})
+
+        # Optional directory existence check
+        if "--directory" in server["args"]:
+            dir_index = server["args"].index("--directory")
+            if dir_index + 1 < len(server["args"]):
+                relative_path = server["args"][dir_index + 1]
+                absolute_path = os.path.abspath(relative_path)
+                logger.info("MCP server directory", extra={"fields": {
+                    "server": server["server_name"],
+                    "relative_path": relative_path,
+                    "absolute_path": absolute_path,
+                    "path_exists": os.path.exists(absolute_path)
+                }})
+
+        # Start stdio client
+        server_params = StdioServerParameters(command=server["command"], args=server["args"])
+        stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
+        stdio, write = stdio_transport
+
+        session = await exit_stack.enter_async_context(ClientSession(stdio, write))
+        await session.initialize()
+
+
+        # Save session globally, a new session knows no credential handles yet
+        MCPServers[server["server_name"]] = session
+        forget_server(server["server_name"])
+
+        # Confirm connection
+        tools = await build_tool_catalog(server["server_name"], session)
+        tool_names = [tool["function"]["name"] for tool in tools]
+        logger.info(f"Connected to {server['server_name']}", extra={"fields": {"server": server["server_name"], "tools": tool_names}})
+        return True
+
+    except Exception as err:
+        logger.error(f"Error initializing {server['server_name']} mcp server: {err}", extra={"fields": {"server": server["server_name"]}})
+        return False
+
+    finally:
+        InitializedServers.add(server["server_name"])
+
 
 async def initialize_all_mcp(exit_stack):
     """Initialize all MCP clients based on server configuration"""
     for server in ServersConfig:
-        try:
-            print(f"\n================= Initializing {server['server_name']} mcp server start ===============")
-            print(f"Server name        : {server['server_name']}")
-            print(f"Server command     : {server['command']}")
-            print(f"Server args        : {server['args']}")
-            print(f"cwd                : {os.getcwd()}")
-
-            # Optional directory existence check
-            if "--directory" in server["args"]:
-                dir_index = server["args"].index("--directory")
-                if dir_index + 1 < len(server["args"]):
-                    relative_path = server["args"][dir_index + 1]
-                    absolute_path = os.path.abspath(relative_path)
-                    print(f"Relative path      : {relative_path}")
-                    print(f"Absolute path      : {absolute_path}")
-                    print(f"Path exists        : {os.path.exists(absolute_path)}")
-
-            # Start stdio client
-            server_params = StdioServerParameters(command=server["command"], args=server["args"])
-            stdio_transport = await exit_stack.enter_async_context(stdio_client(server_params))
-            stdio, write = stdio_transport
-
-            session = await exit_stack.enter_async_context(ClientSession(stdio, write))
-            await session.initialize()
-
-
-            # Save session globally
-            MCPServers[server["server_name"]] = session
-
-            # Confirm connection
-            tools_response = await session.list_tools()
-            tool_names = [tool.name for tool in tools_response.tools]
-            print(f"Connected to {server['server_name']} with tools: {tool_names}")
-            print(f"\n================= Initializing {server['server_name']} mcp server end ===============")
-
-        except Exception as err:
-            print(f"Error initializing {server['server_name']} mcp server =========>>>> {err}")
-            continue
-
-    return True
\ No newline at end of file
+        await initialize_mcp_server(server, exit_stack)
+
+    return True
+
+
+async def run_all_mcp(shutdown_event: asyncio.Event):
+    """
+    Start all MCP servers concurrently and keep them running until
+    `shutdown_event` is set. Every server lives in its own task, which owns its
+    stdio transport from start to close as the MCP client requires.
+    """
+    async def run_server(server: Dict[str, Any]):
+        async with AsyncExitStack() as exit_stack:
+            await initialize_mcp_server(server, exit_stack)
+            if mcp_ready():
+                logger.info("MCP servers initialized successfully", extra={"fields": {"servers": list(MCPServers.keys())}})
+            await shutdown_event.wait()
+            MCPServers.pop(server["server_name"], None)
+
+    await asyncio.gather(*(run_server(server) for server in ServersConfig), return_exceptions=True)
+
+
+def mcp_ready() -> bool:
+    """True once every configured server finished starting, at least one is
+    connected and the tool catalog of every connected server is warm"""
+    return (
+        all(server["server_name"] in InitializedServers for server in ServersConfig)
+        and bool(MCPServers)
+        and all(server_name in ToolCatalog for server_name in MCPServers)
+    )
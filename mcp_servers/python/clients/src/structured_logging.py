@@ -0,0 +1,96 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from typing import Any, Optional
+
+from src import metrics
+from src.client_and_server_config import LoggingConfig
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured fields are passed as extra={"fields": {...}}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain lines, structured fields appended as JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        return f"{line} {json.dumps(fields, default=str, ensure_ascii=False)}" if fields else line
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the event loop: records that do not fit in the queue are dropped and counted"""
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.increment("log_records_dropped_total")
+
+
+def setup_logging():
+    """Route all gateway logging through a bounded queue drained by a background thread"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if LoggingConfig["format"] == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(TextFormatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s", "%Y-%m-%d %H:%M:%S"))
+
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LoggingConfig["queue_size"])
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(NonBlockingQueueHandler(records))
+    root.setLevel(LoggingConfig["level"])
+    for logger_name, level in LoggingConfig["module_levels"].items():
+        logging.getLogger(logger_name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any, level: int = logging.DEBUG, **fields: Any):
+    """
+    Log a potentially large payload. Nothing is serialized unless the level is
+    enabled; payloads above payload_max_chars are logged only for a sampled
+    fraction of calls and truncated, with their full size recorded.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str, ensure_ascii=False)
+    max_chars = LoggingConfig["payload_max_chars"]
+    if len(text) > max_chars:
+        if random.random() >= LoggingConfig["payload_sample_rate"]:
+            return
+        fields["payload_truncated"] = True
+    fields["payload_chars"] = len(text)
+    fields["payload"] = text[:max_chars]
+    logger.log(level, message, extra={"fields": fields})
@@ -0,0 +1,31 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from src import metrics
+
+# call key -> task of the tool call currently in flight for it
+_in_flight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+
+async def coalesce_tool_call(key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Single-flight execution: the first caller for `key` starts `call`, concurrent
+    callers with the same key await that same task. The task is shielded, so a
+    cancelled caller (e.g. a discarded speculative call) does not cancel the
+    call for the others.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(call())
+        _in_flight[key] = task
+
+        def _remove(finished: "asyncio.Task[Any]"):
+            if _in_flight.get(key) is finished:
+                del _in_flight[key]
+
+        task.add_done_callback(_remove)
+        metrics.increment("tool_calls_executed_total", server=key[0], tool=key[1])
+    else:
+        metrics.increment("tool_calls_coalesced_total", server=key[0], tool=key[1])
+
+    return await asyncio.shield(task)
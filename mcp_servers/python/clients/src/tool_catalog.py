@@ -0,0 +1,135 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.client_and_server_config import ToolsMetadataConfig
+from src.credential_handles import CREDENTIALS_HANDLE_ARG
+from src.llm.gemini import gemini_function_declaration
+
+# Global tool catalog: server name -> OpenAI-style tool definitions
+ToolCatalog: Dict[str, List[Dict[str, Any]]] = {}
+
+# server name -> tool name -> behaviour metadata (read_only, idempotent, cache_ttl_seconds, required_args)
+ToolMetadata: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+# Arguments injected by the gateway, never produced by the LLM
+CREDENTIAL_ARGS = ("__credentials__", "server_credentials", CREDENTIALS_HANDLE_ARG)
+
+
+def normalize_tool_args(args: Optional[Dict[str, Any]]) -> str:
+    """Canonical form of tool arguments without the injected credentials"""
+    return json.dumps(
+        {k: v for k, v in (args or {}).items() if k not in CREDENTIAL_ARGS},
+        sort_keys=True,
+        default=str
+    )
+
+
+def json_safe(value: Any) -> Any:
+    """JSON-serializable form of an MCP result. Pydantic models are dumped with
+    their extra fields (e.g. TextContent meta), which __dict__ leaves out."""
+    def default(obj: Any) -> Any:
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump(mode="json", by_alias=True, exclude_none=True)
+        return getattr(obj, "__dict__", str(obj))
+
+    return json.loads(json.dumps(value, default=default))
+
+
+def tool_to_function_dict(tool: Any, hidden_args: Sequence[str] = ()) -> Dict[str, Any]:
+    """Convert an MCP tool into the OpenAI function tool format used by all clients.
+    The hidden_args are left out of the parameters shown to the LLM."""
+    input_schema = getattr(tool, "inputSchema", {
+        "type": "object",
+        "properties": {},
+        "required": []
+    })
+    if hidden_args:
+        input_schema = dict(input_schema, properties={
+            name: schema for name, schema in input_schema.get("properties", {}).items() if name not in hidden_args
+        })
+
+    return {
+        "type": "function",
+        "function": {
+            "name": tool.name,
+            "description": getattr(tool, "description", f"Tool for {tool.name}"),
+            "parameters": input_schema
+        }
+    }
+
+
+def build_tool_metadata(server_name: str, tool: Any) -> Dict[str, Any]:
+    """Merge the tool's MCP annotations with ToolsMetadataConfig"""
+    annotations = getattr(tool, "annotations", None)
+    read_only = bool(getattr(annotations, "readOnlyHint", False))
+    idempotent = bool(getattr(annotations, "idempotentHint", False))
+    input_schema = getattr(tool, "inputSchema", None) or {}
+
+    metadata = {
+        "read_only": read_only,
+        "idempotent": idempotent,
+        "cache_ttl_seconds": 0,
+        "required_args": [arg for arg in input_schema.get("required", []) if arg not in CREDENTIAL_ARGS]
+    }
+    configured = ToolsMetadataConfig.get(server_name, {}).get(tool.name, {})
+    metadata.update(configured)
+    # Reads never change server state, so repeating them is safe unless configured
+    # otherwise (reads returning a new result on every call)
+    if "idempotent" not in configured:
+        metadata["idempotent"] = metadata["idempotent"] or metadata["read_only"]
+    return metadata
+
+
+def is_write_call(metadata: Dict[str, Any], args: Optional[Dict[str, Any]]) -> bool:
+    """A call to a write tool, or to a read-only tool with one of its write_args set"""
+    return not metadata["read_only"] or any((args or {}).get(arg) for arg in metadata.get("write_args", ()))
+
+
+def is_idempotent_call(metadata: Dict[str, Any], args: Optional[Dict[str, Any]]) -> bool:
+    """A call to an idempotent tool, or to another tool with one of its idempotent_args set"""
+    return metadata.get("idempotent", False) or any((args or {}).get(arg) is not None for arg in metadata.get("idempotent_args", ()))
+
+
+def reads_files(metadata: Dict[str, Any], args: Any) -> bool:
+    """A call passing a file reference: an object, at any depth, with one of the tool's file_keys"""
+    file_keys = metadata.get("file_keys", ())
+    if not file_keys:
+        return False
+    if isinstance(args, dict):
+        return any(key in args for key in file_keys) or any(reads_files(metadata, value) for value in args.values())
+    if isinstance(args, list):
+        return any(reads_files(metadata, value) for value in args)
+    return False
+
+
+def get_tool_metadata(server_name: str, tool_name: str) -> Dict[str, Any]:
+    """Metadata of a catalogued tool, unknown tools are treated as writes"""
+    return ToolMetadata.get(server_name, {}).get(tool_name, {"read_only": False, "idempotent": False, "cache_ttl_seconds": 0, "required_args": []})
+
+
+async def build_tool_catalog(server_name: str, session: Any) -> List[Dict[str, Any]]:
+    """List the tools of one server, store them and pre-convert the Gemini declarations"""
+    tools_response = await session.list_tools()
+    metadata = {tool.name: build_tool_metadata(server_name, tool) for tool in tools_response.tools}
+    tools = [tool_to_function_dict(tool, metadata[tool.name].get("hidden_args", ())) for tool in tools_response.tools]
+    ToolMetadata[server_name] = metadata
+    for tool in tools:
+        gemini_function_declaration(tool)
+
+    ToolCatalog[server_name] = tools
+    return tools
+
+
+def install_tool_catalog(server_name: str, tools: List[Dict[str, Any]], metadata: Dict[str, Dict[str, Any]]):
+    """Adopt a catalog built elsewhere (the broker of a multi-worker gateway)"""
+    ToolMetadata[server_name] = metadata
+    for tool in tools:
+        gemini_function_declaration(tool)
+    ToolCatalog[server_name] = tools
+
+
+async def get_server_tools(server_name: str, session: Any) -> List[Dict[str, Any]]:
+    """Cached tool definitions of a server, built on first use"""
+    if server_name not in ToolCatalog:
+        await build_tool_catalog(server_name, session)
+    return ToolCatalog[server_name]
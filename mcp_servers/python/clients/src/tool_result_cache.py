@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src import metrics
+from src.client_and_server_config import ToolResultCacheConfig
+from src.tool_catalog import normalize_tool_args
+
+# (server, tool, normalized args, credential fingerprint) -> (expires_at, result)
+_results: "OrderedDict[Tuple[str, str, str, str], Tuple[float, Any]]" = OrderedDict()
+
+
+class SharedResultStore:
+    """
+    Tool results shared by the workers of a multi-worker gateway, kept in a
+    local SQLite file. Expiry uses wall-clock time because it is compared
+    across processes; least recently used entries are pruned past max_entries.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS tool_results ("
+            "key TEXT PRIMARY KEY, server TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "used_at REAL NOT NULL, result TEXT NOT NULL)"
+        )
+        self._connection().execute("CREATE INDEX IF NOT EXISTS tool_results_server ON tool_results (server)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at, result FROM tool_results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+        if row[0] < now:
+            self._connection().execute("DELETE FROM tool_results WHERE key = ?", (key,))
+            return False, None
+        self._connection().execute("UPDATE tool_results SET used_at = ? WHERE key = ?", (now, key))
+        return True, json.loads(row[1])
+
+    def put(self, key: str, server: str, result: Any, ttl_seconds: float) -> int:
+        """Store a result, returns the number of entries evicted to stay within max_entries"""
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO tool_results (key, server, expires_at, used_at, result) VALUES (?, ?, ?, ?, ?)",
+            (key, server, now + ttl_seconds, now, json.dumps(result))
+        )
+        evicted = connection.execute(
+            "DELETE FROM tool_results WHERE key IN (SELECT key FROM tool_results ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (ToolResultCacheConfig["max_entries"],)
+        ).rowcount
+        return max(evicted, 0)
+
+    def invalidate_server(self, server: str) -> int:
+        return self._connection().execute("DELETE FROM tool_results WHERE server = ?", (server,)).rowcount
+
+
+# Set in the workers of a multi-worker gateway, in-process cache otherwise
+_shared_store: Optional[SharedResultStore] = (
+    SharedResultStore(os.environ["MCP_SHARED_CACHE_PATH"]) if os.environ.get("MCP_SHARED_CACHE_PATH") else None
+)
+
+
+def credential_fingerprint(credentials: Any) -> str:
+    """Stable digest of a server's credentials, so they are never used as a raw key"""
+    return hashlib.sha256(json.dumps(credentials or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def tool_call_key(server: str, tool_name: str, args: Optional[Dict[str, Any]], credentials: Any) -> Tuple[str, str, str, str]:
+    return server, tool_name, normalize_tool_args(args), credential_fingerprint(credentials)
+
+
+def is_cacheable(metadata: Dict[str, Any]) -> bool:
+    return ToolResultCacheConfig["enabled"] and metadata.get("read_only", False) and metadata.get("cache_ttl_seconds", 0) > 0
+
+
+def is_successful_result(result: Any) -> bool:
+    """Only well-formed, non-error tool results are cached. The servers report most
+    failures as text content starting with "Error", not through isError."""
+    if not isinstance(result, dict) or result.get("isError", False):
+        return False
+    for item in result.get("content") or []:
+        text = item.get("text", "") if isinstance(item, dict) else ""
+        if text.startswith(("Error", "LINE API Error")):
+            return False
+    return True
+
+
+def get(key: Tuple[str, str, str, str]) -> Tuple[bool, Any]:
+    """(hit, result) for a cache key, dropping the entry if it expired"""
+    if _shared_store is not None:
+        hit, result = _shared_store.get(json.dumps(key))
+        metrics.increment("tool_cache_hits_total" if hit else "tool_cache_misses_total", server=key[0], tool=key[1])
+        return hit, result
+
+    entry = _results.get(key)
+    if entry is None:
+        metrics.increment("tool_cache_misses_total", server=key[0], tool=key[1])
+        return False, None
+    expires_at, result = entry
+    if expires_at < time.monotonic():
+        del _results[key]
+        metrics.increment("tool_cache_misses_total", server=key[0], tool=key[1])
+        return False, None
+    _results.move_to_end(key)
+    metrics.increment("tool_cache_hits_total", server=key[0], tool=key[1])
+    return True, result
+
+
+def put(key: Tuple[str, str, str, str], result: Any, ttl_seconds: float):
+    if _shared_store is not None:
+        evicted = _shared_store.put(json.dumps(key), key[0], result, ttl_seconds)
+        if evicted:
+            metrics.increment("tool_cache_evictions_total", value=evicted)
+        return
+
+    _results[key] = (time.monotonic() + ttl_seconds, result)
+    _results.move_to_end(key)
+    while len(_results) > ToolResultCacheConfig["max_entries"]:
+        _results.popitem(last=False)
+        metrics.increment("tool_cache_evictions_total")
+
+
+def invalidate_server(server: str):
+    """Drop every cached result of a server, called after one of its write tools ran"""
+    if _shared_store is not None:
+        invalidated = _shared_store.invalidate_server(server)
+    else:
+        stale = [key for key in _results if key[0] == server]
+        for key in stale:
+            del _results[key]
+        invalidated = len(stale)
+    if invalidated:
+        metrics.increment("tool_cache_invalidations_total", value=invalidated, server=server)
@@ -0,0 +1,46 @@
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from src.tool_catalog import get_server_tools
+
+# Separator between server and tool name for tools whose name is not unique
+NAMESPACE_SEPARATOR = "__"
+
+
+def namespaced_tool_name(server: str, tool_name: str) -> str:
+    return f"{server}{NAMESPACE_SEPARATOR}{tool_name}"
+
+
+async def build_tool_index(selected_servers: List[str], sessions: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Tuple[str, str]]]:
+    """
+    Tools of all selected servers plus an index from the name the LLM sees to
+    (server, tool name on that server). Names offered by more than one selected
+    server are exposed as "<server>__<tool>", unique names are left untouched.
+    """
+    server_tools = {server: await get_server_tools(server, sessions[server]) for server in selected_servers}
+    name_counts = Counter(
+        tool["function"]["name"] for tools in server_tools.values() for tool in tools
+    )
+
+    tools_arr: List[Dict[str, Any]] = []
+    tool_index: Dict[str, Tuple[str, str]] = {}
+    for server, tools in server_tools.items():
+        for tool in tools:
+            tool_name = tool["function"]["name"]
+            if name_counts[tool_name] > 1:
+                exposed_name = namespaced_tool_name(server, tool_name)
+                tool = {**tool, "function": {**tool["function"], "name": exposed_name}}
+            else:
+                exposed_name = tool_name
+            tools_arr.append(tool)
+            tool_index[exposed_name] = (server, tool_name)
+
+    return tools_arr, tool_index
+
+
+def resolve_tool(tool_index: Dict[str, Any], tool_name: str, default_server: str) -> Tuple[str, str]:
+    """(server, tool name on that server) for a tool name produced by the LLM"""
+    if tool_name in tool_index:
+        server, server_tool_name = tool_index[tool_name]
+        return server, server_tool_name
+    return default_server, tool_name
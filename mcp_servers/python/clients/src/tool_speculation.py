@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from src import metrics
+from src.tool_catalog import get_tool_metadata, normalize_tool_args
+
+
+class ToolSpeculation:
+    """
+    Opt-in speculative execution of read-only tools. Tools picked by the router
+    LLM that are read-only and take no required arguments are started right
+    away, while the argument-producing LLM call is still in flight. When that
+    call confirms the tool with the predicted (empty) arguments the running
+    result is reused; on a mismatch, or if the tool is never confirmed, the
+    speculative call is cancelled and counted as wasted.
+    """
+
+    def __init__(self, resolve_tool: Callable[[str], Tuple[str, str]], credentials: Any, call_tool: Callable[..., Awaitable[Any]], enabled: bool = False):
+        # resolve_tool maps the LLM-facing tool name to (server, tool name on that server)
+        self.resolve_tool = resolve_tool
+        self.credentials = credentials
+        self.call_tool = call_tool
+        self.enabled = enabled
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+
+    def start(self, tool_names: List[str]):
+        """Start eligible tools selected by the router"""
+        if not self.enabled:
+            return
+        for tool_name in tool_names:
+            server, server_tool_name = self.resolve_tool(tool_name)
+            metadata = get_tool_metadata(server, server_tool_name)
+            if tool_name in self.tasks or not metadata["read_only"] or metadata["required_args"] or metadata.get("ordered"):
+                continue
+            predicted_args: Dict[str, Any] = {}
+            self.tasks[tool_name] = {
+                "server": server,
+                "args_key": normalize_tool_args(predicted_args),
+                "started_at": time.monotonic(),
+                "task": asyncio.create_task(
+                    self.call_tool(server, self.credentials, server_tool_name, dict(predicted_args))
+                )
+            }
+            metrics.increment("speculative_tool_calls_started_total", server=server, tool=server_tool_name)
+
+    async def execute(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """Result for a confirmed tool call, from the speculative call when it matches"""
+        server, server_tool_name = self.resolve_tool(tool_name)
+        speculation = self.tasks.pop(tool_name, None)
+        if speculation is not None:
+            if speculation["args_key"] == normalize_tool_args(args):
+                metrics.increment("speculative_tool_calls_hit_total", server=server, tool=server_tool_name)
+                return await speculation["task"]
+            metrics.increment("speculative_tool_calls_mismatch_total", server=server, tool=server_tool_name)
+            self._discard(tool_name, speculation)
+        return await self.call_tool(server, self.credentials, server_tool_name, args)
+
+    def cancel_pending(self):
+        """Cancel speculative calls that were never confirmed"""
+        for tool_name, speculation in self.tasks.items():
+            self._discard(tool_name, speculation)
+        self.tasks = {}
+
+    def _discard(self, tool_name: str, speculation: Dict[str, Any]):
+        task = speculation["task"]
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()  # mark any failure as retrieved
+        metrics.increment("speculative_tool_calls_wasted_total", server=speculation["server"], tool=tool_name)
+        metrics.observe("speculative_tool_wasted_seconds", time.monotonic() - speculation["started_at"], server=speculation["server"])
@@ -38,6 +38,12 @@ app = Server("line-mcp")
 line_bot_api = None
 handler = None
 
+# Credentials registered by the gateway, keyed by the opaque handle it sends
+CREDENTIALS_HANDLE_ARG = "__credentials_handle__"
+credential_store: Dict[str, dict] = {}
+# (LineBotApi, WebhookHandler) per credentials handle, built once and reused
+line_client_cache: Dict[str, tuple] = {}
+
 # Tool handler base class
 class LineToolHandler:
     def __init__(self, name: str):
@@ -50,9 +56,12 @@ class LineToolHandler:
         raise NotImplementedError()
 
 # Initialize LINE Bot API
-def initialize_line_bot(credentials: dict):
-    """Initialize LINE Bot API with credentials"""
+def initialize_line_bot(credentials: dict, handle: Optional[str] = None):
+    """Initialize LINE Bot API with credentials, reusing the clients of a known credentials handle"""
     global line_bot_api, handler
+    if handle and handle in line_client_cache:
+        line_bot_api, handler = line_client_cache[handle]
+        return True
     try:
         channel_access_token = credentials.get("channel_access_token")
         channel_secret = credentials.get("channel_secret")
@@ -65,7 +74,9 @@ def initialize_line_bot(credentials: dict):
         # Webhook handler is optional for one-way messaging
         if channel_secret:
             handler = WebhookHandler(channel_secret)
-        
+
+        if handle:
+            line_client_cache[handle] = (line_bot_api, handler)
         logger.info("LINE Bot API initialized successfully")
         return True
     except Exception as e:
@@ -115,7 +126,7 @@ class SendTextMessageToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             to = args["to"]
@@ -180,7 +191,7 @@ class SendRichMessageToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             to = args["to"]
@@ -288,7 +299,7 @@ class SendImageMessageToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             to = args["to"]
@@ -336,7 +347,7 @@ class GetUserProfileToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             user_id = args["user_id"]
@@ -384,7 +395,7 @@ class GetGroupSummaryToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             group_id = args["group_id"]
@@ -439,7 +450,7 @@ class SendFlexMessageToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             to = args["to"]
@@ -516,7 +527,7 @@ class BroadcastMessageToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             message_text = args["message"]
@@ -562,7 +573,7 @@ class WebhookEventHandlerToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             webhook_data = args["webhook_data"]
@@ -650,7 +661,7 @@ class RichMenuToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             action = args["action"]
@@ -748,7 +759,7 @@ class GroupMemberToolHandler(LineToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            if not initialize_line_bot(credentials):
+            if not initialize_line_bot(credentials, args.get(CREDENTIALS_HANDLE_ARG)):
                 return [TextContent(type="text", text="Error: Failed to initialize LINE Bot API")]
 
             action = args["action"]
@@ -811,6 +822,21 @@ async def handle_list_tools() -> List[Tool]:
     """List all available LINE tools"""
     return [th.get_tool_description() for th in tool_handlers.values()]
 
+def resolve_credentials(arguments: Dict[str, Any]) -> bool:
+    """Register credentials sent along with a handle, or restore them from the handle alone"""
+    handle = arguments.get(CREDENTIALS_HANDLE_ARG)
+    if not handle:
+        return True
+    if arguments.get("__credentials__"):
+        if credential_store.get(handle) != arguments["__credentials__"]:
+            line_client_cache.pop(handle, None)
+        credential_store[handle] = arguments["__credentials__"]
+        return True
+    if handle not in credential_store:
+        return False
+    arguments["__credentials__"] = credential_store[handle]
+    return True
+
 @app.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
     """Handle tool calls for LINE operations"""
@@ -818,7 +844,10 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[Tex
         tool_handler = get_tool_handler(name)
         if not tool_handler:
             raise ValueError(f"Unknown tool: {name}")
-        
+
+        if not resolve_credentials(arguments):
+            return [TextContent(type="text", text=f"Error in {name}: Unknown credentials handle, send __credentials__ again")]
+
         return tool_handler.run_tool(arguments)
         
     except Exception as e:
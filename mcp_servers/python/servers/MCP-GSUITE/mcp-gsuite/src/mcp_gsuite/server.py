@@ -152,6 +152,7 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
         if not tool_handler:
             raise ValueError(f"Unknown tool: {name}")
 
+        toolhandler.resolve_credentials(arguments)
         return tool_handler.run_tool(arguments)
     except Exception as e:
         logging.error(traceback.format_exc())
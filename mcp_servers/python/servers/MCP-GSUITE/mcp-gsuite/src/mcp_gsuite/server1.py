@@ -78,7 +78,7 @@ async def call_tool(payload: dict):
         arguments = payload.get("arguments")
         
         logger.info(f"Received tool call: {name}")
-        logger.info(f"Payload arguments: {arguments}")
+        logger.debug("Payload argument names: %s", sorted(arguments) if isinstance(arguments, dict) else type(arguments).__name__)
 
         # Ensure the payload matches expectations
         if not isinstance(arguments, dict):
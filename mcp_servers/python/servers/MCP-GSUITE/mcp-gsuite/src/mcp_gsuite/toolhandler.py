@@ -10,6 +10,39 @@ from . import gauth
 
 USER_ID_ARG = "__user_id__"
 CREDENTIALS_ARG = "__credentials__"
+CREDENTIALS_HANDLE_ARG = "__credentials_handle__"
+
+# credentials registered by the gateway, keyed by the opaque handle it sends
+credential_store: dict[str, dict] = {}
+# (handle, service class) -> Google API service, built once per credentials handle
+service_cache: dict[tuple, object] = {}
+
+
+def resolve_credentials(args: dict) -> None:
+    """Register credentials sent along with a handle, or restore them from the handle alone"""
+    handle = args.get(CREDENTIALS_HANDLE_ARG)
+    if not handle:
+        return
+    if args.get(CREDENTIALS_ARG):
+        if credential_store.get(handle) != args[CREDENTIALS_ARG]:
+            for key in [key for key in service_cache if key[0] == handle]:
+                del service_cache[key]
+        credential_store[handle] = args[CREDENTIALS_ARG]
+        return
+    if handle not in credential_store:
+        raise RuntimeError(f"Unknown credentials handle, send {CREDENTIALS_ARG} again")
+    args[CREDENTIALS_ARG] = credential_store[handle]
+
+
+def get_service(service_class, args: dict):
+    """Service for the call's credentials, reused across calls sharing a credentials handle"""
+    handle = args.get(CREDENTIALS_HANDLE_ARG)
+    if not handle:
+        return service_class(credentials=args.get(CREDENTIALS_ARG))
+    key = (handle, service_class)
+    if key not in service_cache:
+        service_cache[key] = service_class(credentials=args.get(CREDENTIALS_ARG))
+    return service_cache[key]
 
 class ToolHandler():
     def __init__(self, tool_name: str):
@@ -50,7 +50,7 @@ class ListCalendarsToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        calendar_service = calendar.CalendarService(credentials=credentials)
+        calendar_service = toolhandler.get_service(calendar.CalendarService, args)
         calendars = calendar_service.list_calendars()
 
         return [
@@ -106,7 +106,7 @@ class GetCalendarEventsToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        calendar_service = calendar.CalendarService(credentials=credentials)
+        calendar_service = toolhandler.get_service(calendar.CalendarService, args)
         events = calendar_service.get_events(
             time_min=args.get('time_min'),
             time_max=args.get('time_max'),
@@ -189,7 +189,7 @@ class CreateCalendarEventToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        calendar_service = calendar.CalendarService(credentials=credentials)
+        calendar_service = toolhandler.get_service(calendar.CalendarService, args)
         event = calendar_service.create_event(
             summary=args["summary"],
             start_time=args["start_time"],
@@ -248,7 +248,7 @@ class DeleteCalendarEventToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        calendar_service = calendar.CalendarService(credentials=credentials)
+        calendar_service = toolhandler.get_service(calendar.CalendarService, args)
         success = calendar_service.delete_event(
             event_id=args["event_id"],
             send_notifications=args.get("send_notifications", True),
@@ -310,7 +310,7 @@ class CheckAvailabilityToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        calendar_service = calendar.CalendarService(credentials=credentials)
+        calendar_service = toolhandler.get_service(calendar.CalendarService, args)
         availability = calendar_service.check_availability(
             email=args["email"],
             start_time=args["start_time"],
@@ -64,7 +64,7 @@ class QueryEmailsToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         query = args.get('query')
         max_results = args.get('max_results', 100)
         emails = gmail_service.query_emails(query=query, max_results=max_results)
@@ -108,7 +108,7 @@ class GetEmailByIdToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         email, attachments = gmail_service.get_email_by_id_with_attachments(args["email_id"])
 
         if email is None:
@@ -163,7 +163,7 @@ class BulkGetEmailsByIdsToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         
         results = []
         for email_id in args["email_ids"]:
@@ -240,7 +240,7 @@ class CreateDraftToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         draft = gmail_service.create_draft(
             to=args["to"],
             subject=args["subject"],
@@ -297,7 +297,7 @@ class DeleteDraftToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         success = gmail_service.delete_draft(args["draft_id"])
 
         return [
@@ -359,7 +359,7 @@ class ReplyEmailToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         
         # First get the original message to extract necessary information
         original_message = gmail_service.get_email_by_id(args["original_message_id"])
@@ -450,7 +450,7 @@ class GetAttachmentToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         attachment_data = gmail_service.get_attachment(args["message_id"], args["attachment_id"])
 
         if attachment_data is None:
@@ -533,7 +533,7 @@ class BulkSaveAttachmentsToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        gmail_service = gmail.GmailService(credentials=credentials)
+        gmail_service = toolhandler.get_service(gmail.GmailService, args)
         results = []
 
         for attachment_info in args["attachments"]:
@@ -642,7 +642,7 @@ class SendEmailToolHandler(toolhandler.ToolHandler):
                 raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
             # Create Gmail service
-            gmail_service = gmail.GmailService(credentials=credentials)
+            gmail_service = toolhandler.get_service(gmail.GmailService, args)
             
             # Send the email with HTML flag if specified
             sent_message = gmail_service.send_email(
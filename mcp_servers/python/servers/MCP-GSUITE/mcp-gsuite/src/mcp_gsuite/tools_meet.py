@@ -65,7 +65,7 @@ class CreateMeetingToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        meet_service = meet.MeetService(credentials=credentials)
+        meet_service = toolhandler.get_service(meet.MeetService, args)
         meeting = meet_service.create_meeting(
             summary=args["summary"],
             start_time=args["start_time"],
@@ -115,7 +115,7 @@ class CancelMeetingToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        meet_service = meet.MeetService(credentials=credentials)
+        meet_service = toolhandler.get_service(meet.MeetService, args)
         success = meet_service.cancel_meeting(event_id=args["event_id"])
 
         return [
@@ -172,7 +172,7 @@ class RescheduleMeetingToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        meet_service = meet.MeetService(credentials=credentials)
+        meet_service = toolhandler.get_service(meet.MeetService, args)
         updated_meeting = meet_service.reschedule_meeting(
             event_id=args["event_id"],
             new_start_time=args["new_start_time"],
@@ -231,7 +231,7 @@ class GetAllMeetingsToolHandler(toolhandler.ToolHandler):
         if not credentials:
             raise RuntimeError(f"Missing required argument: {toolhandler.CREDENTIALS_ARG}")
 
-        meet_service = meet.MeetService(credentials=credentials)
+        meet_service = toolhandler.get_service(meet.MeetService, args)
         meetings = meet_service.get_all_meetings(
             time_min=args.get("time_min"),
             time_max=args.get("time_max"),
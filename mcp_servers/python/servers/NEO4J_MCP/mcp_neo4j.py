@@ -31,6 +31,12 @@ logger = logging.getLogger("neo4j-mcp")
 # MCP server instance
 app = Server("neo4j-mcp")
 
+# Credentials registered by the gateway, keyed by the opaque handle it sends
+CREDENTIALS_HANDLE_ARG = "__credentials_handle__"
+credential_store: Dict[str, dict] = {}
+# One long-lived connection (driver and its pool) per credentials handle
+connection_cache: Dict[str, "Neo4jConnection"] = {}
+
 class Neo4jConnection:
     """Neo4j database connection manager"""
     
@@ -43,6 +49,8 @@ class Neo4jConnection:
         self.password = password
         self.database = database
         self._driver = None
+        # Shared connections are cached per credentials handle and outlive a tool call
+        self.shared = False
     
     def connect(self):
         """Establish connection to Neo4j"""
@@ -60,8 +68,8 @@ class Neo4jConnection:
             return False
     
     def close(self):
-        """Close connection"""
-        if self._driver:
+        """Close connection, shared connections stay open for the next call"""
+        if self._driver and not self.shared:
             self._driver.close()
     
     def execute_query(self, query: str, parameters: dict = None):
@@ -172,8 +180,11 @@ class Neo4jToolHandler:
     def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         raise NotImplementedError()
 
-    def get_connection(self, credentials: dict) -> Neo4jConnection:
-        """Get Neo4j connection from credentials"""
+    def get_connection(self, credentials: dict, handle: Optional[str] = None) -> Neo4jConnection:
+        """Get Neo4j connection from credentials, reused across calls when a credentials handle is given"""
+        if handle and handle in connection_cache:
+            return connection_cache[handle]
+
         if not credentials:
             raise ValueError("Neo4j credentials are required")
         
@@ -188,7 +199,10 @@ class Neo4jToolHandler:
         conn = Neo4jConnection(uri, username, password, database)
         if not conn.connect():
             raise Exception("Failed to connect to Neo4j database")
-        
+
+        if handle:
+            conn.shared = True
+            connection_cache[handle] = conn
         return conn
 
 # 1. Database Management Tools
@@ -210,7 +224,7 @@ class DatabaseInfoToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             # Get database info
             queries = [
@@ -253,7 +267,7 @@ class ListConstraintsToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             result = conn.execute_query("SHOW CONSTRAINTS")
             conn.close()
@@ -281,7 +295,7 @@ class ListIndexesToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             result = conn.execute_query("SHOW INDEXES")
             conn.close()
@@ -309,7 +323,7 @@ class ListLabelsToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             # Get all labels and their counts
             result = conn.execute_query("CALL db.labels() YIELD label RETURN label")
@@ -359,7 +373,7 @@ class CreateNodeToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             labels = args["labels"]
             properties = args["properties"]
@@ -408,7 +422,7 @@ class FindNodesToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             label = args.get("label")
             properties = args.get("properties", {})
@@ -513,7 +527,7 @@ class UpdateNodeToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             node_id = args.get("node_id")
             match_properties = args.get("match_properties", {})
@@ -594,7 +608,7 @@ class DeleteNodeToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             node_id = args.get("node_id")
             match_properties = args.get("match_properties", {})
@@ -688,7 +702,7 @@ class CreateRelationshipToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             from_node_id = args.get("from_node_id")
             to_node_id = args.get("to_node_id")
@@ -792,7 +806,7 @@ class FindRelationshipsToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             relationship_type = args.get("relationship_type")
             properties = args.get("properties", {})
@@ -885,7 +899,7 @@ class ShortestPathToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             from_node_id = args.get("from_node_id")
             to_node_id = args.get("to_node_id")
@@ -998,7 +1012,7 @@ class GetNeighborsToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             node_id = args.get("node_id")
             node_match = args.get("node_match", {})
@@ -1086,7 +1100,7 @@ class CreateIndexToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             label = args["label"]
             property_name = args["property"]
@@ -1142,7 +1156,7 @@ class CreateConstraintToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             constraint_type = args["constraint_type"]
             label = args["label"]
@@ -1213,7 +1227,7 @@ class ImportCSVToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             csv_url = args["csv_url"]
             create_nodes = args.get("create_nodes", True)
@@ -1282,7 +1296,7 @@ class ExecuteCypherToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             query = args["query"]
             parameters = args.get("parameters", {})
@@ -1336,7 +1350,7 @@ class ExplainQueryToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             query = args["query"]
             parameters = args.get("parameters", {})
@@ -1377,7 +1391,7 @@ class ProfileQueryToolHandler(Neo4jToolHandler):
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
             credentials = args.get("__credentials__", {})
-            conn = self.get_connection(credentials)
+            conn = self.get_connection(credentials, args.get(CREDENTIALS_HANDLE_ARG))
             
             query = args["query"]
             parameters = args.get("parameters", {})
@@ -1428,6 +1442,24 @@ async def handle_list_tools() -> List[Tool]:
     """List all available Neo4j tools"""
     return [th.get_tool_description() for th in tool_handlers.values()]
 
+def resolve_credentials(arguments: Dict[str, Any]) -> bool:
+    """Register credentials sent along with a handle, or restore them from the handle alone"""
+    handle = arguments.get(CREDENTIALS_HANDLE_ARG)
+    if not handle:
+        return True
+    if arguments.get("__credentials__"):
+        if credential_store.get(handle) != arguments["__credentials__"]:
+            stale = connection_cache.pop(handle, None)
+            if stale:
+                stale.shared = False
+                stale.close()
+        credential_store[handle] = arguments["__credentials__"]
+        return True
+    if handle not in credential_store:
+        return False
+    arguments["__credentials__"] = credential_store[handle]
+    return True
+
 @app.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
     """Handle tool calls for Neo4j operations"""
@@ -1435,7 +1467,10 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[Tex
         tool_handler = get_tool_handler(name)
         if not tool_handler:
             raise ValueError(f"Unknown tool: {name}")
-        
+
+        if not resolve_credentials(arguments):
+            return [TextContent(type="text", text=f"Error in {name}: Unknown credentials handle, send __credentials__ again")]
+
         return tool_handler.run_tool(arguments)
         
     except Exception as e:
@@ -1,9 +1,33 @@
+import ast
+import asyncio
+import base64
+import hashlib
+import inspect
+import io
+import json
 import logging
+import os
+import re
+import threading
+import warnings
+import weakref
+from collections import OrderedDict
 from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
 from typing import Any, Dict, List, Optional
+import anyio
 import numpy as np
+import scipy.linalg
+import scipy.signal
+import scipy.sparse
+import scipy.sparse.linalg
 import traceback
 from mcp.server import Server
+from mcp.server.session import ServerSession
+from mcp.shared.context import RequestContext
+from mcp.shared.exceptions import McpError
+from mcp.shared.session import RequestResponder
 from mcp.types import (
     Tool,
     TextContent,
@@ -13,6 +37,11 @@ from mcp.types import (
 import mcp.server.stdio
 import mcp.types as types
 
+try:
+    from mcp.server import request_ctx
+except ImportError:  # mcp >= 1.2 moved the low-level server
+    from mcp.server.lowlevel.server import request_ctx
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("numpy-mcp")
@@ -21,33 +50,692 @@ logger = logging.getLogger("numpy-mcp")
 app = Server("numpy-mcp")
 
 # Helper functions
+def log_result(label: str, **arrays):
+    """Debug log of result shapes. Never print here: stdout carries the MCP protocol."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %s", label, {name: np.shape(value) for name, value in arrays.items()})
+
 def safe_numpy_array(data) -> np.ndarray:
-    """Safely convert to numpy array"""
+    """Safely convert to numpy array. Nested lists and binary encoded arrays are accepted."""
     try:
+        if isinstance(data, dict):
+            return np.asarray(decode_array(data), dtype=float)
         return np.array(data, dtype=float)
     except Exception as e:
         raise ValueError(f"Invalid array format: {str(e)}")
 
+def complex_pairs(real, imag):
+    """{"real", "imag"} pairs nested like the lists real and imag"""
+    if isinstance(real, list):
+        return [complex_pairs(real_item, imag_item) for real_item, imag_item in zip(real, imag)]
+    return {"real": float(real), "imag": float(imag)}
+
+def complex_from_pairs(value):
+    """Nested lists of complex numbers from nested lists of {"real", "imag"} pairs"""
+    if isinstance(value, list):
+        return [complex_from_pairs(item) for item in value]
+    return complex(value["real"], value["imag"])
+
+def is_complex_pairs(value) -> bool:
+    """A list, possibly nested, of {"real", "imag"} pairs"""
+    while isinstance(value, list) and value:
+        value = value[0]
+    return isinstance(value, dict) and "real" in value and "imag" in value
+
 def format_complex_result(result):
-    """Format complex numbers for JSON serialization"""
+    """Format complex numbers for JSON serialization, arrays as {"real", "imag"}
+    pairs nested in the shape of the array"""
     if np.iscomplexobj(result):
-        if result.ndim == 0:
-            return {"real": float(result.real), "imag": float(result.imag)}
-        else:
-            return [{"real": float(x.real), "imag": float(x.imag)} for x in result.flatten()]
+        return complex_pairs(result.real.tolist(), result.imag.tolist())
     return result.tolist() if hasattr(result, 'tolist') else result
 
+# Binary array transport
+#
+# Array arguments may be sent as {"encoding": "npy", "data": <base64 .npy file>}
+# or {"encoding": "raw", "data": <base64 buffer>, "dtype": "<f8", "shape": [rows, cols]}
+# instead of nested lists. Results use the same form when the call passes
+# "response_encoding": "npy" or "raw"; the default "json" returns nested lists
+# (complex arrays as nested lists of {"real", "imag"} pairs) and "split" returns
+# complex arrays as {"real": <nested lists>, "imag": <nested lists>}.
+ARRAY_ENCODINGS = ("json", "split", "npy", "raw")
+
+RESPONSE_ENCODING_SCHEMA = {
+    "type": "string",
+    "enum": list(ARRAY_ENCODINGS),
+    "description": "Encoding of array results: json (nested lists, default), split (like json, complex arrays as separate real and imag nested lists), npy (base64 .npy file) or raw (base64 little-endian buffer with dtype and shape)"
+}
+
+def decode_array(spec: Dict[str, Any]) -> np.ndarray:
+    """Array from its binary encoding, read in place with np.frombuffer"""
+    encoding = spec.get("encoding")
+    data = base64.b64decode(spec["data"], validate=True)
+    if encoding == "npy":
+        stream = io.BytesIO(data)
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        offset = stream.tell()
+    elif encoding == "raw":
+        shape = tuple(int(size) for size in spec["shape"])
+        fortran_order = spec.get("order", "C") == "F"
+        dtype = np.dtype(spec.get("dtype", "<f8"))
+        offset = 0
+    else:
+        raise ValueError(f"Unknown array encoding: {encoding}")
+
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not supported")
+    count = int(np.prod(shape, dtype=np.int64))
+    if len(data) - offset != count * dtype.itemsize:
+        raise ValueError(f"Buffer of {len(data) - offset} bytes does not match shape {tuple(shape)} of {dtype}")
+    array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+    return array.reshape(shape, order="F" if fortran_order else "C")
+
+def response_encoding(args: dict) -> str:
+    """Result encoding requested by the call"""
+    encoding = args.get("response_encoding") or "json"
+    if encoding not in ARRAY_ENCODINGS:
+        raise ValueError(f"Invalid response_encoding: {encoding}, expected one of {', '.join(ARRAY_ENCODINGS)}")
+    return encoding
+
+def encode_array(value, encoding: str):
+    """Array result in the requested encoding. Scalars are always returned as numbers."""
+    if encoding == "split" and np.iscomplexobj(value) and np.ndim(value) > 0:
+        array = np.asarray(value)
+        return {"real": array.real.tolist(), "imag": array.imag.tolist()}
+    if encoding in ("json", "split") or np.ndim(value) == 0:
+        return format_complex_result(np.asarray(value))
+    array = np.ascontiguousarray(value)
+    array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+    encoded = {"encoding": encoding, "dtype": array.dtype.str, "shape": list(array.shape)}
+    if encoding == "npy":
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        encoded["data"] = base64.b64encode(buffer.getbuffer()).decode("ascii")
+    else:
+        encoded["data"] = base64.b64encode(array.data).decode("ascii")
+    return encoded
+
+def array_text(encoded) -> str:
+    """Text form of an encoded result. Binary payloads are only sent in meta,
+    sparse matrices with list components are written out in csr form."""
+    if isinstance(encoded, dict) and "array_id" in encoded:
+        return stored_text(encoded)
+    if isinstance(encoded, dict) and "file" in encoded:
+        return f"<{encoded['dtype']} array of shape {tuple(encoded['shape'])} written to {encoded['file']}, summary {encoded['summary']}>"
+    if isinstance(encoded, dict) and "format" in encoded:
+        if any(isinstance(encoded[part], dict) for part in ("indptr", "indices", "data")):
+            return f"<{encoded['dtype']} sparse matrix of shape {tuple(encoded['shape'])} with {encoded['nnz']} stored values, {encoded['format']} encoded in meta>"
+        return json.dumps(encoded)
+    if isinstance(encoded, dict) and "encoding" in encoded:
+        return f"<{np.dtype(encoded['dtype']).name} array of shape {tuple(encoded['shape'])}, {encoded['encoding']} encoded in meta>"
+    return f"{encoded}"
+
+STORE_AS_SCHEMA = {
+    "type": "string",
+    "description": "Keep the result on the server under this array_id instead of returning it. Array arguments accept an array_id string in place of an array."
+}
+
+OUTPUT_FILE_SCHEMA = {
+    "type": "string",
+    "description": "Write the result to this .npy file (relative to the server data directory) and return a file handle with a summary instead of the array. Array arguments accept file handles {\"file\": \"path.npy\"}."
+}
+
+def with_array_transport(tool: Tool) -> Tool:
+    """Advertise response_encoding, store_as and output_file on a tool's input schema"""
+    schema = dict(tool.inputSchema)
+    schema["properties"] = {
+        **schema.get("properties", {}),
+        "response_encoding": RESPONSE_ENCODING_SCHEMA,
+        "store_as": STORE_AS_SCHEMA,
+        "output_file": OUTPUT_FILE_SCHEMA
+    }
+    return tool.model_copy(update={"inputSchema": schema})
+
+# Sparse matrices
+#
+# Sparse-aware tools accept matrices as
+# {"format": "coo", "shape": [rows, cols], "row": [...], "col": [...], "data": [...]} or
+# {"format": "csr", "shape": [rows, cols], "indptr": [...], "indices": [...], "data": [...]},
+# each component a list or a binary encoding. They are computed on in CSR
+# form, so memory scales with the non-zeros, and sparse results are returned
+# as csr with components in the requested response_encoding.
+SPARSE_FORMATS = ("coo", "csr")
+
+SPARSE_SOLVERS = ("auto", "cg", "gmres", "direct")
+
+# scipy renamed the relative tolerance of the iterative solvers from tol to rtol in 1.12
+ITERATIVE_TOLERANCE = "rtol" if "rtol" in inspect.signature(scipy.sparse.linalg.cg).parameters else "tol"
+
+def is_sparse_spec(value) -> bool:
+    return isinstance(value, dict) and "format" in value
+
+def sparse_component(value, dtype) -> np.ndarray:
+    component = decode_array(value) if isinstance(value, dict) else np.asarray(value)
+    if component.ndim != 1:
+        raise ValueError("Sparse matrix components must be 1-dimensional")
+    return component.astype(dtype, copy=False)
+
+def decode_sparse(spec: Dict[str, Any]) -> scipy.sparse.csr_array:
+    """CSR matrix from its coo or csr form. Duplicate coo entries are summed."""
+    sparse_format = spec.get("format")
+    shape = tuple(int(size) for size in spec["shape"])
+    if len(shape) != 2:
+        raise ValueError("Sparse matrices must be 2-dimensional")
+    data = sparse_component(spec["data"], float)
+    if sparse_format == "coo":
+        row, col = sparse_component(spec["row"], np.int64), sparse_component(spec["col"], np.int64)
+        if not len(row) == len(col) == len(data):
+            raise ValueError("row, col and data must have the same length")
+        if len(data) and (row.min() < 0 or row.max() >= shape[0] or col.min() < 0 or col.max() >= shape[1]):
+            raise ValueError(f"Sparse matrix index out of range for shape {shape}")
+        return scipy.sparse.coo_array((data, (row, col)), shape=shape).tocsr()
+    if sparse_format == "csr":
+        indices, indptr = sparse_component(spec["indices"], np.int64), sparse_component(spec["indptr"], np.int64)
+        matrix = scipy.sparse.csr_array((data, indices, indptr), shape=shape)
+        matrix.check_format(full_check=True)
+        return matrix
+    raise ValueError(f"Unknown sparse format: {sparse_format}, expected one of {', '.join(SPARSE_FORMATS)}")
+
+def encode_sparse(matrix, encoding: str) -> Dict[str, Any]:
+    matrix = scipy.sparse.csr_array(matrix)
+    if not matrix.has_canonical_format:
+        matrix = matrix.copy()
+        matrix.sum_duplicates()
+    return {
+        "format": "csr",
+        "shape": list(matrix.shape),
+        "dtype": matrix.dtype.name,
+        "nnz": int(matrix.nnz),
+        "indptr": encode_array(matrix.indptr, encoding),
+        "indices": encode_array(matrix.indices, encoding),
+        "data": encode_array(matrix.data, encoding)
+    }
+
+def array_nbytes(array) -> int:
+    if scipy.sparse.issparse(array):
+        return array.data.nbytes + array.indices.nbytes + array.indptr.nbytes
+    return array.nbytes
+
+def is_symmetric(matrix) -> bool:
+    if scipy.sparse.issparse(matrix):
+        return matrix.shape[0] == matrix.shape[1] and (matrix != matrix.T).nnz == 0
+    return matrix.shape[0] == matrix.shape[1] and np.array_equal(matrix, matrix.T)
+
+def solve_sparse(matrix, b: np.ndarray, method: str = "auto", tolerance: float = 1e-8, max_iterations: Optional[int] = None) -> tuple:
+    """Solve a sparse system column by column, returns (x, {"method", "converged", "residual"})"""
+    rows, cols = matrix.shape
+    if rows != cols:
+        raise ValueError("Sparse matrix must be square")
+    if b.shape[0] != rows:
+        raise ValueError(f"Right-hand side has {b.shape[0]} rows, the matrix has {rows}")
+    if method not in SPARSE_SOLVERS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {', '.join(SPARSE_SOLVERS)}")
+    if method == "auto":
+        # CG needs a symmetric positive definite matrix, a positive diagonal is the cheap necessary check
+        method = "cg" if is_symmetric(matrix) and np.all(matrix.diagonal() > 0) else "gmres"
+
+    columns = b.reshape(rows, -1)
+    converged = True
+    if method == "direct":
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", scipy.sparse.linalg.MatrixRankWarning)
+            try:
+                solution = scipy.sparse.linalg.spsolve(matrix.tocsc(), columns)
+            except scipy.sparse.linalg.MatrixRankWarning:
+                raise np.linalg.LinAlgError("Singular matrix")
+        solution = np.asarray(solution).reshape(columns.shape)
+    else:
+        solver = scipy.sparse.linalg.cg if method == "cg" else scipy.sparse.linalg.gmres
+        solution = np.empty(columns.shape)
+        for column in range(columns.shape[1]):
+            x, info = solver(matrix, columns[:, column], atol=0.0, maxiter=max_iterations, **{ITERATIVE_TOLERANCE: tolerance})
+            if info < 0:
+                raise np.linalg.LinAlgError(f"{method} broke down")
+            converged = converged and info == 0
+            solution[:, column] = x
+    scale = np.linalg.norm(columns) or 1.0
+    residual = float(np.linalg.norm(matrix @ solution - columns) / scale)
+    return solution.reshape(b.shape), {"method": method, "converged": converged, "residual": residual}
+
+# Array files
+#
+# Arrays larger than a message (or than memory) live in files under the data
+# directory: {"file": "a.npy"} opens a .npy file and
+# {"file": "a.bin", "dtype": "<f8", "shape": [rows, cols], "offset": 0, "order": "C"}
+# a raw binary file, both memory-mapped read-only. Results are written with
+# output_file, and the blocked_* tools stream tiles of at most
+# NUMPY_MCP_BLOCK_BYTES through memory.
+DATA_DIR = os.path.realpath(os.environ.get("NUMPY_MCP_DATA_DIR", "data"))
+BLOCK_BYTES = int(os.environ.get("NUMPY_MCP_BLOCK_BYTES", 64 * 1024 * 1024))
+
+ARRAY_FILE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "file": {"type": "string", "description": "Path relative to the server data directory"},
+        "dtype": {"type": "string", "description": "Element type of a raw binary file, e.g. <f8"},
+        "shape": {"type": "array", "items": {"type": "integer"}, "description": "Shape of a raw binary file, omitted for .npy files"},
+        "offset": {"type": "integer", "description": "Byte offset of the data in a raw binary file"},
+        "order": {"type": "string", "enum": ["C", "F"], "description": "Memory layout of a raw binary file"}
+    },
+    "required": ["file"]
+}
+
+def is_file_spec(value) -> bool:
+    return isinstance(value, dict) and "file" in value
+
+def data_path(path: str) -> str:
+    """Absolute path of a file in the data directory"""
+    resolved = os.path.realpath(os.path.join(DATA_DIR, path))
+    if os.path.commonpath([resolved, DATA_DIR]) != DATA_DIR:
+        raise ValueError(f"File {path} is outside the data directory")
+    return resolved
+
+def open_array_file(spec: Dict[str, Any]) -> np.ndarray:
+    """Read-only memory map of a .npy or raw binary file"""
+    path = data_path(spec["file"])
+    if "shape" not in spec:
+        array = np.load(path, mmap_mode="r", allow_pickle=False)
+    else:
+        shape = tuple(int(size) for size in spec["shape"])
+        array = np.memmap(path, dtype=np.dtype(spec.get("dtype", "<f8")), mode="r", offset=int(spec.get("offset", 0)),
+                          shape=shape, order=spec.get("order", "C"))
+    if array.dtype.hasobject:
+        raise ValueError("Object arrays are not supported")
+    return array
+
+def create_array_file(path: str, shape: tuple, dtype=np.float64) -> np.memmap:
+    """Writable memory map of a new .npy file in the data directory"""
+    if not path.endswith(".npy"):
+        raise ValueError(f"Output file {path} must have the .npy extension")
+    resolved = data_path(path)
+    os.makedirs(os.path.dirname(resolved), exist_ok=True)
+    return np.lib.format.open_memmap(resolved, mode="w+", dtype=dtype, shape=shape)
+
+def row_blocks(array: np.ndarray, block_bytes: int = BLOCK_BYTES):
+    """Slices of whole rows (along axis 0) of at most block_bytes each"""
+    row_bytes = max(1, array[:1].nbytes)
+    rows = max(1, block_bytes // row_bytes)
+    for start in range(0, array.shape[0], rows):
+        yield slice(start, min(start + rows, array.shape[0]))
+
+def tile_size(itemsize: int = 8, tiles: int = 3) -> int:
+    """Edge of square tiles, `tiles` of which fit in BLOCK_BYTES together"""
+    return max(1, int(np.sqrt(BLOCK_BYTES / (tiles * itemsize))))
+
+def array_summary(array: np.ndarray) -> Dict[str, Any]:
+    """min / max / mean of an array, read a block of rows at a time"""
+    if array.size == 0 or not np.issubdtype(array.dtype, np.number):
+        return {}
+    if np.iscomplexobj(array):
+        return {"mean": format_complex_result(np.mean(array))}
+    low, high, total = np.inf, -np.inf, 0.0
+    for rows in (row_blocks(array) if array.ndim else [()]):
+        block = np.asarray(array[rows], dtype=float)
+        low, high, total = min(low, float(block.min())), max(high, float(block.max())), total + float(block.sum())
+    return {"min": low, "max": high, "mean": total / array.size}
+
+def write_array_file(path: str, value) -> Dict[str, Any]:
+    """Write a result to a .npy file (unless it is already that file's memory map) and return its handle"""
+    resolved = data_path(path)
+    array = np.asarray(value) if not isinstance(value, np.memmap) else value
+    if not (isinstance(value, np.memmap) and value.filename and os.path.realpath(value.filename) == resolved):
+        target = create_array_file(path, array.shape, array.dtype)
+        for rows in (row_blocks(array) if array.ndim else [()]):
+            target[rows] = array[rows]
+        array = target
+    array.flush()
+    return {
+        "file": os.path.relpath(resolved, DATA_DIR),
+        "shape": list(array.shape),
+        "dtype": array.dtype.name,
+        "nbytes": int(array.nbytes),
+        "summary": array_summary(array)
+    }
+
+# Named array store
+#
+# Arrays stay in the server between calls, so chained computations pass an
+# array_id instead of the matrix. Stores are namespaced by the credentials
+# handle the gateway sends (calls without credentials share "default") and
+# the least recently used arrays are evicted past the memory budget.
+CREDENTIALS_HANDLE_ARG = "__credentials_handle__"
+ARRAY_ID = re.compile(r"^[A-Za-z0-9_.\-]{1,64}$")
+STORE_MAX_BYTES = int(os.environ.get("NUMPY_MCP_STORE_MAX_BYTES", 512 * 1024 * 1024))
+STORE_MAX_ARRAYS = int(os.environ.get("NUMPY_MCP_STORE_MAX_ARRAYS", 1000))
+
+class ArrayStore:
+    def __init__(self, max_bytes: int, max_arrays: int):
+        self.max_bytes = max_bytes
+        self.max_arrays = max_arrays
+        self.nbytes = 0
+        self.arrays: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def put(self, namespace: str, array_id: str, array: np.ndarray) -> List[str]:
+        """Store an array, returns the ids evicted from this namespace to make room"""
+        if not ARRAY_ID.match(array_id or ""):
+            raise ValueError(f"Invalid array_id: {array_id!r}, use up to 64 letters, digits, '_', '.' or '-'")
+        nbytes = array_nbytes(array)
+        if nbytes > self.max_bytes:
+            raise ValueError(f"Array of {nbytes} bytes exceeds the store budget of {self.max_bytes} bytes")
+        # stored arrays are shared by later calls and must never change in place
+        if scipy.sparse.issparse(array):
+            array = scipy.sparse.csr_array(array, copy=True)
+            array.sum_duplicates()
+            for component in (array.data, array.indices, array.indptr):
+                component.setflags(write=False)
+        else:
+            if not array.flags.owndata:
+                array = array.copy()
+            array.setflags(write=False)
+
+        evicted = []
+        with self.lock:
+            previous = self.arrays.pop((namespace, array_id), None)
+            if previous is not None:
+                self.nbytes -= array_nbytes(previous)
+            while self.arrays and (self.nbytes + nbytes > self.max_bytes or len(self.arrays) >= self.max_arrays):
+                key, old = self.arrays.popitem(last=False)
+                self.nbytes -= array_nbytes(old)
+                if key[0] == namespace:
+                    evicted.append(key[1])
+            self.arrays[(namespace, array_id)] = array
+            self.nbytes += nbytes
+        if evicted:
+            logger.info("Array store evicted %d arrays", len(evicted))
+        return evicted
+
+    def get(self, namespace: str, array_id: str) -> np.ndarray:
+        with self.lock:
+            array = self.arrays.get((namespace, array_id))
+            if array is None:
+                raise ValueError(f"Unknown array_id: {array_id}")
+            self.arrays.move_to_end((namespace, array_id))
+            return array
+
+    def free(self, namespace: str, array_id: str) -> bool:
+        with self.lock:
+            array = self.arrays.pop((namespace, array_id), None)
+            if array is None:
+                return False
+            self.nbytes -= array_nbytes(array)
+            return True
+
+    def list(self, namespace: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [
+                {**stored_info(array_id, array), "nbytes": array_nbytes(array)}
+                for (owner, array_id), array in self.arrays.items()
+                if owner == namespace
+            ]
+
+array_store = ArrayStore(STORE_MAX_BYTES, STORE_MAX_ARRAYS)
+
+def store_namespace(args: dict) -> str:
+    return args.get(CREDENTIALS_HANDLE_ARG) or "default"
+
+def stored_info(array_id: str, array) -> Dict[str, Any]:
+    info = {"array_id": array_id, "shape": list(array.shape), "dtype": array.dtype.name}
+    if scipy.sparse.issparse(array):
+        info["format"] = "csr"
+    return info
+
+def stored_text(stored: Dict[str, Any]) -> str:
+    kind = "sparse matrix" if stored.get("format") else "array"
+    return f"<{stored['dtype']} {kind} of shape {tuple(stored['shape'])} stored as {stored['array_id']}>"
+
+# Factorization cache
+#
+# Repeated solves, inverses and determinants of the same matrix reuse its
+# factorization, chosen from the matrix structure: a diagonal or triangular
+# matrix is used as is, Cholesky factors symmetric positive definite matrices,
+# LU other square ones and QR tall ones (least squares). Factorizations are
+# keyed by a hash of the matrix content and evicted past a memory budget.
+FACTOR_CACHE_MAX_BYTES = int(os.environ.get("NUMPY_MCP_FACTOR_CACHE_BYTES", 256 * 1024 * 1024))
+
+MATRIX_STRUCTURES = ("auto", "general", "symmetric", "spd", "upper_triangular", "lower_triangular", "diagonal")
+
+STRUCTURE_SCHEMA = {
+    "type": "string",
+    "enum": list(MATRIX_STRUCTURES),
+    "description": "Structure of the matrix, detected when auto (default). A hint is trusted: symmetric and spd read the lower triangle, triangular hints ignore the other triangle."
+}
+
+def matrix_structure(matrix: np.ndarray) -> str:
+    """Detected structure of a square matrix: diagonal, upper_triangular, lower_triangular, symmetric or general"""
+    upper = not np.any(np.tril(matrix, -1))
+    lower = not np.any(np.triu(matrix, 1))
+    if upper and lower:
+        return "diagonal"
+    if upper:
+        return "upper_triangular"
+    if lower:
+        return "lower_triangular"
+    return "symmetric" if np.array_equal(matrix, matrix.T) else "general"
+
+def structure_hint(args: dict) -> str:
+    structure = args.get("structure") or "auto"
+    if structure not in MATRIX_STRUCTURES:
+        raise ValueError(f"Unknown structure {structure!r}, expected one of {', '.join(MATRIX_STRUCTURES)}")
+    return structure
+
+class Factorization:
+    def __init__(self, matrix: np.ndarray, structure: str = "auto"):
+        rows, cols = matrix.shape
+        self.n = rows
+        if rows < cols:
+            raise np.linalg.LinAlgError("Matrix has more columns than rows")
+        if rows > cols:
+            self.kind = "qr"
+            self.factors = np.linalg.qr(matrix)
+            self.singular = bool(np.any(np.diagonal(self.factors[1]) == 0))
+            self.nbytes = sum(factor.nbytes for factor in self.factors)
+            return
+
+        if structure == "auto":
+            structure = matrix_structure(matrix)
+        self.kind, self.factors = None, None
+        if structure == "diagonal":
+            self.kind, self.factors = "diagonal", (np.diagonal(matrix).copy(),)
+        elif structure in ("upper_triangular", "lower_triangular"):
+            self.kind, self.factors = structure, (matrix,)
+        elif structure in ("symmetric", "spd"):
+            try:
+                self.kind, self.factors = "cholesky", scipy.linalg.cho_factor(matrix, lower=True)
+            except np.linalg.LinAlgError:
+                if structure == "spd":
+                    raise np.linalg.LinAlgError("Matrix is not positive definite")
+        if self.kind is None:
+            with warnings.catch_warnings():
+                # singular matrices are reported by solve / inverse
+                warnings.simplefilter("ignore", scipy.linalg.LinAlgWarning)
+                self.kind, self.factors = "lu", scipy.linalg.lu_factor(matrix)
+        self.singular = bool(np.any(self.diagonal() == 0))
+        self.nbytes = sum(factor.nbytes for factor in self.factors if isinstance(factor, np.ndarray))
+
+    def diagonal(self) -> np.ndarray:
+        """Diagonal of the (first) triangular factor"""
+        return self.factors[0] if self.kind == "diagonal" else np.diagonal(self.factors[0])
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        if b.shape[0] != self.n:
+            raise ValueError(f"Right-hand side has {b.shape[0]} rows, the matrix has {self.n}")
+        if self.singular:
+            raise np.linalg.LinAlgError("Singular matrix")
+        if self.kind == "diagonal":
+            return (b.T / self.factors[0]).T
+        if self.kind in ("upper_triangular", "lower_triangular"):
+            return scipy.linalg.solve_triangular(self.factors[0], b, lower=self.kind == "lower_triangular")
+        if self.kind == "cholesky":
+            return scipy.linalg.cho_solve(self.factors, b)
+        if self.kind == "lu":
+            return scipy.linalg.lu_solve(self.factors, b)
+        q, r = self.factors
+        return scipy.linalg.solve_triangular(r, q.T @ b)
+
+    def inverse(self) -> np.ndarray:
+        if self.kind == "qr":
+            raise ValueError("Matrix must be square for inverse")
+        if self.kind == "diagonal":
+            if self.singular:
+                raise np.linalg.LinAlgError("Singular matrix")
+            return np.diag(1.0 / self.factors[0])
+        return self.solve(np.eye(self.n))
+
+    def determinant(self) -> float:
+        if self.kind == "qr":
+            raise ValueError("Matrix must be square for determinant")
+        diagonal = self.diagonal()
+        if self.kind == "cholesky":
+            return float(np.prod(diagonal) ** 2)
+        if self.kind != "lu":
+            return float(np.prod(diagonal))
+        swaps = np.count_nonzero(self.factors[1] != np.arange(self.n))
+        return float((-1) ** swaps * np.prod(diagonal))
+
+class FactorizationCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: "OrderedDict[str, Factorization]" = OrderedDict()
+        # digests of read-only arrays (stored arrays), computed once per array
+        self.digests: Dict[int, tuple] = {}
+        self.lock = threading.Lock()
+
+    def digest(self, matrix: np.ndarray) -> str:
+        if not matrix.flags.writeable:
+            known = self.digests.get(id(matrix))
+            if known is not None and known[0]() is matrix:
+                return known[1]
+        content = hashlib.blake2b(np.ascontiguousarray(matrix).data, digest_size=16)
+        content.update(f"{matrix.dtype.str}{matrix.shape}".encode("ascii"))
+        digest = content.hexdigest()
+        if not matrix.flags.writeable:
+            key = id(matrix)
+            self.digests[key] = (weakref.ref(matrix, lambda _, key=key: self.digests.pop(key, None)), digest)
+        return digest
+
+    def get(self, matrix: np.ndarray, structure: str = "auto") -> tuple:
+        """(factorization, served from cache)"""
+        if matrix.ndim != 2:
+            raise ValueError("Matrix must be 2-dimensional")
+        key = f"{self.digest(matrix)}:{structure}"
+        with self.lock:
+            factorization = self.entries.get(key)
+            if factorization is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return factorization, True
+            self.misses += 1
+
+        factorization = Factorization(matrix, structure)
+        if factorization.nbytes <= self.max_bytes:
+            with self.lock:
+                if key not in self.entries:
+                    self.entries[key] = factorization
+                    self.nbytes += factorization.nbytes
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.nbytes -= evicted.nbytes
+        return factorization, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"entries": len(self.entries), "nbytes": self.nbytes, "hits": self.hits, "misses": self.misses}
+
+factorization_cache = FactorizationCache(FACTOR_CACHE_MAX_BYTES)
+
 # Tool handler base class
 class NumPyToolHandler:
+    # computation tools take response_encoding and store_as
+    array_transport = True
+    # CPU-bound handlers run on the worker pool, cheap ones on the event loop
+    blocking = True
+    # handlers keeping state between calls in this process (other than the array store)
+    stateful = False
+
     def __init__(self, name: str):
         self.name = name
 
     def get_tool_description(self) -> Tool:
         raise NotImplementedError()
 
+    @cached_property
+    def array_args(self) -> tuple:
+        """Arguments taking arrays, where a string is an array_id"""
+        properties = self.get_tool_description().inputSchema.get("properties", {})
+        return tuple(name for name, schema in properties.items() if schema.get("type") in ("array", "object"))
+
     def run_tool(self, args: dict) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         raise NotImplementedError()
 
+    def get_array(self, args: dict, name: str, allow_sparse: bool = False) -> np.ndarray:
+        """Array argument given as a literal, a binary encoding or an array_id.
+        Sparse matrices are only accepted (and returned as CSR) with allow_sparse."""
+        return self.resolve_array(args, args[name], allow_sparse=allow_sparse)
+
+    def resolve_array(self, args: dict, value, allow_complex: bool = False, allow_sparse: bool = False) -> np.ndarray:
+        if isinstance(value, str):
+            array = array_store.get(store_namespace(args), value)
+            if scipy.sparse.issparse(array):
+                if not allow_sparse:
+                    raise ValueError(f"Array {value} is sparse, {self.name} expects a dense array")
+                return array
+            if allow_complex and np.iscomplexobj(array):
+                return array
+            if np.iscomplexobj(array):
+                raise ValueError(f"Array {value} is complex, {self.name} expects real input")
+            return np.asarray(array, dtype=float)
+        if is_file_spec(value):
+            array = open_array_file(value)
+            if np.iscomplexobj(array) and not allow_complex:
+                raise ValueError(f"File {value['file']} is complex, {self.name} expects real input")
+            return array if np.iscomplexobj(array) or array.dtype == np.float64 else np.asarray(array, dtype=float)
+        if is_sparse_spec(value):
+            if not allow_sparse:
+                raise ValueError(f"{self.name} does not accept sparse matrices")
+            return decode_sparse(value)
+        return safe_numpy_array(value)
+
+    def get_complex_array(self, args: dict, name: str) -> np.ndarray:
+        """Array argument that may be complex: {"real": ..., "imag": ...} (each any
+        array form), nested lists of {"real", "imag"} pairs, a complex binary
+        encoding or array_id, or a real array"""
+        value = args[name]
+        if isinstance(value, dict) and "real" in value and "imag" in value:
+            return self.resolve_array(args, value["real"]) + 1j * self.resolve_array(args, value["imag"])
+        if is_complex_pairs(value):
+            return np.array(complex_from_pairs(value), dtype=complex)
+        if isinstance(value, dict) and "encoding" in value:
+            array = decode_array(value)
+            return array if np.iscomplexobj(array) else np.asarray(array, dtype=float)
+        return self.resolve_array(args, value, allow_complex=True)
+
+    def output(self, args: dict, value, part: Optional[str] = None):
+        """Array result encoded for the response, kept in the store when the
+        call passes store_as (multi-part results are stored as <store_as>.<part>)
+        or written to output_file (<output_file stem>.<part>.npy)"""
+        store_as = args.get("store_as")
+        sparse = scipy.sparse.issparse(value)
+        output_file = args.get("output_file")
+        if output_file and not sparse and np.ndim(value) > 0:
+            if part:
+                output_file = f"{output_file.removesuffix('.npy')}.{part}.npy"
+            return write_array_file(output_file, value)
+        if not store_as and sparse:
+            return encode_sparse(value, response_encoding(args))
+        if not store_as or np.ndim(value) == 0:
+            return encode_array(value, response_encoding(args))
+        array_id = f"{store_as}.{part}" if part else store_as
+        array = value if sparse else np.asarray(value)
+        array_store.put(store_namespace(args), array_id, array)
+        return stored_info(array_id, array)
+
 # Basic Matrix Operations
 class MatrixAddToolHandler(NumPyToolHandler):
     def __init__(self):
@@ -56,7 +744,7 @@ class MatrixAddToolHandler(NumPyToolHandler):
     def get_tool_description(self) -> Tool:
         return Tool(
             name=self.name,
-            description="Add two matrices element-wise",
+            description="Add two matrices element-wise. The sum of two sparse matrices is sparse.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -66,7 +754,7 @@ class MatrixAddToolHandler(NumPyToolHandler):
                             "type": "array",
                             "items": {"type": "number"}
                         },
-                        "description": "First matrix as nested array"
+                        "description": "First matrix as nested array (dense, or sparse in coo / csr form)"
                     },
                     "matrix_b": {
                         "type": "array",
@@ -74,7 +762,7 @@ class MatrixAddToolHandler(NumPyToolHandler):
                             "type": "array",
                             "items": {"type": "number"}
                         },
-                        "description": "Second matrix as nested array"
+                        "description": "Second matrix as nested array (dense, or sparse in coo / csr form)"
                     }
                 },
                 "required": ["matrix_a", "matrix_b"]
@@ -83,12 +771,15 @@ class MatrixAddToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix_a = safe_numpy_array(args["matrix_a"])
-            matrix_b = safe_numpy_array(args["matrix_b"])
-            result = np.add(matrix_a, matrix_b)
-            print("Matrix Addition Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Matrix Addition Result:\n{result.tolist()}", meta={"matrix": result.tolist()})]
+            matrix_a = self.get_array(args, "matrix_a", allow_sparse=True)
+            matrix_b = self.get_array(args, "matrix_b", allow_sparse=True)
+            if scipy.sparse.issparse(matrix_a) or scipy.sparse.issparse(matrix_b):
+                result = matrix_a + matrix_b
+            else:
+                result = np.add(matrix_a, matrix_b)
+            log_result("Matrix Addition Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Matrix Addition Result:\n{array_text(matrix)}", meta={"matrix": matrix})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in matrix addition: {str(e)}")]
 
@@ -99,7 +790,7 @@ class MatrixMultiplyToolHandler(NumPyToolHandler):
     def get_tool_description(self) -> Tool:
         return Tool(
             name=self.name,
-            description="Multiply two matrices using matrix multiplication",
+            description="Multiply two matrices using matrix multiplication. The product of two sparse matrices is sparse.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -109,7 +800,7 @@ class MatrixMultiplyToolHandler(NumPyToolHandler):
                             "type": "array",
                             "items": {"type": "number"}
                         },
-                        "description": "First matrix"
+                        "description": "First matrix (dense, or sparse in coo / csr form)"
                     },
                     "matrix_b": {
                         "type": "array",
@@ -117,7 +808,7 @@ class MatrixMultiplyToolHandler(NumPyToolHandler):
                             "type": "array",
                             "items": {"type": "number"}
                         },
-                        "description": "Second matrix"
+                        "description": "Second matrix (dense, or sparse in coo / csr form)"
                     }
                 },
                 "required": ["matrix_a", "matrix_b"]
@@ -126,12 +817,15 @@ class MatrixMultiplyToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix_a = safe_numpy_array(args["matrix_a"])
-            matrix_b = safe_numpy_array(args["matrix_b"])
-            result = np.matmul(matrix_a, matrix_b)
-            print("Matrix Multiplication Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Matrix Multiplication Result:\n{result.tolist()}", meta={"matrix": result.tolist()})]
+            matrix_a = self.get_array(args, "matrix_a", allow_sparse=True)
+            matrix_b = self.get_array(args, "matrix_b", allow_sparse=True)
+            if scipy.sparse.issparse(matrix_a) or scipy.sparse.issparse(matrix_b):
+                result = matrix_a @ matrix_b
+            else:
+                result = np.matmul(matrix_a, matrix_b)
+            log_result("Matrix Multiplication Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Matrix Multiplication Result:\n{array_text(matrix)}", meta={"matrix": matrix})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in matrix multiplication: {str(e)}")]
 
@@ -169,12 +863,12 @@ class MatrixSubtractToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix_a = safe_numpy_array(args["matrix_a"])
-            matrix_b = safe_numpy_array(args["matrix_b"])
+            matrix_a = self.get_array(args, "matrix_a")
+            matrix_b = self.get_array(args, "matrix_b")
             result = np.subtract(matrix_a, matrix_b)
-            print("Matrix Subtraction Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Matrix Subtraction Result:\n{result.tolist()}", meta={"matrix": result.tolist()})]
+            log_result("Matrix Subtraction Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Matrix Subtraction Result:\n{array_text(matrix)}", meta={"matrix": matrix})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in matrix subtraction: {str(e)}")]
 
@@ -212,12 +906,12 @@ class ElementWiseMultiplyToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix_a = safe_numpy_array(args["matrix_a"])
-            matrix_b = safe_numpy_array(args["matrix_b"])
+            matrix_a = self.get_array(args, "matrix_a")
+            matrix_b = self.get_array(args, "matrix_b")
             result = np.multiply(matrix_a, matrix_b)
-            print("Element-wise Multiplication Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Element-wise Multiplication Result:\n{result.tolist()}", meta={"matrix": result.tolist()})]
+            log_result("Element-wise Multiplication Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Element-wise Multiplication Result:\n{array_text(matrix)}", meta={"matrix": matrix})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in element-wise multiplication: {str(e)}")]
 
@@ -238,7 +932,7 @@ class DotProductToolHandler(NumPyToolHandler):
                             "type": "array",
                             "items": {"type": "number"}
                         },
-                        "description": "First matrix/vector"
+                        "description": "First matrix/vector (dense, or sparse in coo / csr form)"
                     },
                     "matrix_b": {
                         "type": "array",
@@ -246,7 +940,7 @@ class DotProductToolHandler(NumPyToolHandler):
                             "type": "array",
                             "items": {"type": "number"}
                         },
-                        "description": "Second matrix/vector"
+                        "description": "Second matrix/vector (dense, or sparse in coo / csr form)"
                     }
                 },
                 "required": ["matrix_a", "matrix_b"]
@@ -255,12 +949,15 @@ class DotProductToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix_a = safe_numpy_array(args["matrix_a"])
-            matrix_b = safe_numpy_array(args["matrix_b"])
-            result = np.dot(matrix_a, matrix_b)
-            print("Dot Product Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Dot Product Result:\n{result.tolist() if hasattr(result, 'tolist') else result}", meta={"result": result.tolist() if hasattr(result, 'tolist') else result})]
+            matrix_a = self.get_array(args, "matrix_a", allow_sparse=True)
+            matrix_b = self.get_array(args, "matrix_b", allow_sparse=True)
+            if scipy.sparse.issparse(matrix_a) or scipy.sparse.issparse(matrix_b):
+                result = matrix_a @ matrix_b
+            else:
+                result = np.dot(matrix_a, matrix_b)
+            log_result("Dot Product Result", result=result)
+            encoded = self.output(args, result)
+            return [TextContent(type="text", text=f"Dot Product Result:\n{array_text(encoded)}", meta={"result": encoded})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in dot product: {str(e)}")]
 
@@ -290,11 +987,11 @@ class MatrixTransposeToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             result = np.transpose(matrix)
-            print("Matrix Transpose Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Matrix Transpose Result:\n{result.tolist()}", meta={"matrix": result.tolist()})]
+            log_result("Matrix Transpose Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Matrix Transpose Result:\n{array_text(matrix)}", meta={"matrix": matrix})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in matrix transpose: {str(e)}")]
 
@@ -316,7 +1013,8 @@ class MatrixInverseToolHandler(NumPyToolHandler):
                             "items": {"type": "number"}
                         },
                         "description": "Square matrix to invert"
-                    }
+                    },
+                    "structure": STRUCTURE_SCHEMA
                 },
                 "required": ["matrix"]
             }
@@ -324,19 +1022,27 @@ class MatrixInverseToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             if matrix.shape[0] != matrix.shape[1]:
                 raise ValueError("Matrix must be square for inverse")
-            result = np.linalg.inv(matrix)
-            print("Matrix Inverse Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Matrix Inverse Result:\n{result.tolist()}", meta={"matrix": result.tolist()})]
+            factorization, cached = factorization_cache.get(matrix, structure_hint(args))
+            result = factorization.inverse()
+            log_result("Matrix Inverse Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(
+                type="text",
+                text=f"Matrix Inverse Result:\n{array_text(matrix)}",
+                meta={"matrix": matrix, "factorization": factorization.kind, "cached": cached}
+            )]
         except np.linalg.LinAlgError:
             return [TextContent(type="text", text="Error: Matrix is singular and cannot be inverted")]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in matrix inverse: {str(e)}")]
 
 class MatrixDeterminantToolHandler(NumPyToolHandler):
+    # scalar result
+    array_transport = False
+
     def __init__(self):
         super().__init__("matrix_determinant")
 
@@ -354,7 +1060,8 @@ class MatrixDeterminantToolHandler(NumPyToolHandler):
                             "items": {"type": "number"}
                         },
                         "description": "Square matrix"
-                    }
+                    },
+                    "structure": STRUCTURE_SCHEMA
                 },
                 "required": ["matrix"]
             }
@@ -362,13 +1069,17 @@ class MatrixDeterminantToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             if matrix.shape[0] != matrix.shape[1]:
                 raise ValueError("Matrix must be square for determinant")
-            result = np.linalg.det(matrix)
-            print("Matrix Determinant:")
-            print(result)
-            return [TextContent(type="text", text=f"Matrix Determinant: {float(result)}", meta={"determinant": float(result)})]
+            factorization, cached = factorization_cache.get(matrix, structure_hint(args))
+            result = factorization.determinant()
+            log_result("Matrix Determinant", result=result)
+            return [TextContent(
+                type="text",
+                text=f"Matrix Determinant: {result}",
+                meta={"determinant": result, "factorization": factorization.kind, "cached": cached}
+            )]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in determinant calculation: {str(e)}")]
 
@@ -379,7 +1090,7 @@ class SolveLinearSystemToolHandler(NumPyToolHandler):
     def get_tool_description(self) -> Tool:
         return Tool(
             name=self.name,
-            description="Solve linear system Ax = b",
+            description="Solve linear system Ax = b (least squares when A has more rows than columns)",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -389,12 +1100,26 @@ class SolveLinearSystemToolHandler(NumPyToolHandler):
                             "type": "array",
                             "items": {"type": "number"}
                         },
-                        "description": "Coefficient matrix A"
+                        "description": "Coefficient matrix A (dense, or sparse in coo / csr form)"
                     },
                     "vector_b": {
                         "type": "array",
                         "items": {"type": "number"},
-                        "description": "Constants vector b"
+                        "description": "Constants vector b, or a matrix whose columns are several right-hand sides"
+                    },
+                    "structure": STRUCTURE_SCHEMA,
+                    "method": {
+                        "type": "string",
+                        "enum": list(SPARSE_SOLVERS),
+                        "description": "Solver for a sparse A: cg (symmetric positive definite), gmres, direct (sparse LU) or auto (default: cg when A looks positive definite, else gmres)"
+                    },
+                    "tolerance": {
+                        "type": "number",
+                        "description": "Relative residual tolerance of the iterative solvers (default 1e-8)"
+                    },
+                    "max_iterations": {
+                        "type": "integer",
+                        "description": "Iteration limit of the iterative solvers"
                     }
                 },
                 "required": ["matrix_a", "vector_b"]
@@ -403,12 +1128,32 @@ class SolveLinearSystemToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix_a = safe_numpy_array(args["matrix_a"])
-            vector_b = safe_numpy_array(args["vector_b"])
-            result = np.linalg.solve(matrix_a, vector_b)
-            print("Linear System Solution:")
-            print(result)
-            return [TextContent(type="text", text=f"Linear System Solution:\nx = {result.tolist()}", meta={"solution": result.tolist()})]
+            matrix_a = self.get_array(args, "matrix_a", allow_sparse=True)
+            vector_b = self.get_array(args, "vector_b")
+            if scipy.sparse.issparse(matrix_a):
+                result, details = solve_sparse(
+                    matrix_a,
+                    vector_b,
+                    args.get("method") or "auto",
+                    float(args.get("tolerance") or 1e-8),
+                    args.get("max_iterations")
+                )
+                log_result("Sparse Linear System Solution", result=result)
+                solution = self.output(args, result)
+                text = f"Linear System Solution ({details['method']}, relative residual {details['residual']:.3g}):\nx = {array_text(solution)}"
+                if not details["converged"]:
+                    text = "Warning: the iterative solver did not converge\n" + text
+                return [TextContent(type="text", text=text, meta={"solution": solution, **details})]
+            factorization, cached = factorization_cache.get(matrix_a, structure_hint(args))
+            result = factorization.solve(vector_b)
+            log_result("Linear System Solution", result=result)
+            solution = self.output(args, result)
+            label = "Least-Squares Solution" if factorization.kind == "qr" else "Linear System Solution"
+            return [TextContent(
+                type="text",
+                text=f"{label}:\nx = {array_text(solution)}",
+                meta={"solution": solution, "factorization": factorization.kind, "cached": cached}
+            )]
         except np.linalg.LinAlgError:
             return [TextContent(type="text", text="Error: Linear system has no unique solution")]
         except Exception as e:
@@ -432,7 +1177,8 @@ class EigenDecompositionToolHandler(NumPyToolHandler):
                             "items": {"type": "number"}
                         },
                         "description": "Square matrix"
-                    }
+                    },
+                    "structure": STRUCTURE_SCHEMA
                 },
                 "required": ["matrix"]
             }
@@ -440,18 +1186,29 @@ class EigenDecompositionToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             if matrix.shape[0] != matrix.shape[1]:
                 raise ValueError("Matrix must be square for eigenvalue decomposition")
-            eigenvalues, eigenvectors = np.linalg.eig(matrix)
-            print("Eigenvalues:")
-            print(eigenvalues)
-            print("Eigenvectors:")
-            print(eigenvectors)
+            structure = structure_hint(args)
+            if structure == "auto":
+                structure = matrix_structure(matrix)
+            if structure == "diagonal":
+                eigenvalues, eigenvectors = np.diagonal(matrix).copy(), np.eye(matrix.shape[0])
+            elif structure in ("symmetric", "spd"):
+                # real eigenvalues in ascending order, orthonormal eigenvectors
+                eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+            else:
+                if structure == "upper_triangular":
+                    matrix = np.triu(matrix)
+                elif structure == "lower_triangular":
+                    matrix = np.tril(matrix)
+                eigenvalues, eigenvectors = np.linalg.eig(matrix)
+            log_result("Eigenvalues", eigenvalues=eigenvalues, eigenvectors=eigenvectors)
+            eigenvalues, eigenvectors = self.output(args, eigenvalues, "eigenvalues"), self.output(args, eigenvectors, "eigenvectors")
             return [TextContent(
                 type="text",
-                text=f"Eigenvalues: {format_complex_result(eigenvalues)}\nEigenvectors:\n{format_complex_result(eigenvectors)}",
-                meta={"eigenvalues": format_complex_result(eigenvalues), "eigenvectors": format_complex_result(eigenvectors)}
+                text=f"Eigenvalues: {array_text(eigenvalues)}\nEigenvectors:\n{array_text(eigenvectors)}",
+                meta={"eigenvalues": eigenvalues, "eigenvectors": eigenvectors, "structure": structure}
             )]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in eigenvalue decomposition: {str(e)}")]
@@ -482,19 +1239,14 @@ class SVDToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             U, s, Vt = np.linalg.svd(matrix)
-            print("SVD Decomposition:")
-            print("U matrix:")
-            print(U)
-            print("Singular values:")
-            print(s)
-            print("Vt matrix:")
-            print(Vt)
+            log_result("SVD Decomposition", U=U, singular_values=s, Vt=Vt)
+            U, s, Vt = self.output(args, U, "U"), self.output(args, s, "singular_values"), self.output(args, Vt, "Vt")
             return [TextContent(
                 type="text",
-                text=f"SVD Decomposition:\nU matrix:\n{U.tolist()}\nSingular values: {s.tolist()}\nVt matrix:\n{Vt.tolist()}",
-                meta={"U": U.tolist(), "singular_values": s.tolist(), "Vt": Vt.tolist()}
+                text=f"SVD Decomposition:\nU matrix:\n{array_text(U)}\nSingular values: {array_text(s)}\nVt matrix:\n{array_text(Vt)}",
+                meta={"U": U, "singular_values": s, "Vt": Vt}
             )]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in SVD: {str(e)}")]
@@ -525,17 +1277,14 @@ class QRDecompositionToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             Q, R = np.linalg.qr(matrix)
-            print("QR Decomposition:")
-            print("Q matrix:")
-            print(Q)
-            print("R matrix:")
-            print(R)
+            log_result("QR Decomposition", Q=Q, R=R)
+            Q, R = self.output(args, Q, "Q"), self.output(args, R, "R")
             return [TextContent(
                 type="text",
-                text=f"QR Decomposition:\nQ matrix:\n{Q.tolist()}\nR matrix:\n{R.tolist()}",
-                meta={"Q": Q.tolist(), "R": R.tolist()}
+                text=f"QR Decomposition:\nQ matrix:\n{array_text(Q)}\nR matrix:\n{array_text(R)}",
+                meta={"Q": Q, "R": R}
             )]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in QR decomposition: {str(e)}")]
@@ -570,32 +1319,63 @@ class MatrixPowerToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             power = args["power"]
             if matrix.shape[0] != matrix.shape[1]:
                 raise ValueError("Matrix must be square for matrix power")
             result = np.linalg.matrix_power(matrix, power)
-            print(f"Matrix Power {power} Result:")
-            print(result)
-            return [TextContent(type="text", text=f"Matrix Power {power} Result:\n{result.tolist()}", meta={"matrix": result.tolist(), "power": power})]
+            log_result(f"Matrix Power {power} Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Matrix Power {power} Result:\n{array_text(matrix)}", meta={"matrix": matrix, "power": power})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in matrix power: {str(e)}")]
 
 class FFTToolHandler(NumPyToolHandler):
+    TRANSFORMS = {
+        "fft": (np.fft.fft, np.fft.fftn),
+        "ifft": (np.fft.ifft, np.fft.ifftn),
+        "rfft": (np.fft.rfft, np.fft.rfftn),
+        "irfft": (np.fft.irfft, np.fft.irfftn)
+    }
+
     def __init__(self):
         super().__init__("fast_fourier_transform")
 
     def get_tool_description(self) -> Tool:
         return Tool(
             name=self.name,
-            description="Fast Fourier Transform",
+            description="Fast Fourier Transform of one signal, of many signals along an axis (batched), or over several axes (n-dimensional)",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "signal": {
                         "type": "array",
                         "items": {"type": "number"},
-                        "description": "Input signal for FFT"
+                        "description": "Input signal for FFT: a real array, or complex as {\"real\": [...], \"imag\": [...]}. Rows of a matrix are transformed as a batch."
+                    },
+                    "transform": {
+                        "type": "string",
+                        "enum": list(self.TRANSFORMS),
+                        "description": "fft (default), its inverse ifft, or rfft / irfft for real signals: half the work and output"
+                    },
+                    "axis": {
+                        "type": "integer",
+                        "description": "Axis to transform, every other axis is a batch (default the last)"
+                    },
+                    "axes": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "Axes of an n-dimensional transform, instead of axis"
+                    },
+                    "n": {
+                        "type": ["integer", "array"],
+                        "items": {"type": "integer"},
+                        "description": "Transform length (zero-padded or cropped), one per axis with axes; for irfft the length of the real output"
+                    },
+                    "norm": {
+                        "type": "string",
+                        "enum": ["backward", "ortho", "forward"],
+                        "description": "Normalization (default backward: the inverse is scaled by 1/n)"
                     }
                 },
                 "required": ["signal"]
@@ -604,15 +1384,98 @@ class FFTToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            signal = safe_numpy_array(args["signal"])
-            result = np.fft.fft(signal)
-            print("FFT Result:")
-            print(result)
-            formatted_result = format_complex_result(result)
-            return [TextContent(type="text", text=f"FFT Result: {formatted_result}", meta={"fft": formatted_result})]
+            transform = args.get("transform") or "fft"
+            if transform not in self.TRANSFORMS:
+                raise ValueError(f"Unknown transform {transform!r}, expected one of {', '.join(self.TRANSFORMS)}")
+            signal = self.get_array(args, "signal") if transform == "rfft" else self.get_complex_array(args, "signal")
+            n = args.get("n")
+            if n is None or isinstance(n, list):
+                lengths = [int(size) for size in n] if n else None
+            else:
+                lengths = [int(n)]
+            norm = args.get("norm") or "backward"
+            one_dimensional, n_dimensional = self.TRANSFORMS[transform]
+            if args.get("axes"):
+                axes = [int(axis) for axis in args["axes"]]
+                result = n_dimensional(signal, s=lengths, axes=axes, norm=norm)
+            else:
+                axes = [int(args["axis"]) if args.get("axis") is not None else -1]
+                result = one_dimensional(signal, n=lengths[0] if lengths else None, axis=axes[0], norm=norm)
+            log_result("FFT Result", result=result)
+            formatted_result = self.output(args, result)
+            return [TextContent(
+                type="text",
+                text=f"FFT Result ({transform}): {array_text(formatted_result)}",
+                meta={"fft": formatted_result, "transform": transform, "axes": axes}
+            )]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in FFT: {str(e)}")]
 
+class ConvolveToolHandler(NumPyToolHandler):
+    def __init__(self, name: str = "convolve", correlate: bool = False):
+        super().__init__(name)
+        self.correlate = correlate
+
+    def get_tool_description(self) -> Tool:
+        operation = "Cross-correlation" if self.correlate else "Convolution"
+        return Tool(
+            name=self.name,
+            description=f"{operation} of two signals or n-dimensional arrays, through the FFT for long inputs",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "signal_a": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "First signal (real, or complex as {\"real\": [...], \"imag\": [...]})"
+                    },
+                    "signal_b": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Second signal" + (", slid over the first" if self.correlate else " (kernel)")
+                    },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["full", "same", "valid"],
+                        "description": "Output size: full (default), same as signal_a, or valid (complete overlap only)"
+                    },
+                    "method": {
+                        "type": "string",
+                        "enum": ["auto", "fft", "direct"],
+                        "description": "fft, direct sums, or auto (default) to pick the faster one for the sizes"
+                    },
+                    "axes": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "Axes to operate on, the others are a batch of signals (always through the FFT)"
+                    }
+                },
+                "required": ["signal_a", "signal_b"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            signal_a = self.get_complex_array(args, "signal_a")
+            signal_b = self.get_complex_array(args, "signal_b")
+            mode = args.get("mode") or "full"
+            method = args.get("method") or "auto"
+            if args.get("axes"):
+                axes = [int(axis) for axis in args["axes"]]
+                if self.correlate:
+                    # correlation is convolution with the reversed, conjugated second signal
+                    signal_b = np.conj(np.flip(signal_b, axis=axes))
+                result = scipy.signal.fftconvolve(signal_a, signal_b, mode=mode, axes=axes)
+            else:
+                operation = scipy.signal.correlate if self.correlate else scipy.signal.convolve
+                result = operation(signal_a, signal_b, mode=mode, method=method)
+            label = "Correlation" if self.correlate else "Convolution"
+            log_result(f"{label} Result", result=result)
+            formatted_result = self.output(args, result)
+            return [TextContent(type="text", text=f"{label} Result: {array_text(formatted_result)}", meta={"result": formatted_result, "mode": mode})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in {self.name}: {str(e)}")]
+
 class PolynomialRootsToolHandler(NumPyToolHandler):
     def __init__(self):
         super().__init__("polynomial_roots")
@@ -636,12 +1499,11 @@ class PolynomialRootsToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            coefficients = safe_numpy_array(args["polynomial_coefficients"])
+            coefficients = self.get_array(args, "polynomial_coefficients")
             roots = np.roots(coefficients)
-            print("Polynomial Roots:")
-            print(roots)
-            formatted_roots = format_complex_result(roots)
-            return [TextContent(type="text", text=f"Polynomial Roots: {formatted_roots}", meta={"roots": formatted_roots})]
+            log_result("Polynomial Roots", roots=roots)
+            formatted_roots = self.output(args, roots)
+            return [TextContent(type="text", text=f"Polynomial Roots: {array_text(formatted_roots)}", meta={"roots": formatted_roots})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error finding polynomial roots: {str(e)}")]
 
@@ -676,15 +1538,1164 @@ class MatrixReshapeToolHandler(NumPyToolHandler):
 
     def run_tool(self, args: dict) -> Sequence[TextContent]:
         try:
-            matrix = safe_numpy_array(args["matrix"])
+            matrix = self.get_array(args, "matrix")
             new_shape = tuple(args["new_dimensions"])
             result = np.reshape(matrix, new_shape)
-            print("Reshaped Matrix:")
-            print(result)
-            return [TextContent(type="text", text=f"Reshaped Matrix:\n{result.tolist()}", meta={"matrix": result.tolist()})]
+            log_result("Reshaped Matrix", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Reshaped Matrix:\n{array_text(matrix)}", meta={"matrix": matrix})]
         except Exception as e:
             return [TextContent(type="text", text=f"Error in matrix reshape: {str(e)}")]
 
+# Sparse Eigenvalues
+class SparseEigenvaluesToolHandler(NumPyToolHandler):
+    # ARPACK names the ends of the spectrum differently for symmetric and general matrices
+    SYMMETRIC_WHICH = {"LM": "LM", "SM": "SM", "LA": "LA", "SA": "SA", "LR": "LA", "SR": "SA"}
+    GENERAL_WHICH = {"LM": "LM", "SM": "SM", "LA": "LR", "SA": "SR", "LR": "LR", "SR": "SR"}
+
+    def __init__(self):
+        super().__init__("sparse_eigenvalues")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Calculate k eigenvalues (and eigenvectors) of a large sparse or dense square matrix with ARPACK",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "matrix": {
+                        "type": "array",
+                        "items": {
+                            "type": "array",
+                            "items": {"type": "number"}
+                        },
+                        "description": "Square matrix (dense, or sparse in coo / csr form)"
+                    },
+                    "k": {
+                        "type": "integer",
+                        "description": "Number of eigenvalues (default 6)"
+                    },
+                    "which": {
+                        "type": "string",
+                        "enum": ["LM", "SM", "LA", "SA", "LR", "SR"],
+                        "description": "Largest / smallest magnitude (LM, default / SM) or largest / smallest algebraic value (LA, SA; LR, SR for real part)"
+                    },
+                    "eigenvectors": {
+                        "type": "boolean",
+                        "description": "Also return the eigenvectors (default true)"
+                    },
+                    "structure": {
+                        "type": "string",
+                        "enum": ["auto", "symmetric", "general"],
+                        "description": "symmetric uses the Lanczos solver and returns real eigenvalues, detected when auto (default)"
+                    }
+                },
+                "required": ["matrix"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            matrix = self.get_array(args, "matrix", allow_sparse=True)
+            if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+                raise ValueError("Matrix must be square for eigenvalue decomposition")
+            k = int(args.get("k") or 6)
+            if not 0 < k < matrix.shape[0]:
+                raise ValueError(f"k must be between 1 and {matrix.shape[0] - 1} for this matrix")
+            which = args.get("which") or "LM"
+            vectors = args.get("eigenvectors", True)
+            structure = args.get("structure") or "auto"
+            if structure == "auto":
+                structure = "symmetric" if is_symmetric(matrix) else "general"
+            if structure == "symmetric":
+                result = scipy.sparse.linalg.eigsh(matrix, k=k, which=self.SYMMETRIC_WHICH[which], return_eigenvectors=vectors)
+            else:
+                result = scipy.sparse.linalg.eigs(matrix, k=k, which=self.GENERAL_WHICH[which], return_eigenvectors=vectors)
+            eigenvalues, eigenvectors = result if vectors else (result, None)
+            if np.iscomplexobj(eigenvalues) and not np.any(eigenvalues.imag) and (eigenvectors is None or not np.any(eigenvectors.imag)):
+                # like np.linalg.eig, a real spectrum is returned as real numbers
+                eigenvalues = eigenvalues.real
+                eigenvectors = None if eigenvectors is None else eigenvectors.real
+            log_result("Sparse Eigenvalues", eigenvalues=eigenvalues)
+            eigenvalues = self.output(args, eigenvalues, "eigenvalues")
+            text = f"Eigenvalues ({structure}): {array_text(eigenvalues)}"
+            meta = {"eigenvalues": eigenvalues, "structure": structure}
+            if vectors:
+                meta["eigenvectors"] = self.output(args, eigenvectors, "eigenvectors")
+                text += f"\nEigenvectors:\n{array_text(meta['eigenvectors'])}"
+            return [TextContent(type="text", text=text, meta=meta)]
+        except scipy.sparse.linalg.ArpackNoConvergence as e:
+            return [TextContent(type="text", text=f"Error: ARPACK did not converge, {len(e.eigenvalues)} eigenvalues found")]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in sparse eigenvalue calculation: {str(e)}")]
+
+# Array Store
+class StoreArrayToolHandler(NumPyToolHandler):
+    array_transport = False
+    blocking = False
+
+    def __init__(self):
+        super().__init__("store_array")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Store an array on the server under an array_id, for use as an argument of later calls",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "array_id": {
+                        "type": "string",
+                        "description": "Name to store the array under"
+                    },
+                    "array": {
+                        "type": "array",
+                        "items": {
+                            "type": "array",
+                            "items": {"type": "number"}
+                        },
+                        "description": "Array to store, dense or a sparse matrix in coo / csr form"
+                    }
+                },
+                "required": ["array_id", "array"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            array = decode_sparse(args["array"]) if is_sparse_spec(args["array"]) else safe_numpy_array(args["array"])
+            evicted = array_store.put(store_namespace(args), args["array_id"], array)
+            stored = stored_info(args["array_id"], array)
+            text = f"Stored {stored_text(stored)}"
+            if evicted:
+                text += f"\nEvicted: {', '.join(evicted)}"
+            return [TextContent(type="text", text=text, meta={**stored, "evicted": evicted})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error storing array: {str(e)}")]
+
+class GetArrayToolHandler(NumPyToolHandler):
+    array_transport = False
+    blocking = False
+
+    def __init__(self):
+        super().__init__("get_array")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Return a stored array",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "array_id": {
+                        "type": "string",
+                        "description": "Id of the stored array"
+                    },
+                    "response_encoding": RESPONSE_ENCODING_SCHEMA
+                },
+                "required": ["array_id"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            array = array_store.get(store_namespace(args), args["array_id"])
+            encode = encode_sparse if scipy.sparse.issparse(array) else encode_array
+            encoded = encode(array, response_encoding(args))
+            return [TextContent(type="text", text=f"Array {args['array_id']}:\n{array_text(encoded)}", meta={"array": encoded})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error getting array: {str(e)}")]
+
+class ListArraysToolHandler(NumPyToolHandler):
+    array_transport = False
+    blocking = False
+
+    def __init__(self):
+        super().__init__("list_arrays")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="List the arrays stored on the server",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            arrays = array_store.list(store_namespace(args))
+            lines = [stored_text(stored) for stored in arrays] or ["No stored arrays"]
+            return [TextContent(type="text", text="Stored Arrays:\n" + "\n".join(lines), meta={"arrays": arrays})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error listing arrays: {str(e)}")]
+
+class FreeArrayToolHandler(NumPyToolHandler):
+    array_transport = False
+    blocking = False
+
+    def __init__(self):
+        super().__init__("free_array")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Remove stored arrays from the server",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "array_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Ids of the arrays to remove"
+                    }
+                },
+                "required": ["array_ids"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            namespace = store_namespace(args)
+            freed = [array_id for array_id in args["array_ids"] if array_store.free(namespace, array_id)]
+            missing = [array_id for array_id in args["array_ids"] if array_id not in freed]
+            text = f"Freed arrays: {', '.join(freed) or 'none'}"
+            if missing:
+                text += f"\nUnknown array ids: {', '.join(missing)}"
+            return [TextContent(type="text", text=text, meta={"freed": freed, "unknown": missing})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error freeing arrays: {str(e)}")]
+
+# Pipelines
+#
+# evaluate_pipeline runs a short script of assignments such as
+# "C = A @ B; D = inv(C); U, s, Vt = svd(D)" in one call. The script is parsed
+# with ast and only the operators and functions below are accepted.
+# Element-wise steps write into a temporary they own instead of allocating
+# a new one, also across statements when an intermediate is used once, and
+# intermediates are dropped after their last use.
+PIPELINE_MAX_STEPS = 64
+PIPELINE_MAX_BYTES = STORE_MAX_BYTES
+
+ELEMENTWISE_BINARY = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power
+}
+ELEMENTWISE_FUNCTIONS = {
+    "exp": np.exp, "log": np.log, "sqrt": np.sqrt, "abs": np.abs,
+    "sin": np.sin, "cos": np.cos, "tanh": np.tanh,
+    "maximum": np.maximum, "minimum": np.minimum
+}
+# name -> (function, returns a new array)
+PIPELINE_FUNCTIONS = {
+    "inv": (np.linalg.inv, True),
+    "pinv": (np.linalg.pinv, True),
+    "det": (np.linalg.det, True),
+    "solve": (np.linalg.solve, True),
+    "svd": (np.linalg.svd, True),
+    "qr": (np.linalg.qr, True),
+    "eig": (np.linalg.eig, True),
+    "eigh": (np.linalg.eigh, True),
+    "norm": (np.linalg.norm, True),
+    "matrix_power": (np.linalg.matrix_power, True),
+    "dot": (np.dot, True),
+    "outer": (np.outer, True),
+    "trace": (np.trace, True),
+    "sum": (np.sum, True),
+    "mean": (np.mean, True),
+    "std": (np.std, True),
+    "min": (np.min, True),
+    "max": (np.max, True),
+    "transpose": (np.transpose, False),
+    "reshape": (np.reshape, False),
+    "diag": (np.diag, False)
+}
+# names of the parts of multi-valued results
+PIPELINE_PARTS = {
+    "svd": ("U", "singular_values", "Vt"),
+    "qr": ("Q", "R"),
+    "eig": ("eigenvalues", "eigenvectors"),
+    "eigh": ("eigenvalues", "eigenvectors")
+}
+
+class PipelineTuple(tuple):
+    """Multi-valued result bound to one name, returned as <name>.<part>"""
+    parts: tuple = ()
+
+def check_pipeline_size(shape, dtype):
+    nbytes = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    if nbytes > PIPELINE_MAX_BYTES:
+        raise ValueError(f"Intermediate of shape {tuple(shape)} exceeds the pipeline budget of {PIPELINE_MAX_BYTES} bytes")
+
+def parse_pipeline(script: str) -> List[ast.Assign]:
+    """Parse and validate a pipeline script"""
+    try:
+        statements = ast.parse("\n".join(line.strip() for line in re.split(r"[;\n]", script)), mode="exec").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid pipeline syntax: {e.msg} (line {e.lineno})")
+    if not statements:
+        raise ValueError("Pipeline is empty")
+    if len(statements) > PIPELINE_MAX_STEPS:
+        raise ValueError(f"Pipeline has more than {PIPELINE_MAX_STEPS} steps")
+
+    for statement in statements:
+        if not isinstance(statement, ast.Assign) or len(statement.targets) != 1:
+            raise ValueError(f"Pipeline steps must be single assignments: {ast.unparse(statement)}")
+        target = statement.targets[0]
+        names = target.elts if isinstance(target, ast.Tuple) else [target]
+        if not all(isinstance(name, ast.Name) for name in names):
+            raise ValueError(f"Invalid assignment target: {ast.unparse(target)}")
+        for node in ast.walk(statement.value):
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or (node.func.id not in PIPELINE_FUNCTIONS and node.func.id not in ELEMENTWISE_FUNCTIONS):
+                    raise ValueError(f"Unknown function: {ast.unparse(node.func)}")
+            elif isinstance(node, ast.Attribute):
+                if node.attr != "T":
+                    raise ValueError(f"Unsupported attribute: .{node.attr}")
+            elif isinstance(node, ast.BinOp):
+                if type(node.op) not in ELEMENTWISE_BINARY and not isinstance(node.op, ast.MatMult):
+                    raise ValueError(f"Unsupported operator in: {ast.unparse(node)}")
+            elif isinstance(node, ast.UnaryOp):
+                if not isinstance(node.op, (ast.USub, ast.UAdd)):
+                    raise ValueError(f"Unsupported operator in: {ast.unparse(node)}")
+            elif isinstance(node, ast.Constant):
+                if not isinstance(node.value, (int, float, bool)):
+                    raise ValueError(f"Unsupported constant: {node.value!r}")
+            elif not isinstance(node, (ast.Name, ast.Load, ast.Tuple, ast.keyword, ast.operator, ast.unaryop)):
+                raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+    return statements
+
+class PipelineEvaluator:
+    def __init__(self, inputs: Dict[str, Any], statements: List[ast.Assign], outputs: List[str]):
+        self.env: Dict[str, Any] = dict(inputs)
+        self.inputs = set(inputs)
+        self.outputs = set(outputs)
+        self.statements = statements
+        self.fused = 0
+        # remaining reads of every name, an intermediate read for the last
+        # time becomes a temporary that element-wise steps may overwrite
+        self.remaining_uses: Dict[str, int] = {}
+        for statement in statements:
+            nodes = list(ast.walk(statement.value))
+            functions = {id(node.func) for node in nodes if isinstance(node, ast.Call)}
+            for node in nodes:
+                if isinstance(node, ast.Name) and id(node) not in functions:
+                    self.remaining_uses[node.id] = self.remaining_uses.get(node.id, 0) + 1
+
+    def aliased(self, array: np.ndarray) -> bool:
+        """True when a name still refers to (a view of) the array's memory"""
+        for value in self.env.values():
+            for item in (value if isinstance(value, tuple) else (value,)):
+                if isinstance(item, np.ndarray) and np.may_share_memory(item, array):
+                    return True
+        return False
+
+    def run(self) -> Dict[str, Any]:
+        for statement in self.statements:
+            value, _ = self.evaluate(statement.value)
+            target = statement.targets[0]
+            if isinstance(target, ast.Tuple):
+                if not isinstance(value, tuple) or len(value) != len(target.elts):
+                    raise ValueError(f"Cannot unpack the result of {ast.unparse(statement.value)} into {len(target.elts)} names")
+                for name, item in zip(target.elts, value):
+                    self.env[name.id] = item
+            else:
+                self.env[target.id] = value
+        missing = [name for name in self.outputs if name not in self.env]
+        if missing:
+            raise ValueError(f"Unknown outputs: {', '.join(missing)}")
+        return {name: self.env[name] for name in self.outputs}
+
+    def read(self, name: str):
+        """Value of a name and whether this read may overwrite it"""
+        if name not in self.env:
+            raise ValueError(f"Unknown name: {name}")
+        value = self.env[name]
+        if isinstance(value, PipelineTuple):
+            raise ValueError(f"{name} holds {len(value)} results, unpack them: {', '.join(value.parts)} = ...")
+        self.remaining_uses[name] -= 1
+        last_use = self.remaining_uses[name] == 0 and name not in self.outputs
+        if last_use:
+            del self.env[name]
+        return value, last_use and name not in self.inputs
+
+    def evaluate(self, node: ast.AST):
+        """(value, owned) where owned values are temporaries this step may overwrite"""
+        if isinstance(node, ast.Constant):
+            return node.value, False
+        if isinstance(node, ast.Name):
+            return self.read(node.id)
+        if isinstance(node, ast.Tuple):
+            return tuple(self.evaluate(item)[0] for item in node.elts), False
+        if isinstance(node, ast.Attribute):
+            value, _ = self.evaluate(node.value)
+            return np.transpose(value), False
+        if isinstance(node, ast.UnaryOp):
+            value, owned = self.evaluate(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return value, owned
+            return self.elementwise(np.negative, [(value, owned)])
+        if isinstance(node, ast.BinOp):
+            left, right = self.evaluate(node.left), self.evaluate(node.right)
+            if isinstance(node.op, ast.MatMult):
+                a, b = np.asarray(left[0]), np.asarray(right[0])
+                if a.ndim == 2 and b.ndim == 2:
+                    check_pipeline_size((a.shape[0], b.shape[1]), np.result_type(a, b))
+                return np.matmul(a, b), True
+            return self.elementwise(ELEMENTWISE_BINARY[type(node.op)], [left, right])
+        if isinstance(node, ast.Call):
+            name = node.func.id
+            args = [self.evaluate(arg) for arg in node.args]
+            if name in ELEMENTWISE_FUNCTIONS:
+                return self.elementwise(ELEMENTWISE_FUNCTIONS[name], args)
+            function, fresh = PIPELINE_FUNCTIONS[name]
+            keywords = {keyword.arg: self.evaluate(keyword.value)[0] for keyword in node.keywords}
+            if name == "outer":
+                check_pipeline_size((np.size(args[0][0]), np.size(args[1][0])), float)
+            result = function(*[value for value, _ in args], **keywords)
+            if name in PIPELINE_PARTS:
+                result = PipelineTuple(result)
+                result.parts = PIPELINE_PARTS[name]
+                return result, False
+            return result, fresh and isinstance(result, np.ndarray)
+        raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+    def elementwise(self, ufunc, operands: List[tuple]):
+        """Apply a ufunc, writing into an owned float temporary of the result's
+        shape when there is one instead of allocating"""
+        values = [value for value, _ in operands]
+        shape = np.broadcast_shapes(*[np.shape(value) for value in values])
+        dtype = np.result_type(*values)
+        for value, owned in operands:
+            if (owned and isinstance(value, np.ndarray) and value.shape == shape and value.dtype == dtype
+                    and dtype.kind == "f" and value.flags.writeable and not self.aliased(value)):
+                self.fused += 1
+                return ufunc(*values, out=value), True
+        check_pipeline_size(shape, dtype)
+        return ufunc(*values), True
+
+class EvaluatePipelineToolHandler(NumPyToolHandler):
+    def __init__(self):
+        super().__init__("evaluate_pipeline")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description=(
+                "Evaluate several operations in one call. The pipeline is a list of assignments separated by ';' or newlines, "
+                "e.g. 'C = A @ B; D = inv(C); U, s, Vt = svd(D)', using + - * / ** @, .T and the functions "
+                + ", ".join(sorted(set(PIPELINE_FUNCTIONS) | set(ELEMENTWISE_FUNCTIONS)))
+                + ". Only the requested outputs are returned."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "pipeline": {
+                        "type": "string",
+                        "description": "Assignments to evaluate in order"
+                    },
+                    "inputs": {
+                        "type": "object",
+                        "additionalProperties": {
+                            "type": "array",
+                            "items": {
+                                "type": "array",
+                                "items": {"type": "number"}
+                            }
+                        },
+                        "description": "Named input arrays (or array_id strings of stored arrays)"
+                    },
+                    "outputs": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Names to return, defaults to the names assigned by the last step"
+                    }
+                },
+                "required": ["pipeline", "inputs"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            statements = parse_pipeline(args["pipeline"])
+            inputs = {name: self.resolve_array(args, value, allow_complex=True) for name, value in (args.get("inputs") or {}).items()}
+            last_target = statements[-1].targets[0]
+            outputs = args.get("outputs") or [
+                name.id for name in (last_target.elts if isinstance(last_target, ast.Tuple) else [last_target])
+            ]
+            evaluator = PipelineEvaluator(inputs, statements, outputs)
+            results = evaluator.run()
+            log_result("Pipeline Result", **{name: value for name, value in results.items() if not isinstance(value, tuple)})
+
+            encoded, lines = {}, []
+            for name in outputs:
+                value = results[name]
+                if isinstance(value, PipelineTuple):
+                    for part, item in zip(value.parts, value):
+                        encoded[f"{name}.{part}"] = self.output(args, item, f"{name}.{part}")
+                else:
+                    encoded[name] = self.output(args, value, name)
+            for name, value in encoded.items():
+                lines.append(f"{name} = {array_text(value)}")
+            return [TextContent(
+                type="text",
+                text=f"Pipeline Result ({len(statements)} steps, {evaluator.fused} fused):\n" + "\n".join(lines),
+                meta={"outputs": encoded, "steps": len(statements), "fused": evaluator.fused}
+            )]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in pipeline: {str(e)}")]
+
+# Out-of-core operations
+#
+# The blocked_* tools read their file arguments tile by tile from the memory
+# map and write into output_file the same way, so neither the inputs nor the
+# result have to fit in memory. Without output_file the result is built in
+# memory and returned like any other.
+REDUCTIONS = ("sum", "mean", "min", "max", "norm")
+
+def reduce_partial(block: np.ndarray, operation: str, axis: Optional[int]) -> np.ndarray:
+    if operation in ("sum", "mean"):
+        return block.sum(axis=axis)
+    if operation == "min":
+        return block.min(axis=axis)
+    if operation == "max":
+        return block.max(axis=axis)
+    return np.square(block).sum(axis=axis)
+
+def merge_partial(total, partial, operation: str):
+    if total is None:
+        return partial
+    if operation == "min":
+        return np.minimum(total, partial)
+    if operation == "max":
+        return np.maximum(total, partial)
+    return total + partial
+
+def finish_partial(total, operation: str, count: int):
+    if operation == "mean":
+        return total / count
+    if operation == "norm":
+        return np.sqrt(total)
+    return total
+
+class BlockedToolHandler(NumPyToolHandler):
+    def get_operand(self, args: dict, name: str) -> np.ndarray:
+        """File arguments stay memory-mapped in their own dtype, tiles are converted as they are read"""
+        value = args[name]
+        return open_array_file(value) if is_file_spec(value) else self.get_array(args, name)
+
+    def result_array(self, args: dict, shape: tuple, inputs: Sequence[str], dtype=np.float64) -> np.ndarray:
+        output_file = args.get("output_file")
+        if not output_file:
+            return np.empty(shape, dtype=dtype)
+        for name in inputs:
+            if is_file_spec(args[name]) and data_path(args[name]["file"]) == data_path(output_file):
+                raise ValueError(f"output_file must differ from the {name} file")
+        return create_array_file(output_file, shape, dtype)
+
+class BlockedMatmulToolHandler(BlockedToolHandler):
+    def __init__(self):
+        super().__init__("blocked_matmul")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Matrix multiplication of memory-mapped .npy / raw files, computed tile by tile out of core",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "matrix_a": {**ARRAY_FILE_SCHEMA, "description": "First matrix file (or an array / array_id)"},
+                    "matrix_b": {**ARRAY_FILE_SCHEMA, "description": "Second matrix file (or an array / array_id)"}
+                },
+                "required": ["matrix_a", "matrix_b"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            matrix_a = self.get_operand(args, "matrix_a")
+            matrix_b = self.get_operand(args, "matrix_b")
+            if matrix_a.ndim != 2 or matrix_b.ndim != 2 or matrix_a.shape[1] != matrix_b.shape[0]:
+                raise ValueError(f"Cannot multiply shapes {matrix_a.shape} and {matrix_b.shape}")
+            rows, inner, cols = matrix_a.shape[0], matrix_a.shape[1], matrix_b.shape[1]
+            result = self.result_array(args, (rows, cols), ("matrix_a", "matrix_b"))
+            tile = tile_size()
+            for i in range(0, rows, tile):
+                for j in range(0, cols, tile):
+                    block = np.zeros((min(tile, rows - i), min(tile, cols - j)))
+                    for k in range(0, inner, tile):
+                        block += np.asarray(matrix_a[i:i + tile, k:k + tile], dtype=float) @ np.asarray(matrix_b[k:k + tile, j:j + tile], dtype=float)
+                    result[i:i + tile, j:j + tile] = block
+            log_result("Blocked Matrix Multiplication Result", result=result)
+            matrix = self.output(args, result)
+            return [TextContent(type="text", text=f"Matrix Multiplication Result:\n{array_text(matrix)}", meta={"matrix": matrix})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in blocked matrix multiplication: {str(e)}")]
+
+class BlockedTransposeToolHandler(BlockedToolHandler):
+    def __init__(self):
+        super().__init__("blocked_transpose")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Transpose a memory-mapped .npy / raw matrix file tile by tile out of core",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "matrix": {**ARRAY_FILE_SCHEMA, "description": "Matrix file (or an array / array_id)"}
+                },
+                "required": ["matrix"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            matrix = self.get_operand(args, "matrix")
+            if matrix.ndim != 2:
+                raise ValueError("Matrix must be 2-dimensional")
+            rows, cols = matrix.shape
+            result = self.result_array(args, (cols, rows), ("matrix",))
+            tile = tile_size(tiles=2)
+            for i in range(0, rows, tile):
+                for j in range(0, cols, tile):
+                    result[j:j + tile, i:i + tile] = np.asarray(matrix[i:i + tile, j:j + tile], dtype=float).T
+            log_result("Blocked Transpose Result", result=result)
+            transposed = self.output(args, result)
+            return [TextContent(type="text", text=f"Matrix Transpose Result:\n{array_text(transposed)}", meta={"matrix": transposed})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in blocked transpose: {str(e)}")]
+
+class BlockedReduceToolHandler(BlockedToolHandler):
+    def __init__(self):
+        super().__init__("blocked_reduce")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Sum, mean, min, max or norm of a memory-mapped .npy / raw file, streamed a block of rows at a time",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "array": {**ARRAY_FILE_SCHEMA, "description": "Array file (or an array / array_id)"},
+                    "operation": {
+                        "type": "string",
+                        "enum": list(REDUCTIONS),
+                        "description": "Reduction to compute (default sum)"
+                    },
+                    "axis": {
+                        "type": "integer",
+                        "description": "Axis to reduce, all elements when omitted"
+                    }
+                },
+                "required": ["array"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            array = self.get_operand(args, "array")
+            operation = args.get("operation") or "sum"
+            if operation not in REDUCTIONS:
+                raise ValueError(f"Unknown operation {operation!r}, expected one of {', '.join(REDUCTIONS)}")
+            axis = args.get("axis")
+            if axis is not None:
+                axis = int(axis)
+                if not -array.ndim <= axis < array.ndim:
+                    raise ValueError(f"axis {axis} is out of bounds for an array of {array.ndim} dimensions")
+                axis %= array.ndim
+
+            if axis is None or axis == 0:
+                total = None
+                for rows in row_blocks(array):
+                    total = merge_partial(total, reduce_partial(np.asarray(array[rows], dtype=float), operation, axis), operation)
+                result = finish_partial(total, operation, array.size if axis is None else array.shape[0])
+            else:
+                # reducing within rows: every block of rows gives its rows of the result
+                result = self.result_array(args, array.shape[:axis] + array.shape[axis + 1:], ("array",))
+                for rows in row_blocks(array):
+                    partial = reduce_partial(np.asarray(array[rows], dtype=float), operation, axis)
+                    result[rows] = finish_partial(partial, operation, array.shape[axis])
+            log_result("Blocked Reduction Result", result=result)
+            encoded = self.output(args, result)
+            return [TextContent(type="text", text=f"{operation.capitalize()} Result:\n{array_text(encoded)}", meta={"result": encoded})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in blocked reduction: {str(e)}")]
+
+# Statistics
+#
+# Moments are merged block by block (Welford's update generalized to blocks by
+# Chan et al.), so a file or a series of chunks is summarized in one pass with
+# the memory of one block. Quantiles of data that is not in memory come from
+# a mergeable sketch: level h holds items of weight 2**h, and a full level is
+# sorted and every other item promoted, so the sketch stays a few thousand
+# rows whatever the input size. Sketch quantiles are values of the data with
+# a rank error of about log2(n / capacity) / capacity.
+QUANTILE_SKETCH_ROWS = int(os.environ.get("NUMPY_MCP_QUANTILE_SKETCH_ROWS", 1024))
+STATISTICS = ("count", "mean", "std", "variance", "min", "max", "median")
+
+class StreamingMoments:
+    """Count, mean, sum of squared deviations, min and max per column of (rows, columns) blocks"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = self.m2 = self.min = self.max = None
+
+    def update(self, block: np.ndarray):
+        rows = block.shape[0]
+        if rows == 0:
+            return
+        mean = block.mean(axis=0)
+        m2 = np.square(block - mean).sum(axis=0)
+        if self.count == 0:
+            self.mean, self.m2, self.min, self.max = mean, m2, block.min(axis=0), block.max(axis=0)
+        else:
+            total = self.count + rows
+            delta = mean - self.mean
+            self.mean = self.mean + delta * (rows / total)
+            self.m2 = self.m2 + m2 + np.square(delta) * (self.count * rows / total)
+            self.min = np.minimum(self.min, block.min(axis=0))
+            self.max = np.maximum(self.max, block.max(axis=0))
+        self.count += rows
+
+    def variance(self, ddof: int = 0) -> np.ndarray:
+        if self.count - ddof <= 0:
+            return np.full_like(self.m2, np.nan)
+        return self.m2 / (self.count - ddof)
+
+class QuantileSketch:
+    """Approximate quantiles per column of a stream of (rows, columns) blocks"""
+
+    def __init__(self, columns: int, seed: int = 0):
+        # levels of (rows, columns) items, the budget shared by all columns
+        self.capacity = int(np.clip(BLOCK_BYTES // (64 * 8 * max(columns, 1)), 32, QUANTILE_SKETCH_ROWS))
+        self.levels: List[np.ndarray] = []
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, block: np.ndarray):
+        items, level = block, 0
+        while len(items):
+            if level == len(self.levels):
+                self.levels.append(items[:0])
+            items = np.concatenate([self.levels[level], items])
+            if len(items) < 2 * self.capacity:
+                self.levels[level] = items
+                return
+            items = np.sort(items, axis=0)
+            # an odd item stays behind, taken from either end so neither tail is favoured
+            if len(items) % 2:
+                if self.rng.integers(2):
+                    self.levels[level], items = items[:1], items[1:]
+                else:
+                    self.levels[level], items = items[-1:], items[:-1]
+            else:
+                self.levels[level] = items[:0]
+            items = items[self.rng.integers(2)::2]
+            level += 1
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) <= 1
+
+    def quantiles(self, qs: np.ndarray) -> np.ndarray:
+        """(len(qs), columns) values of nearest rank"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** height) for height, level in enumerate(self.levels)])
+        order = np.argsort(items, axis=0)
+        values = np.take_along_axis(items, order, axis=0)
+        cumulative = np.cumsum(weights[order], axis=0)
+        ranks = np.asarray(qs)[:, None, None] * cumulative[-1]
+        index = np.minimum((cumulative[None, :, :] < ranks).sum(axis=1), len(items) - 1)
+        return np.take_along_axis(values, index, axis=0)
+
+def quantile_list(args: dict) -> List[float]:
+    quantiles = [float(q) for q in args.get("quantiles") or []]
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise ValueError("Quantiles must be between 0 and 1")
+    return quantiles
+
+class StatisticsStream:
+    """Running summary of the chunks of one accumulate_statistics stream"""
+
+    def __init__(self, axis: Optional[int], trailing_shape: tuple):
+        self.axis = axis
+        self.trailing_shape = trailing_shape
+        columns = int(np.prod(trailing_shape)) if axis == 0 else 1
+        self.moments = StreamingMoments()
+        self.sketch = QuantileSketch(columns)
+        self.lock = threading.Lock()
+
+    def update(self, chunk: np.ndarray):
+        if self.axis == 0:
+            if chunk.shape[1:] != self.trailing_shape:
+                raise ValueError(f"Chunk rows of shape {chunk.shape[1:]} do not match the stream's {self.trailing_shape}")
+            block = chunk.reshape(chunk.shape[0], -1)
+        else:
+            block = chunk.reshape(-1, 1)
+        self.moments.update(block)
+        self.sketch.update(block)
+
+class StatisticsStreams:
+    def __init__(self, max_streams: int):
+        self.max_streams = max_streams
+        self.streams: "OrderedDict[tuple, StatisticsStream]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, namespace: str, stream_id: str, axis: Optional[int] = None, trailing_shape: Optional[tuple] = None) -> StatisticsStream:
+        """The stream, created for chunks of trailing_shape when it is given"""
+        if not ARRAY_ID.match(stream_id or ""):
+            raise ValueError(f"Invalid stream_id: {stream_id!r}, use up to 64 letters, digits, '_', '.' or '-'")
+        with self.lock:
+            stream = self.streams.get((namespace, stream_id))
+            if stream is None and trailing_shape is None:
+                raise ValueError(f"Unknown stream_id: {stream_id}")
+            if stream is None:
+                stream = self.streams[(namespace, stream_id)] = StatisticsStream(axis, trailing_shape)
+                while len(self.streams) > self.max_streams:
+                    self.streams.popitem(last=False)
+            elif trailing_shape is not None and stream.axis != axis:
+                raise ValueError(f"Stream {stream_id} aggregates along axis {stream.axis}")
+            self.streams.move_to_end((namespace, stream_id))
+            return stream
+
+    def free(self, namespace: str, stream_id: str) -> bool:
+        with self.lock:
+            return self.streams.pop((namespace, stream_id), None) is not None
+
+statistics_streams = StatisticsStreams(STORE_MAX_ARRAYS)
+
+class StatisticsToolHandler(BlockedToolHandler):
+    def statistics_result(self, args: dict, title: str, values: Dict[str, Any], extra: Dict[str, Any]) -> Sequence[TextContent]:
+        encoded = {name: self.output(args, value, name) for name, value in values.items()}
+        lines = [f"{name.replace('_', ' ').capitalize()}: {array_text(value)}" for name, value in encoded.items()]
+        return [TextContent(type="text", text=f"{title}:\n" + "\n".join(lines), meta={**encoded, **extra})]
+
+    def moment_values(self, moments: StreamingMoments, shape: tuple, ddof: int) -> Dict[str, Any]:
+        variance = moments.variance(ddof)
+        return {
+            "count": moments.count,
+            "mean": moments.mean.reshape(shape),
+            "std": np.sqrt(variance).reshape(shape),
+            "variance": variance.reshape(shape),
+            "min": moments.min.reshape(shape),
+            "max": moments.max.reshape(shape)
+        }
+
+def quantile_values(quantiles: List[float], values: np.ndarray, shape: tuple) -> Dict[str, Any]:
+    """median and one q<percent> entry per requested quantile, from values for [0.5] + quantiles"""
+    result = {"median": values[0].reshape(shape)}
+    for q, value in zip(quantiles, values[1:]):
+        result[f"q{q * 100:g}"] = value.reshape(shape)
+    return result
+
+class DescriptiveStatisticsToolHandler(StatisticsToolHandler):
+    def __init__(self):
+        super().__init__("descriptive_statistics")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Count, mean, standard deviation, variance, min, max, median and quantiles of an array or a .npy / raw file, computed in one streaming pass",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "array": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Data as a nested array, an array_id or a file handle {\"file\": \"data.npy\"}"
+                    },
+                    "axis": {
+                        "type": "integer",
+                        "description": "Axis to summarize along (e.g. 0 for per-column statistics), all elements when omitted"
+                    },
+                    "quantiles": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Extra quantiles between 0 and 1, e.g. [0.05, 0.95]"
+                    },
+                    "ddof": {
+                        "type": "integer",
+                        "description": "Delta degrees of freedom of variance and std (default 0, 1 for the sample variance)"
+                    }
+                },
+                "required": ["array"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            array = self.get_operand(args, "array")
+            quantiles = quantile_list(args)
+            ddof = int(args.get("ddof") or 0)
+            axis = args.get("axis")
+            if array.ndim == 0:
+                array = array.reshape(1)
+            if axis is not None:
+                axis = int(axis)
+                if not -array.ndim <= axis < array.ndim:
+                    raise ValueError(f"axis {axis} is out of bounds for an array of {array.ndim} dimensions")
+                axis %= array.ndim
+            qs = np.array([0.5] + quantiles)
+
+            if axis is not None and axis > 0:
+                # every block of whole rows holds complete slices along axis, summarized exactly
+                parts: Dict[str, List[np.ndarray]] = {}
+                for rows in row_blocks(array):
+                    block = np.asarray(array[rows], dtype=float)
+                    variance = block.var(axis=axis, ddof=ddof) if block.shape[axis] > ddof else np.full(np.delete(block.shape, axis), np.nan)
+                    block_values = {
+                        "mean": block.mean(axis=axis),
+                        "std": np.sqrt(variance),
+                        "variance": variance,
+                        "min": block.min(axis=axis),
+                        "max": block.max(axis=axis),
+                        **quantile_values(quantiles, np.quantile(block, qs, axis=axis), block.shape[:axis] + block.shape[axis + 1:])
+                    }
+                    for name, value in block_values.items():
+                        parts.setdefault(name, []).append(value)
+                values = {"count": array.shape[axis], **{name: np.concatenate(blocks) for name, blocks in parts.items()}}
+                return self.statistics_result(args, "Descriptive Statistics", values, {"quantile_method": "exact"})
+
+            shape = array.shape[1:] if axis == 0 else ()
+            columns = int(np.prod(shape)) if axis == 0 else 1
+            moments = StreamingMoments()
+            # arrays already in memory get exact quantiles, files a sketch unless they fit in one block
+            exact = not isinstance(array, np.memmap) or array.nbytes <= BLOCK_BYTES
+            sketch = None if exact else QuantileSketch(columns)
+            for rows in row_blocks(array):
+                block = np.asarray(array[rows], dtype=float).reshape(-1, columns)
+                moments.update(block)
+                if sketch is not None:
+                    sketch.update(block)
+            if exact:
+                quantile_array = np.quantile(np.asarray(array, dtype=float).reshape(-1, columns), qs, axis=0)
+            else:
+                quantile_array = sketch.quantiles(qs)
+            values = {**self.moment_values(moments, shape, ddof), **quantile_values(quantiles, quantile_array, shape)}
+            return self.statistics_result(args, "Descriptive Statistics", values, {"quantile_method": "exact" if exact else "sketch"})
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in descriptive statistics: {str(e)}")]
+
+class AccumulateStatisticsToolHandler(StatisticsToolHandler):
+    # the streams live in this process
+    stateful = True
+
+    def __init__(self):
+        super().__init__("accumulate_statistics")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Add a chunk of data to a running summary kept on the server and return the statistics so far, for data sets sent in several calls",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "stream_id": {
+                        "type": "string",
+                        "description": "Name of the running summary, created by its first chunk"
+                    },
+                    "chunk": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Next chunk of data (rows when axis is 0), an array_id or a file handle; omit to only read the summary"
+                    },
+                    "axis": {
+                        "type": "integer",
+                        "enum": [0],
+                        "description": "0 for per-column statistics over the rows of all chunks, all elements when omitted"
+                    },
+                    "quantiles": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Extra quantiles between 0 and 1, e.g. [0.05, 0.95]"
+                    },
+                    "ddof": {
+                        "type": "integer",
+                        "description": "Delta degrees of freedom of variance and std (default 0)"
+                    },
+                    "finish": {
+                        "type": "boolean",
+                        "description": "Remove the running summary after returning it"
+                    }
+                },
+                "required": ["stream_id"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            namespace = store_namespace(args)
+            quantiles = quantile_list(args)
+            axis = args.get("axis")
+            if axis not in (None, 0):
+                raise ValueError("axis must be 0 or omitted")
+            chunk = None
+            if args.get("chunk") is not None:
+                chunk = self.get_operand(args, "chunk")
+                if chunk.ndim == 0:
+                    chunk = chunk.reshape(1)
+            if chunk is None:
+                stream = statistics_streams.get(namespace, args["stream_id"])
+            else:
+                stream = statistics_streams.get(namespace, args["stream_id"], axis, chunk.shape[1:])
+                with stream.lock:
+                    for rows in row_blocks(chunk):
+                        stream.update(np.asarray(chunk[rows], dtype=float))
+            shape = stream.trailing_shape if stream.axis == 0 else ()
+            with stream.lock:
+                values = {
+                    **self.moment_values(stream.moments, shape, int(args.get("ddof") or 0)),
+                    **quantile_values(quantiles, stream.sketch.quantiles(np.array([0.5] + quantiles)), shape)
+                }
+                exact = stream.sketch.exact
+            if args.get("finish"):
+                statistics_streams.free(namespace, args["stream_id"])
+            return self.statistics_result(
+                args,
+                f"Statistics of {args['stream_id']}",
+                values,
+                {"stream_id": args["stream_id"], "quantile_method": "exact" if exact else "sketch"}
+            )
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error accumulating statistics: {str(e)}")]
+
+# Random numbers and calculus
+#
+# name -> parameters passed on to the numpy Generator method
+DISTRIBUTIONS = {
+    "uniform": ("low", "high"),
+    "normal": ("loc", "scale"),
+    "integers": ("low", "high"),
+    "exponential": ("scale",),
+    "poisson": ("lam",),
+    "binomial": ("n", "p"),
+    "beta": ("a", "b"),
+    "gamma": ("shape", "scale"),
+    "lognormal": ("mean", "sigma")
+}
+
+class RandomNumbersToolHandler(BlockedToolHandler):
+    def __init__(self):
+        super().__init__("random_numbers")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Generate random numbers from a distribution. Large arrays can be written straight to output_file.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "distribution": {
+                        "type": "string",
+                        "enum": list(DISTRIBUTIONS),
+                        "description": "Distribution to sample"
+                    },
+                    "parameters": {
+                        "type": "object",
+                        "description": "Distribution parameters: uniform low/high, normal loc/scale, integers low/high, exponential scale, poisson lam, binomial n/p, beta a/b, gamma shape/scale, lognormal mean/sigma"
+                    },
+                    "shape": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "Shape of the result, e.g. [1000] or [100, 3]"
+                    },
+                    "seed": {
+                        "type": "integer",
+                        "description": "Seed for reproducible results"
+                    }
+                },
+                "required": ["distribution", "shape"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            distribution = args["distribution"]
+            if distribution not in DISTRIBUTIONS:
+                raise ValueError(f"Unknown distribution {distribution!r}, expected one of {', '.join(DISTRIBUTIONS)}")
+            parameters = args.get("parameters") or {}
+            unknown = set(parameters) - set(DISTRIBUTIONS[distribution])
+            if unknown:
+                raise ValueError(f"Unknown parameters for {distribution}: {', '.join(sorted(unknown))}")
+            shape = tuple(int(size) for size in args["shape"])
+            if any(size < 0 for size in shape):
+                raise ValueError("Shape must not be negative")
+            if not args.get("output_file") and int(np.prod(shape)) * 8 > STORE_MAX_BYTES:
+                raise ValueError("Result too large to return, pass output_file")
+            rng = np.random.default_rng(args.get("seed"))
+            sample = getattr(rng, distribution)
+            integer = distribution in ("integers", "poisson", "binomial")
+            result = self.result_array(args, shape, (), np.int64 if integer else np.float64)
+            # generated a block of rows at a time, so output files larger than memory stream to disk
+            for rows in (row_blocks(result) if result.ndim else [()]):
+                result[rows] = sample(**parameters, size=result[rows].shape)
+            log_result("Random Numbers", result=result)
+            encoded = self.output(args, result)
+            return [TextContent(type="text", text=f"Random {distribution} numbers:\n{array_text(encoded)}", meta={"values": encoded})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error generating random numbers: {str(e)}")]
+
+class NumericalDerivativeToolHandler(NumPyToolHandler):
+    def __init__(self):
+        super().__init__("numerical_derivative")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="Numerical first or second derivative of sampled values (central differences, second order accurate)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "values": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Sampled function values"
+                    },
+                    "spacing": {
+                        "type": "number",
+                        "description": "Uniform sample spacing (default 1)"
+                    },
+                    "coordinates": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Sample coordinates along axis, instead of spacing"
+                    },
+                    "order": {
+                        "type": "integer",
+                        "enum": [1, 2],
+                        "description": "Derivative order (default 1)"
+                    },
+                    "axis": {
+                        "type": "integer",
+                        "description": "Axis to differentiate along (default the last)"
+                    }
+                },
+                "required": ["values"]
+            }
+        )
+
+    def run_tool(self, args: dict) -> Sequence[TextContent]:
+        try:
+            values = self.get_array(args, "values")
+            axis = int(args["axis"]) if args.get("axis") is not None else -1
+            order = int(args.get("order") or 1)
+            if order not in (1, 2):
+                raise ValueError("order must be 1 or 2")
+            spacing = self.get_array(args, "coordinates") if args.get("coordinates") is not None else float(args.get("spacing") or 1.0)
+            edge_order = 2 if values.shape[axis] > 2 else 1
+            result = values
+            for _ in range(order):
+                result = np.gradient(result, spacing, axis=axis, edge_order=edge_order)
+            log_result("Numerical Derivative", result=result)
+            derivative = self.output(args, result)
+            return [TextContent(type="text", text=f"Derivative (order {order}):\n{array_text(derivative)}", meta={"derivative": derivative})]
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error in numerical derivative: {str(e)}")]
+
 # Tool registry
 tool_handlers: Dict[str, NumPyToolHandler] = {}
 
@@ -708,17 +2719,116 @@ add_tool_handler(MatrixInverseToolHandler())
 add_tool_handler(MatrixDeterminantToolHandler())
 add_tool_handler(SolveLinearSystemToolHandler())
 add_tool_handler(EigenDecompositionToolHandler())
+add_tool_handler(SparseEigenvaluesToolHandler())
 add_tool_handler(SVDToolHandler())
 add_tool_handler(QRDecompositionToolHandler())
 add_tool_handler(MatrixPowerToolHandler())
 add_tool_handler(FFTToolHandler())
+add_tool_handler(ConvolveToolHandler())
+add_tool_handler(ConvolveToolHandler("correlate", correlate=True))
 add_tool_handler(PolynomialRootsToolHandler())
 add_tool_handler(MatrixReshapeToolHandler())
+add_tool_handler(EvaluatePipelineToolHandler())
+add_tool_handler(BlockedMatmulToolHandler())
+add_tool_handler(BlockedTransposeToolHandler())
+add_tool_handler(BlockedReduceToolHandler())
+add_tool_handler(DescriptiveStatisticsToolHandler())
+add_tool_handler(AccumulateStatisticsToolHandler())
+add_tool_handler(RandomNumbersToolHandler())
+add_tool_handler(NumericalDerivativeToolHandler())
+add_tool_handler(StoreArrayToolHandler())
+add_tool_handler(GetArrayToolHandler())
+add_tool_handler(ListArraysToolHandler())
+add_tool_handler(FreeArrayToolHandler())
+
+# Worker pool
+#
+# Handlers run off the event loop so a large decomposition does not hold up
+# the other requests. Threads suit NumPy, which releases the GIL inside BLAS
+# and LAPACK (limit OPENBLAS_NUM_THREADS / OMP_NUM_THREADS when running many
+# workers); NUMPY_MCP_EXECUTOR=process moves pure Python heavy work to
+# processes. Calls that use the array store or the statistics streams always
+# run on threads, because those live in this process.
+EXECUTOR_KIND = os.environ.get("NUMPY_MCP_EXECUTOR", "thread")
+EXECUTOR_WORKERS = int(os.environ.get("NUMPY_MCP_WORKERS", min(8, os.cpu_count() or 1)))
+
+def names_array_id(value) -> bool:
+    """An array argument given as an array_id, also as the real or imag part
+    of a complex array or one of the evaluate_pipeline inputs"""
+    if isinstance(value, str):
+        return True
+    if isinstance(value, dict) and not (is_file_spec(value) or is_sparse_spec(value) or "encoding" in value):
+        return any(names_array_id(item) for item in value.values())
+    return False
+
+def uses_array_store(handler: NumPyToolHandler, args: dict) -> bool:
+    """True when a call reads array_id arguments, stores its result or keeps state in this process"""
+    return handler.stateful or bool(args.get("store_as")) or any(
+        names_array_id(args.get(name)) for name in handler.array_args
+    )
+
+def run_tool_in_process(name: str, args: dict):
+    """Entry point of the process pool, the handlers are looked up in the worker"""
+    return tool_handlers[name].run_tool(args)
+
+class ToolExecutor:
+    def __init__(self, kind: str, workers: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Invalid NUMPY_MCP_EXECUTOR: {kind}, expected thread or process")
+        self.kind = kind
+        self.workers = workers
+        self.thread_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="numpy-tool")
+        self.process_pool = ProcessPoolExecutor(max_workers=workers) if kind == "process" else None
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker"""
+        return max(0, self.in_flight - self.workers)
+
+    async def run(self, handler: NumPyToolHandler, args: dict):
+        if not handler.blocking:
+            return handler.run_tool(args)
+
+        with self.lock:
+            self.in_flight += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            queue_depth = self.queue_depth
+        if queue_depth:
+            logger.debug("%s queued behind %d calls", handler.name, queue_depth)
+        loop = asyncio.get_running_loop()
+        try:
+            if self.process_pool is not None and not uses_array_store(handler, args):
+                return await loop.run_in_executor(self.process_pool, run_tool_in_process, handler.name, args)
+            return await loop.run_in_executor(self.thread_pool, handler.run_tool, args)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed
+            }
+
+tool_executor = ToolExecutor(EXECUTOR_KIND, EXECUTOR_WORKERS)
 
 @app.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """List all available NumPy tools"""
-    return [th.get_tool_description() for th in tool_handlers.values()]
+    return [
+        with_array_transport(th.get_tool_description()) if th.array_transport else th.get_tool_description()
+        for th in tool_handlers.values()
+    ]
 
 @app.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
@@ -728,7 +2838,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> Sequence[Tex
         if not tool_handler:
             raise ValueError(f"Unknown tool: {name}")
         
-        return tool_handler.run_tool(arguments)
+        return await tool_executor.run(tool_handler, arguments)
         
     except Exception as e:
         logger.error(f"Error during call_tool: {str(e)}")
@@ -744,18 +2854,34 @@ async def handle_list_resources() -> List[types.Resource]:
             name="NumPy Operations",
             description="Available mathematical operations using NumPy",
             mimeType="text/plain"
+        ),
+        types.Resource(
+            uri="numpy://factorizations",
+            name="NumPy Factorization Cache",
+            description="Cached LU / Cholesky / QR factorizations: entries, bytes, hits and misses",
+            mimeType="application/json"
+        ),
+        types.Resource(
+            uri="numpy://executor",
+            name="NumPy Executor",
+            description="Worker pool statistics: in-flight calls and queue depth",
+            mimeType="application/json"
         )
     ]
 
 @app.read_resource()
 async def handle_read_resource(uri: str) -> str:
     """Read resource content"""
-    if uri == "numpy://operations":
+    if str(uri) == "numpy://executor":
+        return json.dumps(tool_executor.stats())
+    if str(uri) == "numpy://factorizations":
+        return json.dumps(factorization_cache.stats())
+    if str(uri) == "numpy://operations":
         operations = [
             "Matrix Operations: Addition, Multiplication, Subtraction, Transpose, Inverse, Determinant, Power",
             "Linear Algebra: Solve linear systems, Eigenvalue decomposition, SVD, QR decomposition",
-            "Signal Processing: Fast Fourier Transform, Convolution",
-            "Statistics: Mean, Standard deviation, Variance, Min, Max, Median",
+            "Signal Processing: Fast Fourier Transform (complex, real-input, batched, n-dimensional), Convolution, Correlation",
+            "Statistics: Mean, Standard deviation, Variance, Min, Max, Median, Quantiles (streamed over files and chunks)",
             "Calculus: Numerical derivatives",
             "Polynomial: Find roots of polynomials",
             "Random: Generate random numbers from various distributions"
@@ -764,15 +2890,52 @@ async def handle_read_resource(uri: str) -> str:
     else:
         raise ValueError(f"Unknown resource: {uri}")
 
+async def respond(server: Server, session: ServerSession, message: RequestResponder, request: Any):
+    """Run one request handler and send its response"""
+    handler = server.request_handlers.get(type(request))
+    if handler is None:
+        await message.respond(types.ErrorData(code=types.METHOD_NOT_FOUND, message="Method not found"))
+        return
+
+    token = request_ctx.set(RequestContext(message.request_id, message.request_meta, session))
+    try:
+        response = await handler(request)
+    except McpError as err:
+        response = err.error
+    except Exception as err:
+        logger.exception("Error handling %s", type(request).__name__)
+        response = types.ErrorData(code=0, message=str(err), data=None)
+    finally:
+        request_ctx.reset(token)
+    await message.respond(response)
+
+async def serve_concurrently(server: Server, read_stream, write_stream, initialization_options):
+    """Like Server.run, but every request is handled in its own task. Server.run
+    awaits each request before reading the next one, which would serialize the
+    tool calls no matter how many workers the pool has."""
+    async with ServerSession(read_stream, write_stream, initialization_options) as session:
+        async with anyio.create_task_group() as task_group:
+            async for message in session.incoming_messages:
+                match message:
+                    case RequestResponder(request=types.ClientRequest(root=request)):
+                        task_group.start_soon(respond, server, session, message, request)
+                    case types.ClientNotification(root=notification):
+                        handler = server.notification_handlers.get(type(notification))
+                        if handler is not None:
+                            try:
+                                await handler(notification)
+                            except Exception:
+                                logger.exception("Error handling %s", type(notification).__name__)
+
 async def main():
     """Main function to run the MCP server"""
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
+        await serve_concurrently(
+            app,
             read_stream,
             write_stream,
             app.create_initialization_options()
         )
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())